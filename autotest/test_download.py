@@ -1,12 +1,51 @@
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+from threading import Event, Thread
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from zipfile import ZIP_DEFLATED, ZipFile
+
 import pytest
 from flaky import flaky
 
+import modflow_devtools.download
 from modflow_devtools.download import (
+    DownloadCache,
+    EventCollector,
+    GitHubClient,
+    Mirror,
+    RateLimiter,
+    ReleaseIndex,
+    ResponseCache,
+    adownload_and_unzip,
+    aget_json,
+    aget_release,
+    aget_releases,
+    alist_artifacts,
     download_and_unzip,
     download_artifact,
+    download_release_assets,
+    download_run_artifacts,
+    get_cache_dir,
+    get_json,
     get_release,
+    get_release_batch,
     get_releases,
+    get_request,
+    iter_artifacts,
+    iter_releases,
     list_artifacts,
+    mirror_repo,
+    set_default_client,
 )
 from modflow_devtools.markers import requires_github
 
@@ -117,3 +156,1269 @@ def test_download_and_unzip(function_tmpdir, delete_zip):
 
     contents = list(dir_path.rglob("*"))
     assert len(contents) > 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Serves the stub server's routes, honoring `If-None-Match` and, for
+    routes advertising `Accept-Ranges: bytes`, `Range` requests. Routes
+    with a `Location` header redirect. If the server's `truncate` attribute
+    is set, the next response body longer than that (i.e. not a probe for
+    range support) is cut short after that many bytes, as if the connection
+    dropped. If its `stall` attribute is set, the next
+    response body stops after that many bytes, and the connection is held
+    open without sending more until the client gives up. While the server's
+    `errors` list is not empty, requests are answered with the next
+    (status, headers) in it.
+    POST request bodies are recorded in the server's `posts` list.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.server.posts.append(self.rfile.read(length))
+        self.do_GET()
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        self.server.connections.add(self.client_address)
+        if self.server.errors:
+            status, headers = self.server.errors.pop(0)
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        route = self.server.routes.get(self.path)
+        if route is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body, headers = route
+        if "Location" in headers:
+            self.send_response(302)
+            self.send_header("Location", headers["Location"])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        status, start, end = 200, 0, len(body)
+        range_ = self.headers.get("Range")
+        if range_ and headers.get("Accept-Ranges") == "bytes":
+            first, _, last = range_.replace("bytes=", "").partition("-")
+            start = int(first)
+            end = int(last) + 1 if last else len(body)
+            status = 206
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(body)}")
+        self.send_header("Content-Length", str(end - start))
+        self.end_headers()
+        if self.server.truncate is not None and end - start > self.server.truncate:
+            end = start + self.server.truncate
+            self.server.truncate = None
+            self.close_connection = True
+        if self.server.stall is not None:
+            end = start + self.server.stall
+            self.server.stall = None
+            self.close_connection = True
+            self.wfile.write(body[start:end])
+            self.wfile.flush()
+            # wait for the client to close the connection
+            self.rfile.read()
+            return
+        self.wfile.write(body[start:end])
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep caches out of the user's cache directory."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    yield get_cache_dir()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    """Don't wait between retries of requests to the stub server."""
+    set_default_client(GitHubClient(rate_limiter=RateLimiter(backoff=0)))
+    yield
+    set_default_client(None)
+
+
+@pytest.fixture
+def server():
+    """A local HTTP server standing in for GitHub."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.routes = {}
+    httpd.requests = []
+    httpd.truncate = None
+    httpd.stall = None
+    httpd.errors = []
+    httpd.posts = []
+    httpd.connections = set()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    thread = Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_response_cache_conditional(server, function_tmpdir):
+    release = {"tag_name": "1.0", "assets": []}
+    server.routes["/releases/latest"] = (
+        json.dumps(release).encode(),
+        {"ETag": '"abc"', "Content-Type": "application/json"},
+    )
+    url = f"{server.url}/releases/latest"
+    cache = ResponseCache(function_tmpdir)
+
+    assert get_json(get_request(url, cache=cache), cache=cache) == release
+    assert "If-None-Match" not in server.requests[-1][1]
+    assert cache.get(url)["etag"] == '"abc"'
+
+    # unchanged data comes back as a 304, answered from the cache
+    assert get_json(get_request(url, cache=cache), cache=cache) == release
+    assert server.requests[-1][1]["If-None-Match"] == '"abc"'
+    assert len(server.requests) == 2
+
+
+def test_response_cache_ttl(server, function_tmpdir):
+    release = {"tag_name": "1.0", "assets": []}
+    server.routes["/releases/latest"] = (json.dumps(release).encode(), {})
+    url = f"{server.url}/releases/latest"
+    cache = ResponseCache(function_tmpdir, ttl=60)
+
+    for _ in range(3):
+        assert get_json(get_request(url, cache=cache), cache=cache) == release
+    assert len(server.requests) == 1
+
+
+def test_response_cache_lru(function_tmpdir):
+    cache = ResponseCache(function_tmpdir, max_size=1500)
+    body = "x" * 300
+    for i in range(3):
+        cache.put(f"https://api.github.com/{i}", body)
+    cache.touch("https://api.github.com/0")
+    cache.put("https://api.github.com/3", body)
+
+    assert cache.get("https://api.github.com/0") is not None
+    assert cache.get("https://api.github.com/1") is None
+    assert cache.get("https://api.github.com/3") is not None
+
+    cache.clear()
+    assert not any(function_tmpdir.glob("*.json"))
+
+    # the directory is only scanned when a write may exceed the limit
+    prunes = []
+    prune = cache.prune
+    cache.prune = lambda *args: prunes.append(args) or prune(*args)
+    for i in range(3):
+        cache.put(f"https://api.github.com/{i}", body)
+    assert prunes == []
+    cache.put("https://api.github.com/0", body)
+    assert prunes == []
+    cache.put("https://api.github.com/3", body)
+    assert len(prunes) == 1
+    assert len(list(function_tmpdir.glob("*.json"))) == 3
+
+
+def test_response_cache_bad_params():
+    with pytest.raises(ValueError):
+        ResponseCache(ttl=-1)
+    with pytest.raises(ValueError):
+        ResponseCache(max_size=-1)
+
+
+def _tar_bytes(files, mode="w:gz") -> bytes:
+    buf = BytesIO()
+    with tarfile.open(fileobj=buf, mode=mode) as tf:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, BytesIO(data))
+    return buf.getvalue()
+
+
+def _zip_bytes(files) -> bytes:
+    buf = BytesIO()
+    with ZipFile(buf, "w", ZIP_DEFLATED) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("delete_zip", [True, False])
+def test_download_and_unzip_streaming(server, function_tmpdir, delete_zip):
+    files = {f"model/{i}.txt": bytes([i]) * 10_000 for i in range(10)}
+    data = _zip_bytes(files)
+    server.routes["/assets/model.zip"] = (data, {})
+    calls = []
+
+    download_and_unzip(
+        f"{server.url}/assets/model.zip",
+        function_tmpdir,
+        delete_zip=delete_zip,
+        chunk_size=256,
+        progress=lambda n, total, rate: calls.append((n, total)),
+    )
+
+    assert (function_tmpdir / "model.zip").is_file() != delete_zip
+    for name, content in files.items():
+        assert (function_tmpdir / name).read_bytes() == content
+    assert len(calls) >= -(-len(data) // 256)
+    assert calls[-1] == (len(data), len(data))
+    assert all(a[0] < b[0] for a, b in zip(calls, calls[1:]))
+
+
+def test_download_and_unzip_bad_chunk_size(server, function_tmpdir):
+    server.routes["/assets/model.zip"] = (_zip_bytes({"a.txt": "a"}), {})
+    with pytest.raises(ValueError):
+        download_and_unzip(
+            f"{server.url}/assets/model.zip", function_tmpdir, chunk_size=0
+        )
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_download_and_unzip_resume(server, function_tmpdir, ranges):
+    files = {f"{i}.bin": os.urandom(50_000) for i in range(4)}
+    data = _zip_bytes(files)
+    headers = {"ETag": '"v1"', "Accept-Ranges": "bytes"} if ranges else {}
+    server.routes["/assets/model.zip"] = (data, headers)
+    server.truncate = len(data) // 2
+    url = f"{server.url}/assets/model.zip"
+
+    # the connection drops halfway, and there are no retries left
+    with pytest.raises(RuntimeError):
+        download_and_unzip(url, function_tmpdir, retries=1)
+    # partial downloads are kept in the staging directory
+    staging = function_tmpdir / ".model.zip.staging"
+    part = staging / "model.zip.part"
+    assert part.is_file()
+    assert (staging / "model.zip.part.json").is_file()
+    assert not (function_tmpdir / "model.zip").exists()
+
+    # a later call picks up where the last one stopped, if it can
+    download_and_unzip(url, function_tmpdir, delete_zip=False)
+    path, req_headers = server.requests[-1]
+    if ranges:
+        assert req_headers["Range"] == f"bytes={len(data) // 2}-"
+        assert req_headers["If-Range"] == '"v1"'
+    else:
+        assert "Range" not in req_headers
+    assert (function_tmpdir / "model.zip").read_bytes() == data
+    assert not staging.exists()
+    for name, content in files.items():
+        assert (function_tmpdir / name).read_bytes() == content
+
+
+def test_download_and_unzip_concurrent(server, function_tmpdir):
+    files = {f"{i}.bin": os.urandom(25_000) for i in range(4)}
+    server.routes["/assets/model.zip"] = (_zip_bytes(files), {})
+    url = f"{server.url}/assets/model.zip"
+    started = Event()
+
+    def slow(n, total, rate):
+        started.set()
+        time.sleep(0.01)
+
+    # the first call holds the lock while it downloads, the others
+    # wait for it and reuse what it extracted
+    with ThreadPoolExecutor(8) as pool:
+        first = pool.submit(
+            download_and_unzip, url, function_tmpdir, chunk_size=4096, progress=slow
+        )
+        assert started.wait(10)
+        others = [
+            pool.submit(download_and_unzip, url, function_tmpdir) for _ in range(7)
+        ]
+        for future in [first, *others]:
+            assert future.result() == function_tmpdir
+
+    assert [p for p, _ in server.requests] == ["/assets/model.zip"]
+    assert sorted(p.name for p in function_tmpdir.iterdir()) == sorted(files)
+    for name, content in files.items():
+        assert (function_tmpdir / name).read_bytes() == content
+
+    # a later call, which didn't wait, downloads again
+    download_and_unzip(url, function_tmpdir)
+    assert len(server.requests) == 2
+    assert sorted(p.name for p in function_tmpdir.iterdir()) == sorted(files)
+
+
+def test_download_and_unzip_concurrent_different_args(server, function_tmpdir):
+    files = {f"{i}.bin": os.urandom(25_000) for i in range(4)}
+    server.routes["/assets/model.zip"] = (_zip_bytes(files), {})
+    url = f"{server.url}/assets/model.zip"
+    started = Event()
+
+    def slow(n, total, rate):
+        started.set()
+        time.sleep(0.01)
+
+    # a waiting call asking for other members doesn't reuse the result
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(
+            download_and_unzip,
+            url,
+            function_tmpdir,
+            chunk_size=4096,
+            progress=slow,
+            members=["0.bin"],
+        )
+        assert started.wait(10)
+        other = pool.submit(download_and_unzip, url, function_tmpdir)
+        assert first.result() == other.result() == function_tmpdir
+
+    # the members are fetched with range requests, if supported
+    assert len([h for _, h in server.requests if "Range" not in h]) == 2
+    assert sorted(p.name for p in function_tmpdir.iterdir()) == sorted(files)
+
+
+def test_download_and_unzip_resume_on_retry(server, function_tmpdir):
+    data = _zip_bytes({"a.bin": os.urandom(100_000)})
+    server.routes["/assets/model.zip"] = (data, {"Accept-Ranges": "bytes"})
+    server.truncate = 1000
+
+    with pytest.warns(UserWarning):
+        download_and_unzip(
+            f"{server.url}/assets/model.zip", function_tmpdir, delete_zip=False
+        )
+    assert len(server.requests) == 2
+    assert server.requests[1][1]["Range"] == "bytes=1000-"
+    assert (function_tmpdir / "model.zip").read_bytes() == data
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_download_and_unzip_segmented(server, function_tmpdir, ranges):
+    files = {"big.bin": os.urandom(3 * 1024**2 + 123), "small.txt": b"hi"}
+    data = _zip_bytes(files)
+    headers = {"ETag": '"v1"', "Accept-Ranges": "bytes"} if ranges else {}
+    server.routes["/assets/model.zip"] = (data, headers)
+    calls = []
+
+    download_and_unzip(
+        f"{server.url}/assets/model.zip",
+        function_tmpdir,
+        delete_zip=False,
+        segments=8,
+        progress=lambda n, total, rate: calls.append(n),
+    )
+
+    assert (function_tmpdir / "model.zip").read_bytes() == data
+    for name, content in files.items():
+        assert (function_tmpdir / name).read_bytes() == content
+    assert calls[-1] == len(data)
+
+    # the first request probes for range support. if supported, the file is
+    # split into as many 1 MB+ segments as fit, otherwise it's one stream
+    ranged = [h["Range"] for _, h in server.requests[1:] if "Range" in h]
+    assert len(ranged) == (3 if ranges else 0)
+    assert len(server.requests) == (4 if ranges else 2)
+
+
+def test_download_and_unzip_segmented_retries(server, function_tmpdir):
+    data = _zip_bytes({"big.bin": os.urandom(3 * 1024**2)})
+    server.routes["/assets/model.zip"] = (data, {"Accept-Ranges": "bytes"})
+    server.truncate = 1000
+
+    with EventCollector() as events, pytest.warns(UserWarning, match="try 1 failed"):
+        download_and_unzip(
+            f"{server.url}/assets/model.zip", function_tmpdir, segments=3
+        )
+    (download,) = [e for e in events.events if e["event"] == "download"]
+    assert download["segments"] == 3
+    assert download["retries"] == 1
+    assert download["bytes"] == len(data)
+
+
+def test_download_and_unzip_segmented_after_interrupted(server, function_tmpdir):
+    files = {f"{i}.bin": os.urandom(1024**2) for i in range(4)}
+    data = _zip_bytes(files)
+    server.routes["/assets/model.zip"] = (data, {"Accept-Ranges": "bytes"})
+    server.truncate = len(data) // 2
+    url = f"{server.url}/assets/model.zip"
+
+    # a single stream is interrupted, leaving a part file and its state
+    with pytest.raises(RuntimeError):
+        download_and_unzip(url, function_tmpdir, retries=1)
+    staging = function_tmpdir / ".model.zip.staging"
+    assert (staging / "model.zip.part.json").is_file()
+
+    # a segmented retry replaces the part file, and its state is discarded
+    download_and_unzip(url, function_tmpdir, segments=4)
+    assert sorted(p.name for p in function_tmpdir.iterdir()) == sorted(files)
+    for name, content in files.items():
+        assert (function_tmpdir / name).read_bytes() == content
+
+
+def test_download_and_unzip_bad_segments(function_tmpdir):
+    with pytest.raises(ValueError):
+        download_and_unzip("https://example.com/a.zip", function_tmpdir, segments=0)
+
+
+@pytest.mark.parametrize("delete_zip", [True, False])
+def test_download_and_unzip_cached(server, function_tmpdir, delete_zip):
+    files = {f"model/{i}.txt": bytes([i]) * 1000 for i in range(3)}
+    headers = {"ETag": '"v1"', "Accept-Ranges": "bytes"}
+    server.routes["/assets/model.zip"] = (_zip_bytes(files), headers)
+    url = f"{server.url}/assets/model.zip"
+    cache = DownloadCache(function_tmpdir / "cache")
+
+    first = function_tmpdir / "first"
+    download_and_unzip(url, first, delete_zip=delete_zip, download_cache=cache)
+    entry = cache.get(url)
+    assert entry["etag"] == '"v1"' and entry["extracted"]
+    assert entry["digest"].startswith("sha256:")
+    assert cache.get(url, digest="sha256:0") is None
+    n_requests = len(server.requests)
+
+    # a hit skips the network and links the extracted tree
+    second = function_tmpdir / "second"
+    download_and_unzip(url, second, delete_zip=delete_zip, download_cache=cache)
+    assert len(server.requests) == n_requests
+    for dir_path in (first, second):
+        assert (dir_path / "model.zip").is_file() != delete_zip
+        for name, content in files.items():
+            assert (dir_path / name).read_bytes() == content
+    assert (first / "model/0.txt").stat().st_ino == (
+        second / "model/0.txt"
+    ).stat().st_ino
+
+    # expired entries are revalidated, and downloaded again if changed
+    cache.ttl = 0
+    download_and_unzip(url, second, delete_zip=delete_zip, download_cache=cache)
+    assert len(server.requests) == n_requests + 1
+    files["model/0.txt"] = b"changed"
+    headers["ETag"] = '"v2"'
+    server.routes["/assets/model.zip"] = (_zip_bytes(files), headers)
+    download_and_unzip(url, second, delete_zip=delete_zip, download_cache=cache)
+    assert len(server.requests) == n_requests + 3
+    assert cache.get(url)["etag"] == '"v2"'
+    assert (second / "model/0.txt").read_bytes() == b"changed"
+    assert (first / "model/0.txt").read_bytes() == bytes([0]) * 1000
+
+
+def test_download_cache_lru(function_tmpdir):
+    cache = DownloadCache(function_tmpdir / "cache", max_size=2500)
+    for i in range(3):
+        file_path = function_tmpdir / f"{i}.bin"
+        file_path.write_bytes(bytes(1000))
+        cache.put(f"https://example.com/{i}.bin", file_path)
+    assert cache.get("https://example.com/0.bin") is None
+    assert cache.get("https://example.com/2.bin")["disk_size"] == 1000
+
+    # pruning uses the recorded sizes, without walking the entries' files
+    def rglob(self, pattern):
+        raise AssertionError(f"{self} was walked")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Path, "rglob", rglob)
+        cache.prune(max_size=1500)
+    assert cache.get("https://example.com/1.bin") is None
+    assert cache.get("https://example.com/2.bin") is not None
+
+    cache.clear()
+    assert not any((function_tmpdir / "cache").iterdir())
+
+    with pytest.raises(ValueError):
+        DownloadCache(ttl=-1)
+    with pytest.raises(ValueError):
+        DownloadCache(max_size=-1)
+
+
+@pytest.mark.parametrize("stream_extract", [True, False])
+@pytest.mark.parametrize("delete_zip", [True, False])
+@pytest.mark.parametrize("suffix", [".tar.gz", ".tar.xz"])
+def test_download_and_unzip_tar(
+    server, function_tmpdir, stream_extract, delete_zip, suffix
+):
+    files = {f"model/{i}.txt": os.urandom(50_000) for i in range(4)}
+    data = _tar_bytes(files, mode=f"w:{suffix.split('.')[-1]}")
+    server.routes[f"/assets/model{suffix}"] = (data, {})
+    server.truncate = len(data) // 2
+    calls = []
+
+    with pytest.warns(UserWarning, match="try 1 failed"):
+        download_and_unzip(
+            f"{server.url}/assets/model{suffix}",
+            function_tmpdir,
+            delete_zip=delete_zip,
+            chunk_size=4096,
+            progress=lambda n, total, rate: calls.append((n, total)),
+            stream_extract=stream_extract,
+        )
+
+    archive = function_tmpdir / f"model{suffix}"
+    assert archive.is_file() != delete_zip
+    if not delete_zip:
+        assert archive.read_bytes() == data
+    assert not any(function_tmpdir.glob("*.part*"))
+    for name, content in files.items():
+        assert (function_tmpdir / name).read_bytes() == content
+    assert calls[-1] == (len(data), len(data))
+
+
+def test_download_and_unzip_tar_cached(server, function_tmpdir):
+    files = {f"model/{i}.txt": bytes([i]) * 1000 for i in range(3)}
+    data = _tar_bytes(files)
+    server.routes["/assets/model.tar.gz"] = (data, {"ETag": '"v1"'})
+    url = f"{server.url}/assets/model.tar.gz"
+    cache = DownloadCache(function_tmpdir / "cache")
+
+    for dir_name in ("first", "second"):
+        download_and_unzip(
+            url, function_tmpdir / dir_name, download_cache=cache, stream_extract=True
+        )
+        for name, content in files.items():
+            assert (function_tmpdir / dir_name / name).read_bytes() == content
+    entry = cache.get(url)
+    assert entry["extracted"] and entry["size"] == len(data)
+    assert sorted(p.name for p in (function_tmpdir / "cache").iterdir()) == [
+        cache._entry_dir(url).name
+    ]
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_download_and_unzip_members(server, function_tmpdir, ranges):
+    files = {f"mf6.6/bin/{n}": os.urandom(20_000) for n in ("mf6", "libmf6.so")}
+    files.update({f"mf6.6/doc/{i}.pdf": os.urandom(200_000) for i in range(20)})
+    data = _zip_bytes(files)
+    headers = {"Accept-Ranges": "bytes"} if ranges else {}
+    server.routes["/assets/mf6.6_linux.zip"] = (data, headers)
+
+    with EventCollector() as events:
+        download_and_unzip(
+            f"{server.url}/assets/mf6.6_linux.zip",
+            function_tmpdir,
+            members=["mf6", "*.so"],
+        )
+
+    # with ranges, members are extracted as they download
+    (download,) = [e for e in events.events if e["event"] == "download"]
+    extracts = [e for e in events.events if e["event"] == "extract"]
+    assert download.get("extracted", False) == ranges
+    assert len(extracts) == (0 if ranges else 1)
+    extracted = sorted(
+        p.relative_to(function_tmpdir).as_posix()
+        for p in function_tmpdir.rglob("*")
+        if p.is_file()
+    )
+    assert extracted == ["mf6.6/bin/libmf6.so", "mf6.6/bin/mf6"]
+    for name in extracted:
+        assert (function_tmpdir / name).read_bytes() == files[name]
+    if ranges:
+        # the probe, the trailing records and central directory, then
+        # the (adjacent) members
+        assert len(server.requests) == 3
+        fetched = sum(
+            int(last) - int(first) + 1
+            for first, last in (
+                h["Range"][len("bytes=") :].split("-") for _, h in server.requests
+            )
+        )
+        assert fetched < len(data) / 10
+
+
+def test_download_and_unzip_members_bad_file(function_tmpdir):
+    with pytest.raises(ValueError):
+        download_and_unzip(
+            "https://example.com/model.tar.gz", function_tmpdir, members=["mf6"]
+        )
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_download_and_unzip_digest(server, function_tmpdir, ranges):
+    data = _zip_bytes({f"{i}.txt": os.urandom(10_000) for i in range(5)})
+    digest = f"sha256:{hashlib.sha256(data).hexdigest()}"
+    headers = {"Accept-Ranges": "bytes"} if ranges else {}
+    server.routes["/assets/model.zip"] = (data, headers)
+    url = f"{server.url}/assets/model.zip"
+
+    # the hash survives an interrupted, resumed transfer
+    server.truncate = len(data) // 2
+    with pytest.warns(UserWarning, match="try 1 failed"):
+        download_and_unzip(
+            url, function_tmpdir, delete_zip=False, chunk_size=1024, digest=digest
+        )
+    sidecar = function_tmpdir / "model.zip.sha256"
+    assert sidecar.read_text() == f"{digest[len('sha256:') :]}  model.zip\n"
+
+    with pytest.raises(RuntimeError, match="digest mismatch"):
+        download_and_unzip(url, function_tmpdir / "bad", digest="sha256:0123")
+    assert not any((function_tmpdir / "bad").iterdir())
+
+    with pytest.raises(ValueError):
+        download_and_unzip(url, function_tmpdir, digest="0123")
+
+
+def test_download_and_unzip_segmented_digest(server, function_tmpdir, monkeypatch):
+    data = _zip_bytes({"big.bin": os.urandom(3 * 1024**2)})
+    digest = f"sha256:{hashlib.sha256(data).hexdigest()}"
+    server.routes["/assets/model.zip"] = (data, {"Accept-Ranges": "bytes"})
+    url = f"{server.url}/assets/model.zip"
+
+    # the contiguous prefix is hashed as it arrives, each byte once
+    hashed = []
+    update_from = modflow_devtools.download._Hasher.update_from
+
+    def record(self, file_path, size=None, start=0):
+        hashed.append((start, size))
+        return update_from(self, file_path, size, start)
+
+    monkeypatch.setattr(modflow_devtools.download._Hasher, "update_from", record)
+    download_and_unzip(
+        url, function_tmpdir, delete_zip=False, segments=3, digest=digest
+    )
+    assert (function_tmpdir / "model.zip.sha256").is_file()
+    assert all(size is not None for _, size in hashed)
+    assert sum(size for _, size in hashed) == len(data)
+    assert [start for start, _ in hashed] == sorted(start for start, _ in hashed)
+
+    # without a digest or algorithm, nothing is hashed
+    hashed.clear()
+    download_and_unzip(url, function_tmpdir / "plain", delete_zip=False, segments=3)
+    assert hashed == []
+    assert not (function_tmpdir / "plain" / "model.zip.sha256").exists()
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_download_and_unzip_tar_digest(server, function_tmpdir, cached):
+    data = _tar_bytes({"model/a.txt": b"a" * 1000})
+    digest = f"sha256:{hashlib.sha256(data).hexdigest()}"
+    server.routes["/assets/model.tar.gz"] = (data, {})
+    url = f"{server.url}/assets/model.tar.gz"
+    cache = DownloadCache(function_tmpdir / "cache") if cached else None
+    target = function_tmpdir / "target"
+
+    with pytest.raises(RuntimeError, match="digest mismatch"):
+        download_and_unzip(
+            url,
+            target,
+            stream_extract=True,
+            download_cache=cache,
+            digest="sha256:0123",
+        )
+    assert not any(target.iterdir())
+
+    download_and_unzip(
+        url, target, stream_extract=True, download_cache=cache, digest=digest
+    )
+    assert (target / "model/a.txt").read_bytes() == b"a" * 1000
+    if cached:
+        assert cache.get(url, digest=digest) is not None
+
+
+def test_download_release_assets(server, function_tmpdir, monkeypatch):
+    assets = {
+        name: _zip_bytes({"mf6": name, "libmf6.so": name})
+        for name in ["linux.zip", "mac.zip", "win64.zip"]
+    }
+    assets["code.json"] = b"{}"
+    for name, data in assets.items():
+        server.routes[f"/assets/{name}"] = (data, {})
+    release = {
+        "tag_name": "1.0",
+        "assets": [
+            # sizes are reported as transferred, not as declared
+            {
+                "name": name,
+                "size": 1,
+                "browser_download_url": f"{server.url}/assets/{name}",
+            }
+            for name, data in assets.items()
+        ],
+    }
+    monkeypatch.setattr(
+        modflow_devtools.download, "get_release", lambda *args, **kwargs: release
+    )
+
+    results = download_release_assets(
+        "MODFLOW-USGS/executables",
+        patterns=["linux.zip", "mac*"],
+        path=function_tmpdir,
+        max_workers=2,
+    )
+
+    assert [r.name for r in results] == ["linux.zip", "mac.zip"]
+    for result in results:
+        assert result.path == function_tmpdir / result.name.replace(".zip", "")
+        assert (result.path / "mf6").read_text() == result.name
+        assert result.size == len(assets[result.name])
+        assert result.duration > 0
+    assert not (function_tmpdir / "win64").exists()
+
+    # nothing is transferred for cached assets
+    cache = DownloadCache(function_tmpdir / "cache")
+    for expected in [len(assets["linux.zip"]), 0]:
+        (result,) = download_release_assets(
+            "MODFLOW-USGS/executables",
+            patterns="linux.zip",
+            path=function_tmpdir / "cached",
+            download_cache=cache,
+        )
+        assert result.size == expected
+
+    with pytest.raises(ValueError):
+        download_release_assets("MODFLOW-USGS/executables", patterns="*.tar.gz")
+    with pytest.raises(ValueError):
+        download_release_assets("MODFLOW-USGS/executables", max_workers=None)
+
+    for name in ["linux.tbz2", "linux.txz", "linux.tar.gz", "linux.ZIP"]:
+        assert modflow_devtools.download._archive_stem(name) == "linux"
+
+
+def _paginate(server, path, items, per_page, link=True, key=None, params=None):
+    """Register a paginated API listing with the stub server."""
+    pages = [items[i : i + per_page] for i in range(0, len(items), per_page)]
+    for i, page in enumerate(pages):
+        query = urlencode({**(params or {}), "per_page": per_page, "page": i + 1})
+        last = urlencode({**(params or {}), "per_page": per_page, "page": len(pages)})
+        headers = {"Link": f'<{server.url}{path}?{last}>; rel="last"'} if link else {}
+        body = {"total_count": len(items), key: page} if key else page
+        server.routes[f"{path}?{query}"] = (json.dumps(body).encode(), headers)
+
+
+@pytest.mark.parametrize("link", [True, False])
+@pytest.mark.parametrize("max_pages", [None, 2])
+def test_get_releases_pages(server, monkeypatch, link, max_pages):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    releases = [{"tag_name": str(i), "assets": []} for i in range(7)]
+    _paginate(server, "/repos/owner/repo/releases", releases, 2, link=link)
+
+    actual = get_releases("owner/repo", per_page=2, max_pages=max_pages)
+    expected = releases[: 2 * max_pages] if max_pages else releases
+    assert actual == expected
+    assert len(server.requests) == (max_pages or 4)
+
+
+@pytest.mark.parametrize("max_pages", [None, 2])
+def test_list_artifacts_pages(server, monkeypatch, max_pages):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    artifacts = [{"id": i, "name": "rtd-files"} for i in range(5)]
+    path = "/repos/owner/repo/actions/artifacts"
+    params = {"name": "rtd-files"}
+    _paginate(server, path, artifacts, 2, key="artifacts", params=params)
+
+    actual = list_artifacts(
+        "owner/repo", name="rtd-files", per_page=2, max_pages=max_pages
+    )
+    expected = artifacts[: 2 * max_pages] if max_pages else artifacts
+    assert actual == expected
+    assert len(server.requests) == (max_pages or 3)
+
+
+def test_iter_releases(server, monkeypatch):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    releases = [{"tag_name": str(i), "assets": []} for i in range(7)]
+    _paginate(server, "/repos/owner/repo/releases", releases, 2)
+
+    it = iter_releases(
+        "owner/repo", per_page=2, predicate=lambda r: r["tag_name"] > "2"
+    )
+    assert next(it) == releases[3]
+    assert len(server.requests) == 2
+    assert list(it) == releases[4:]
+    assert len(server.requests) == 4
+
+
+def test_download_run_artifacts(server, monkeypatch, function_tmpdir):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    path = "/repos/owner/repo/actions"
+    artifacts = []
+    for i, name in enumerate(["bin-linux", "bin-mac", "logs", "old"]):
+        data = _zip_bytes({f"{name}.txt": name * 1000})
+        server.routes[f"{path}/artifacts/{i}/zip"] = (data, {})
+        artifacts.append(
+            {
+                "id": i,
+                "name": name,
+                "size_in_bytes": len(data),
+                "expired": name == "old",
+                "digest": f"sha256:{hashlib.sha256(data).hexdigest()}",
+            }
+        )
+    _paginate(server, f"{path}/runs/42/artifacts", artifacts, 30, key="artifacts")
+
+    with EventCollector() as events, pytest.warns(
+        UserWarning, match="expired artifact old"
+    ):
+        downloads = download_run_artifacts(
+            "owner/repo", 42, function_tmpdir, max_workers=2
+        )
+    assert [e["event"] for e in events.events].count("extract") == 3
+    assert [d.name for d in downloads] == ["bin-linux", "bin-mac", "logs"]
+    for d, artifact in zip(downloads, artifacts):
+        assert d.id == artifact["id"]
+        assert d.size == artifact["size_in_bytes"]
+        assert d.duration > 0 and d.rate > 0
+        assert d.path == function_tmpdir / d.name
+        assert (d.path / f"{d.name}.txt").read_text() == d.name * 1000
+        assert not any(d.path.glob("*.zip"))
+    assert f"{path}/artifacts/3/zip" not in [p for p, _ in server.requests]
+
+    downloads = download_run_artifacts(
+        "owner/repo", 42, function_tmpdir / "bin", patterns="bin-*"
+    )
+    assert [d.name for d in downloads] == ["bin-linux", "bin-mac"]
+    with pytest.raises(ValueError, match="No artifacts"):
+        download_run_artifacts("owner/repo", 42, function_tmpdir, patterns="x*")
+
+
+def test_iter_artifacts(server, monkeypatch, capsys):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    artifacts = [{"id": i, "name": "rtd-files"} for i in range(5)]
+    _paginate(
+        server, "/repos/owner/repo/actions/artifacts", artifacts, 2, key="artifacts"
+    )
+
+    assert next(iter_artifacts("owner/repo", per_page=2)) == artifacts[0]
+    assert len(server.requests) == 1
+    assert list(iter_artifacts("owner/repo", per_page=2)) == artifacts
+    assert len(server.requests) == 4
+    assert not capsys.readouterr().out
+
+    with pytest.raises(ValueError):
+        iter_artifacts("owner/repo", name="")
+
+
+def test_client_reuses_connections(server):
+    server.routes["/releases/latest"] = (b'{"tag_name": "1.0"}', {})
+    server.routes["/releases/moved"] = (b"", {"Location": "/releases/latest"})
+    url = f"{server.url}/releases/latest"
+
+    with GitHubClient() as client:
+        for _ in range(5):
+            assert get_json(get_request(url), client=client) == {"tag_name": "1.0"}
+        moved = get_request(f"{server.url}/releases/moved")
+        assert get_json(moved, client=client) == {"tag_name": "1.0"}
+        with pytest.raises(HTTPError) as err:
+            get_json(get_request(f"{server.url}/missing"), client=client)
+        assert err.value.code == 404
+        assert get_json(get_request(url), client=client) == {"tag_name": "1.0"}
+
+    assert len(server.requests) == 9
+    assert len(server.connections) == 1
+    assert all(
+        h["User-Agent"].startswith("modflow-devtools/") for _, h in server.requests
+    )
+
+
+def test_client_settings(server, monkeypatch, function_tmpdir):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    releases = [{"tag_name": str(i), "assets": []} for i in range(3)]
+    _paginate(server, "/repos/owner/repo/releases", releases, 30)
+    client = GitHubClient(retries=5, cache=ResponseCache(function_tmpdir, ttl=60))
+
+    assert get_releases("owner/repo", client=client) == releases
+    assert get_releases("owner/repo", client=client) == releases
+    assert len(server.requests) == 1
+
+    with pytest.raises(ValueError):
+        GitHubClient(retries=0)
+    with pytest.raises(ValueError):
+        GitHubClient(pool_size=0)
+
+
+def test_async_api(server, monkeypatch, function_tmpdir):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    releases = [{"tag_name": str(i), "assets": []} for i in range(5)]
+    _paginate(server, "/repos/owner/repo/releases", releases, 2)
+    artifacts = [{"id": i, "name": "rtd-files"} for i in range(3)]
+    path = "/repos/owner/repo/actions/artifacts"
+    _paginate(server, path, artifacts, 2, key="artifacts")
+    server.routes["/repos/owner/repo/releases/latest"] = (
+        json.dumps(releases[0]).encode(),
+        {},
+    )
+    files = {f"model/{i}.txt": bytes([i]) * 10_000 for i in range(3)}
+    server.routes["/assets/model.zip"] = (_zip_bytes(files), {})
+    server.routes["/assets/moved.zip"] = (b"", {"Location": "/assets/model.zip"})
+
+    async def main():
+        return await asyncio.gather(
+            aget_releases("owner/repo", per_page=2),
+            aget_release("owner/repo"),
+            alist_artifacts("owner/repo", per_page=2),
+            adownload_and_unzip(
+                f"{server.url}/assets/moved.zip", function_tmpdir, chunk_size=256
+            ),
+        )
+
+    rels, latest, arts, path = asyncio.run(main())
+    assert rels == releases
+    assert latest == releases[0]
+    assert arts == artifacts
+    assert path == function_tmpdir
+    assert not (function_tmpdir / "moved.zip").exists()
+    for name, content in files.items():
+        assert (function_tmpdir / name).read_bytes() == content
+
+    _paginate(server, "/repos/owner/repo/releases", releases, 30)
+    with pytest.raises(ValueError, match="Release 5 not found"):
+        asyncio.run(aget_release("owner/repo", tag="5"))
+    with pytest.raises(ValueError, match="Release 5 not found"):
+        get_release("owner/repo", tag="5")
+
+
+def test_async_download_stalled(server, function_tmpdir):
+    files = {"a.bin": os.urandom(50_000)}
+    server.routes["/assets/model.zip"] = (_zip_bytes(files), {})
+    url = f"{server.url}/assets/model.zip"
+    client = GitHubClient(timeout=0.5, rate_limiter=RateLimiter(backoff=0))
+
+    # a stalled body times out, and is retried
+    server.stall = 1000
+    with pytest.warns(UserWarning, match="try 1 failed"):
+        asyncio.run(adownload_and_unzip(url, function_tmpdir, client=client))
+    assert (function_tmpdir / "a.bin").read_bytes() == files["a.bin"]
+
+    # until the retries run out, leaving no partial file
+    out = function_tmpdir / "out"
+    out.mkdir()
+    server.stall = 1000
+    with pytest.raises(RuntimeError, match="cannot retrieve"):
+        asyncio.run(adownload_and_unzip(url, out, retries=1, client=client))
+    assert not any(out.iterdir())
+
+
+def test_async_malformed_status(function_tmpdir):
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(1)
+
+    def serve():
+        conn, _ = sock.accept()
+        with conn:
+            conn.recv(65536)
+            conn.sendall(b"HTTP/1.1 abc\r\nContent-Length: 0\r\n\r\n")
+
+    Thread(target=serve, daemon=True).start()
+    url = f"http://127.0.0.1:{sock.getsockname()[1]}/model.zip"
+    try:
+        with pytest.raises(URLError):
+            asyncio.run(aget_json(get_request(url)))
+    finally:
+        sock.close()
+
+
+def test_rate_limiter_schedule():
+    limiter = RateLimiter(threshold=10)
+    assert limiter.schedule() == 0
+    assert limiter.remaining() is None
+
+    # pace requests once the budget runs low
+    reset = time.time() + 10
+    limiter.update({"x-ratelimit-remaining": "5", "x-ratelimit-reset": str(reset)})
+    assert limiter.remaining() == 5
+    assert limiter.schedule() == 0
+    assert 1.5 < limiter.schedule() < 2.5
+    assert limiter.remaining() == 3
+    # other resources aren't paced with it
+    assert limiter.schedule("graphql") == 0
+    assert limiter.schedule("search") == 0
+    assert limiter.schedule() > 2.5
+
+    # wait for the reset once it is exhausted
+    limiter = RateLimiter(max_wait=60)
+    limiter.update({"x-ratelimit-remaining": "0", "x-ratelimit-reset": str(reset)})
+    assert 9 < limiter.schedule() <= 11
+    limiter.update({"x-ratelimit-remaining": "0", "x-ratelimit-reset": str(reset + 60)})
+    with pytest.raises(ValueError, match="rate limit"):
+        limiter.schedule()
+
+    assert all(0 <= RateLimiter(backoff=1).backoff(n) <= 2 ** (n - 1) for n in (1, 3))
+
+
+def test_client_waits_out_rate_limit(server, monkeypatch):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    releases = [{"tag_name": "1.0", "assets": []}]
+    _paginate(server, "/repos/owner/repo/releases", releases, 30)
+    server.errors = [(429, {"Retry-After": "1"})]
+
+    tic = time.time()
+    with pytest.warns(UserWarning, match="rate-limited"):
+        assert get_releases("owner/repo") == releases
+    assert time.time() - tic >= 1
+    assert len(server.requests) == 2
+
+    # give up if the reset is too far away
+    reset = str(int(time.time()) + 600)
+    headers = {"x-ratelimit-remaining": "0", "x-ratelimit-reset": reset}
+    server.errors = [(403, headers)]
+    client = GitHubClient(rate_limiter=RateLimiter(max_wait=60))
+    with pytest.warns(UserWarning), pytest.raises(ValueError, match="rate limit"):
+        get_releases("owner/repo", client=client)
+
+
+def _graphql_release(tag, assets):
+    return {
+        "databaseId": 1,
+        "name": tag,
+        "tagName": tag,
+        "url": f"https://github.com/owner/repo/releases/tag/{tag}",
+        "isDraft": False,
+        "isPrerelease": False,
+        "createdAt": "2024-01-01T00:00:00Z",
+        "publishedAt": "2024-01-01T00:00:00Z",
+        "description": "",
+        "author": {"login": "owner"},
+        "releaseAssets": {
+            "pageInfo": {"hasNextPage": False},
+            "nodes": [
+                {
+                    "name": name,
+                    "contentType": "application/zip",
+                    "size": 100,
+                    "downloadCount": 0,
+                    "downloadUrl": f"https://github.com/owner/releases/{tag}/{name}",
+                    "createdAt": "2024-01-01T00:00:00Z",
+                    "updatedAt": "2024-01-01T00:00:00Z",
+                }
+                for name in assets
+            ],
+        },
+    }
+
+
+def test_get_release_batch(server, monkeypatch):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    data = {
+        "r0": {"latestRelease": _graphql_release("6.5.0", ["linux.zip", "mac.zip"])},
+        "r1": {"release": _graphql_release("12.0", ["code.json"])},
+    }
+    server.routes["/graphql"] = (json.dumps({"data": data}).encode(), {})
+    client = GitHubClient(token="token")
+
+    repos = {"owner/modflow6": "latest", "owner/executables": "12.0"}
+    releases = get_release_batch(repos, client=client)
+
+    assert len(server.requests) == 1
+    assert server.requests[0][0] == "/graphql"
+    variables = json.loads(server.posts[0])["variables"]
+    assert variables == {
+        "o0": "owner",
+        "n0": "modflow6",
+        "o1": "owner",
+        "n1": "executables",
+        "t1": "12.0",
+    }
+    assert list(releases) == list(repos)
+    assert releases["owner/modflow6"]["tag_name"] == "6.5.0"
+    assert [a["name"] for a in releases["owner/modflow6"]["assets"]] == [
+        "linux.zip",
+        "mac.zip",
+    ]
+    asset = releases["owner/executables"]["assets"][0]
+    assert asset["browser_download_url"].endswith("/12.0/code.json")
+
+    data["r1"]["release"] = None
+    server.routes["/graphql"] = (json.dumps({"data": data}).encode(), {})
+    with pytest.raises(ValueError, match="Release 12.0"):
+        get_release_batch(repos, client=client)
+
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    with pytest.raises(ValueError, match="token"):
+        get_release_batch(["owner/modflow6"], client=GitHubClient())
+
+
+def _release(id, tag, published, prerelease=False):
+    return {
+        "id": id,
+        "tag_name": tag,
+        "draft": False,
+        "prerelease": prerelease,
+        "published_at": published,
+        "assets": [{"name": f"mf{tag}_{ostag}.zip"} for ostag in ("linux", "mac")],
+    }
+
+
+def test_release_index(server, monkeypatch, function_tmpdir):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    path = "/repos/owner/repo/releases"
+    releases = [
+        _release(i, f"6.{i}.0", f"2024-0{i + 1}-15T00:00:00Z") for i in range(5)
+    ][::-1]
+    _paginate(server, path, releases, 2)
+
+    with ReleaseIndex("owner/repo", function_tmpdir / "index.db") as index:
+        assert len(index.sync(per_page=2)) == 5
+        assert len(server.requests) == 3
+
+        # only the first page is needed to find new releases
+        releases.insert(0, _release(5, "6.5.0rc", "2024-06-15T00:00:00Z", True))
+        _paginate(server, path, releases, 2)
+        assert [r["tag_name"] for r in index.sync(per_page=2)] == ["6.5.0rc"]
+        assert len(server.requests) == 4
+
+    with ReleaseIndex("owner/repo", function_tmpdir / "index.db") as index:
+        assert len(index) == 6
+        assert index.latest()["tag_name"] == "6.4.0"
+        assert index.latest(prerelease=True)["tag_name"] == "6.5.0rc"
+        assert index.get("6.2.0")["id"] == 2
+        assert index.get("7.0.0") is None
+        assert [r["tag_name"] for r in index.find("6.[12].*")] == ["6.2.0", "6.1.0"]
+        assert index.at("2024-03-15")["tag_name"] == "6.2.0"
+        assert index.at("2024-03-14")["tag_name"] == "6.1.0"
+        assert index.at("2023-12-31") is None
+        assert [a["name"] for a in index.assets(ostag="linux")] == ["mf6.4.0_linux.zip"]
+        assert [a["name"] for a in index.assets("6.0.0", ostag="Linux")] == [
+            "mf6.0.0_linux.zip"
+        ]
+    assert len(server.requests) == 4
+
+
+def test_mirror_repo(server, monkeypatch, function_tmpdir):
+    monkeypatch.setattr(modflow_devtools.download, "GITHUB_API_URL", server.url)
+    files = {"bin/mf6": b"x" * 10_000, "bin/zbud6": b"y" * 10_000}
+    data = _zip_bytes(files)
+    asset_url = f"{server.url}/owner/repo/releases/download/6.5.0/linux.zip"
+    release = {
+        **_release(2, "6.5.0", "2024-05-01T00:00:00Z"),
+        "created_at": "2024-05-01T00:00:00Z",
+        "assets": [
+            {
+                "name": "linux.zip",
+                "size": len(data),
+                "digest": f"sha256:{hashlib.sha256(data).hexdigest()}",
+                "browser_download_url": asset_url,
+            },
+            {"name": "mac.zip", "size": 1, "browser_download_url": f"{asset_url}x"},
+        ],
+    }
+    older = {**release, "id": 1, "tag_name": "6.4.0", "assets": []}
+    older["created_at"] = "2024-01-01T00:00:00Z"
+    server.routes["/repos/owner/repo/releases/latest"] = (
+        json.dumps(release).encode(),
+        {},
+    )
+    server.routes["/repos/owner/repo/releases/tags/6.4.0"] = (
+        json.dumps(older).encode(),
+        {},
+    )
+    server.routes["/owner/repo/releases/download/6.5.0/linux.zip"] = (data, {})
+
+    root = function_tmpdir / "mirror"
+    assert mirror_repo("owner/repo", "6.4.0", root) == root
+    assert mirror_repo("owner/repo", path=root, patterns="linux*") == root
+    assert mirror_repo("owner/repo", path=root, patterns="linux*") == root
+    # assets already mirrored aren't downloaded again
+    assert [p for p, _ in server.requests].count(
+        "/owner/repo/releases/download/6.5.0/linux.zip"
+    ) == 1
+    assert (root / "127.0.0.1" / "owner" / "repo" / "releases" / "download").is_dir()
+
+    # everything is answered by the mirror from now on
+    requests = len(server.requests)
+    httpd = Mirror(root).make_server()
+    Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    try:
+        mirrors = [root, f"http://127.0.0.1:{httpd.server_address[1]}"]
+        for i, mirror in enumerate(mirrors):
+            client = GitHubClient(mirror=mirror, rate_limiter=RateLimiter(backoff=0))
+            assert get_release("owner/repo", client=client) == release
+            assert get_release("owner/repo", "6.4.0", client=client) == older
+            releases = get_releases("owner/repo", per_page=1, client=client)
+            assert [r["tag_name"] for r in releases] == ["6.5.0", "6.4.0"]
+            batch = get_release_batch(["owner/repo"], client=client)
+            assert batch == {"owner/repo": release}
+            assert asyncio.run(aget_release("owner/repo", client=client)) == release
+
+            out = function_tmpdir / f"out{i}"
+            download_and_unzip(asset_url, out, segments=2, client=client)
+            for name, content in files.items():
+                assert (out / name).read_bytes() == content
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    assert len(server.requests) == requests
+
+
+def test_mirror_env(monkeypatch, function_tmpdir):
+    artifacts = [{"id": i, "name": f"artifact{i % 5}"} for i in range(10)]
+    path = function_tmpdir / "api.github.com" / "repos" / "owner" / "repo" / "actions"
+    path.mkdir(parents=True)
+    (path / "artifacts.json").write_text(
+        json.dumps({"total_count": len(artifacts), "artifacts": artifacts})
+    )
+    monkeypatch.setenv("MODFLOW_DEVTOOLS_MIRROR", str(function_tmpdir))
+    client = GitHubClient()
+    assert client.mirror.path == function_tmpdir
+    assert list_artifacts("owner/repo", per_page=2, client=client) == artifacts
+    # listings are filtered like the API, before pagination
+    assert list_artifacts(
+        "owner/repo", name="artifact3", per_page=1, client=client
+    ) == [artifacts[3], artifacts[8]]
+    assert list_artifacts("owner/repo", name="artifact", client=client) == []
+    with pytest.raises(ValueError, match="mirror"):
+        mirror_repo("owner/repo", path=function_tmpdir, client=client)
+
+
+def test_event_collector(server, function_tmpdir):
+    data = _zip_bytes({"a.txt": "a" * 10_000})
+    server.routes["/assets/model.zip"] = (data, {})
+    server.routes["/releases/latest"] = (b"{}", {"ETag": '"v1"'})
+    url = f"{server.url}/releases/latest"
+    asset_url = f"{server.url}/assets/model.zip"
+    cache = ResponseCache(function_tmpdir / "responses")
+    download_cache = DownloadCache(function_tmpdir / "downloads")
+
+    with EventCollector() as events:
+        assert get_json(get_request(url, cache=cache), cache=cache) == {}
+        # the first error fails the cache's probe, the second the download
+        server.errors += [(503, {}), (503, {})]
+        with pytest.warns(UserWarning, match="try 1 failed"):
+            download_and_unzip(
+                asset_url, function_tmpdir, download_cache=download_cache
+            )
+        assert get_json(get_request(url, cache=cache), cache=cache) == {}
+        download_and_unzip(asset_url, function_tmpdir, download_cache=download_cache)
+    # events after the collector exits aren't collected
+    get_json(get_request(url))
+    kinds = [e["event"] for e in events.events]
+
+    requests = [e for e in events.events if e["event"] == "request"]
+    assert len(requests) == len(server.requests) - 1
+    assert requests[0]["status"] == 200 and not requests[0]["reused"]
+    assert requests[0]["dns"] >= 0 and requests[0]["connect"] >= 0
+    assert requests[0]["tls"] is None
+    assert all(e["ttfb"] > 0 for e in requests if e["status"])
+    assert any(e["reused"] for e in requests)
+    assert kinds.count("retry") == 1
+    (download,) = [e for e in events.events if e["event"] == "download"]
+    assert download["bytes"] == download["size"] == len(data)
+    assert download["retries"] == 1
+    assert kinds.count("extract") == 1
+    results = [
+        (e["cache"], e["result"]) for e in events.events if e["event"] == "cache"
+    ]
+    assert results == [
+        ("response", "miss"),
+        ("download", "miss"),
+        ("response", "revalidated"),
+        ("download", "hit"),
+    ]
+
+    summary = events.summary()
+    for kind in set(kinds):
+        assert kind in summary
+    assert "request phases (mean s): dns" in summary
+    assert "cache: 2 miss, 1 revalidated, 1 hit" in summary
+
+    events.dump(function_tmpdir / "events.jsonl")
+    lines = (function_tmpdir / "events.jsonl").read_text().splitlines()
+    assert [json.loads(line) for line in lines] == events.events
@@ -1,17 +1,20 @@
 import os
 import shutil
+import struct
+import subprocess
 import sys
 import zipfile
 from pathlib import Path
 from pprint import pprint
 from shutil import which
-from zipfile import ZipFile
+from zipfile import ZipFile, ZipInfo
 
 import pytest
 
-from modflow_devtools.markers import excludes_platform
+import modflow_devtools.zip
+from modflow_devtools.markers import excludes_platform, requires_exe
 from modflow_devtools.misc import get_suffixes, set_dir
-from modflow_devtools.zip import MFZipFile
+from modflow_devtools.zip import MFZipFile, merge_zips, zip_all
 
 ext, _ = get_suffixes(sys.platform)
 exe_stem = "pytest"
@@ -72,3 +75,331 @@ def test_extractall_preserves_execute_permission(function_tmpdir, archive, mf):
     path = function_tmpdir / exe_name
     assert path.is_file()
     assert os.access(path, os.X_OK) == mf
+
+
+@pytest.fixture(scope="module")
+def large_archive(module_tmpdir) -> Path:
+    zip_path = module_tmpdir / "large.zip"
+    with ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("model/", "")
+        for i in range(50):
+            info = ZipInfo(f"model/sub{i % 5}/file{i}.dat")
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (0o755 if i % 2 else 0o644) << 16
+            zf.writestr(info, os.urandom(100) * (i * 50 + 1))
+    yield zip_path
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_extractall_parallel(function_tmpdir, large_archive, max_workers):
+    serial = function_tmpdir / "serial"
+    parallel = function_tmpdir / "parallel"
+    with MFZipFile(large_archive) as zf:
+        zf.extractall(serial)
+        zf.extractall(parallel, max_workers=max_workers)
+        names = zf.namelist()
+
+    for name in names:
+        expected, actual = serial / name, parallel / name
+        assert actual.exists()
+        if expected.is_file():
+            assert actual.read_bytes() == expected.read_bytes()
+            if sys.platform != "win32":
+                assert os.stat(actual).st_mode == os.stat(expected).st_mode
+    if sys.platform != "win32":
+        assert os.access(parallel / "model" / "sub1" / "file1.dat", os.X_OK)
+        assert not os.access(parallel / "model" / "sub0" / "file0.dat", os.X_OK)
+
+
+def test_extractall_parallel_members(function_tmpdir, large_archive):
+    with MFZipFile(large_archive) as zf:
+        members = [n for n in zf.namelist() if "sub3" in n]
+        zf.extractall(function_tmpdir, members=members, max_workers=3)
+        with pytest.raises(ValueError):
+            zf.extractall(function_tmpdir, max_workers=0)
+    extracted = [p for p in function_tmpdir.rglob("*") if p.is_file()]
+    assert len(extracted) == len(members) == 10
+
+
+@requires_exe("zip")
+@pytest.mark.parametrize("max_workers", [None, 4])
+@pytest.mark.parametrize("set_password", [True, False])
+def test_extractall_encrypted(function_tmpdir, max_workers, set_password):
+    files = {f"file{i}.txt": f"secret {i}\n".encode() * 1000 for i in range(8)}
+    input_dir = function_tmpdir / "input"
+    input_dir.mkdir()
+    for name, content in files.items():
+        (input_dir / name).write_bytes(content)
+    zip_file = function_tmpdir / "encrypted.zip"
+    with set_dir(input_dir):
+        subprocess.run(["zip", "-q", "-P", "pwd", str(zip_file), *files], check=True)
+
+    out = function_tmpdir / "output"
+    with MFZipFile(zip_file) as zf:
+        if set_password:
+            zf.setpassword(b"pwd")
+            zf.extractall(out, max_workers=max_workers)
+        else:
+            zf.extractall(out, pwd=b"pwd", max_workers=max_workers)
+    for name, content in files.items():
+        assert (out / name).read_bytes() == content
+
+
+@pytest.fixture
+def input_dir(function_tmpdir) -> Path:
+    path = function_tmpdir / "input"
+    for i in range(20):
+        sub = path / f"sub{i % 3}"
+        sub.mkdir(parents=True, exist_ok=True)
+        data = (f"line {i}\n" * (i * 500)).encode() + os.urandom(i * 100)
+        (sub / f"file{i}.txt").write_bytes(data)
+    (path / "empty.txt").write_bytes(b"")
+    yield path
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_compressall_parallel(function_tmpdir, input_dir, processes):
+    serial = function_tmpdir / "serial.zip"
+    parallel = function_tmpdir / "parallel.zip"
+    assert MFZipFile.compressall(str(serial), dir_pths=str(input_dir))
+    assert MFZipFile.compressall(
+        str(parallel), dir_pths=str(input_dir), max_workers=4, processes=processes
+    )
+    assert parallel.read_bytes() == serial.read_bytes()
+
+    with ZipFile(parallel) as zf:
+        assert zf.testzip() is None
+        files = {p.name: p for p in input_dir.rglob("*.txt")}
+        assert sorted(zf.namelist()) == sorted(files)
+        for name, file_path in files.items():
+            assert zf.read(name) == file_path.read_bytes()
+
+
+@pytest.mark.parametrize("raw", [True, False])
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_compressall_matches_zipfile(
+    function_tmpdir, input_dir, max_workers, raw, monkeypatch
+):
+    # entries compressed by workers, or copied from a previous zip file, are
+    # written with ZipFile internals: check against ZipFile.write, so changes
+    # to the standard library break this rather than the archives
+    if not raw:
+        monkeypatch.setattr(modflow_devtools.zip, "_RAW_WRITES", False)
+    file_pths = [str(p) for p in sorted(input_dir.rglob("*.txt"))]
+    expected = function_tmpdir / "expected.zip"
+    with ZipFile(expected, "w", zipfile.ZIP_DEFLATED) as zf:
+        for file_pth in file_pths:
+            zf.write(file_pth, os.path.basename(file_pth))
+
+    zip_file = function_tmpdir / "output.zip"
+    assert MFZipFile.compressall(
+        str(zip_file), file_pths=file_pths, max_workers=max_workers
+    )
+    assert zip_file.read_bytes() == expected.read_bytes()
+    assert MFZipFile.compressall(
+        str(zip_file), file_pths=file_pths, max_workers=max_workers, incremental=True
+    )
+    assert zip_file.read_bytes() == expected.read_bytes()
+
+
+def test_compressall_spooled(function_tmpdir, input_dir, monkeypatch):
+    monkeypatch.setattr(modflow_devtools.zip, "_SPOOL_SIZE", 1000)
+    monkeypatch.setattr(modflow_devtools.zip, "_CHUNK_SIZE", 512)
+    zip_file = function_tmpdir / "output.zip"
+    assert zip_all(str(zip_file), dir_pths=str(input_dir), max_workers=3)
+    with ZipFile(zip_file) as zf:
+        assert zf.testzip() is None
+    assert not any(p for p in function_tmpdir.iterdir() if p.name.startswith("tmp"))
+
+
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_compressall_incremental(function_tmpdir, input_dir, max_workers, monkeypatch):
+    # zip files store times to 2 seconds
+    for p in input_dir.rglob("*.txt"):
+        os.utime(p, (1700000001, 1700000001))
+    zip_file = function_tmpdir / "output.zip"
+    assert zip_all(str(zip_file), dir_pths=str(input_dir))
+
+    compressed = []
+    compress_file = modflow_devtools.zip._compress_file
+
+    def count(file_pth, *args):
+        compressed.append(os.path.basename(file_pth))
+        return compress_file(file_pth, *args)
+
+    monkeypatch.setattr(modflow_devtools.zip, "_compress_file", count)
+
+    # modify a file (keeping its mtime), then add one
+    modified = input_dir / "sub1" / "file4.txt"
+    stat = modified.stat()
+    modified.write_bytes(modified.read_bytes() + b"more")
+    os.utime(modified, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    (input_dir / "sub2" / "new.txt").write_bytes(b"new" * 1000)
+    assert zip_all(
+        str(zip_file),
+        dir_pths=str(input_dir),
+        max_workers=max_workers,
+        incremental=True,
+    )
+    assert sorted(compressed) == ["file4.txt", "new.txt"]
+
+    # the same as compressing everything
+    fresh = function_tmpdir / "fresh.zip"
+    assert zip_all(str(fresh), dir_pths=str(input_dir))
+    assert zip_file.read_bytes() == fresh.read_bytes()
+    with ZipFile(zip_file) as zf:
+        assert zf.testzip() is None
+    assert not any(p.suffix == ".tmp" for p in function_tmpdir.iterdir())
+
+    # with mtime matching, a same-size modification isn't noticed, with crc it is
+    compressed.clear()
+    modified.write_bytes(bytes(modified.stat().st_size))
+    os.utime(modified, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert zip_all(str(zip_file), dir_pths=str(input_dir), incremental=True)
+    assert compressed == []
+    assert zip_all(str(zip_file), dir_pths=str(input_dir), incremental="crc")
+    assert compressed == ["file4.txt"]
+    with ZipFile(zip_file) as zf:
+        assert zf.read("file4.txt") == modified.read_bytes()
+
+    with pytest.raises(ValueError):
+        zip_all(str(zip_file), dir_pths=str(input_dir), incremental="size")
+
+
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_extractall_changed(function_tmpdir, large_archive, max_workers, monkeypatch):
+    cache = function_tmpdir / "crcs.json"
+    with MFZipFile(large_archive) as zf:
+        n = len(zf.namelist())
+        counts = zf.extractall(function_tmpdir, max_workers=max_workers)
+        assert counts == {"written": n, "skipped": 0}
+
+        # existing files' CRCs are computed, then cached
+        changed = function_tmpdir / "model" / "sub2" / "file7.dat"
+        changed.write_bytes(bytes(changed.stat().st_size))
+        (function_tmpdir / "model" / "sub4" / "file9.dat").unlink()
+        mtime = (function_tmpdir / "model" / "sub1" / "file1.dat").stat().st_mtime_ns
+        counts = zf.extractall(
+            function_tmpdir,
+            max_workers=max_workers,
+            overwrite="changed",
+            crc_cache=cache,
+        )
+        assert counts == {"written": 2, "skipped": n - 2}
+        assert changed.read_bytes() == zf.read("model/sub2/file7.dat")
+        mtime2 = (function_tmpdir / "model" / "sub1" / "file1.dat").stat().st_mtime_ns
+        assert mtime2 == mtime
+
+        # with the cache, unchanged files aren't read
+        def crc(path):
+            raise AssertionError(f"{path} was read")
+
+        monkeypatch.setattr(modflow_devtools.zip, "_file_crc", crc)
+        counts = zf.extractall(
+            function_tmpdir,
+            max_workers=max_workers,
+            overwrite="changed",
+            crc_cache=cache,
+        )
+        assert counts == {"written": 0, "skipped": n}
+
+        with pytest.raises(ValueError):
+            zf.extractall(function_tmpdir, overwrite="never")
+
+
+def test_merge_zips(function_tmpdir, large_archive, input_dir, monkeypatch):
+    other = function_tmpdir / "other.zip"
+    assert zip_all(str(other), dir_pths=str(input_dir))
+    with ZipFile(other, "a") as zf:
+        zf.writestr("model/sub0/file0.dat", b"different")
+        zf.writestr(ZipInfo("stored.txt"), b"stored")
+
+    # no (de)compression, only copying
+    def fail(*args, **kwargs):
+        raise AssertionError("data was (de)compressed")
+
+    monkeypatch.setattr(modflow_devtools.zip, "_compress_file", fail)
+    monkeypatch.setattr(zipfile.zlib, "compressobj", fail)
+    monkeypatch.setattr(zipfile.zlib, "decompressobj", fail)
+
+    merged = function_tmpdir / "merged.zip"
+    names = merge_zips(
+        [large_archive, other],
+        merged,
+        select=lambda n: n.startswith("model/sub1/") or n.endswith(".txt"),
+    )
+    with ZipFile(large_archive) as a, ZipFile(other) as b:
+        expected = [n for n in a.namelist() if n.startswith("model/sub1/")]
+        expected += [n for n in b.namelist() if n.endswith(".txt")]
+        assert names == expected
+        sources = {**{n: a for n in a.namelist()}, **{n: b for n in b.namelist()}}
+        with ZipFile(merged) as zf:
+            assert zf.namelist() == expected
+            for zinfo in zf.infolist():
+                src = sources[zinfo.filename].getinfo(zinfo.filename)
+                for attr in (
+                    "date_time",
+                    "compress_type",
+                    "compress_size",
+                    "CRC",
+                    "external_attr",
+                ):
+                    assert getattr(zinfo, attr) == getattr(src, attr)
+    monkeypatch.undo()
+    with ZipFile(merged) as zf:
+        assert zf.testzip() is None
+        assert zf.read("stored.txt") == b"stored"
+    with MFZipFile(merged) as zf:
+        zf.extractall(function_tmpdir / "out")
+    if sys.platform != "win32":
+        assert os.access(function_tmpdir / "out" / "model/sub1/file1.dat", os.X_OK)
+        assert not os.access(function_tmpdir / "out" / "model/sub1/file6.dat", os.X_OK)
+
+    # subset an archive in place, with glob patterns
+    assert merge_zips(merged, merged, select="model/*") == expected[:10]
+    with ZipFile(merged) as zf:
+        assert zf.namelist() == expected[:10]
+        assert zf.testzip() is None
+
+    # conflicting members
+    with pytest.raises(ValueError):
+        merge_zips([large_archive, other], merged, select=["model/sub0/*"])
+    with ZipFile(merged) as zf:
+        assert zf.namelist() == expected[:10]
+    assert not any(p.suffix == ".tmp" for p in function_tmpdir.iterdir())
+
+
+def test_merge_zips_without_raw_writes(function_tmpdir, large_archive, monkeypatch):
+    monkeypatch.setattr(modflow_devtools.zip, "_RAW_WRITES", False)
+    merged = function_tmpdir / "merged.zip"
+    names = merge_zips(large_archive, merged, select="model/sub1/*")
+    with ZipFile(large_archive) as src, ZipFile(merged) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == names
+        for zinfo in zf.infolist():
+            member = src.getinfo(zinfo.filename)
+            assert zf.read(zinfo) == src.read(member)
+            for attr in ("date_time", "compress_type", "CRC", "external_attr"):
+                assert getattr(zinfo, attr) == getattr(member, attr)
+
+
+@pytest.mark.parametrize("raw", [True, False])
+def test_merge_zips_extra(function_tmpdir, raw, monkeypatch):
+    if not raw:
+        monkeypatch.setattr(modflow_devtools.zip, "_RAW_WRITES", False)
+    data = b"data" * 100
+    # extended timestamp, and a ZIP64 field for the entry's sizes
+    timestamp = struct.pack("<HHBl", 0x5455, 5, 1, 1700000000)
+    zip64 = struct.pack("<HHQQ", 0x0001, 16, len(data), len(data))
+    source = function_tmpdir / "source.zip"
+    with ZipFile(source, "w") as zf:
+        zinfo = ZipInfo("file.txt")
+        zinfo.extra = zip64 + timestamp
+        zf.writestr(zinfo, data)
+
+    merged = function_tmpdir / "merged.zip"
+    merge_zips(source, merged)
+    with ZipFile(merged) as zf:
+        assert zf.testzip() is None
+        assert zf.getinfo("file.txt").extra == timestamp
+        assert zf.read("file.txt") == data
@@ -1,25 +1,1168 @@
+import asyncio
+import email.parser
+import hashlib
+import http.client
 import json
 import os
+import queue
+import random
+import re
+import shutil
+import socket
+import sqlite3
+import ssl
 import sys
 import tarfile
+import time
 import timeit
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from fnmatch import fnmatch
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
 from os import PathLike
 from pathlib import Path
-from typing import List, Optional, Union
+from threading import Lock, Thread, get_ident
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 from uuid import uuid4
 from warnings import warn
 
+from modflow_devtools import __version__
+from modflow_devtools.ostags import (
+    SUPPORTED_OSTAGS,
+    github_to_modflow_ostag,
+    python_to_modflow_ostag,
+)
 from modflow_devtools.zip import MFZipFile
 
+GITHUB_API_URL = "https://api.github.com"
+USER_AGENT = f"modflow-devtools/{__version__}"
 
-def get_request(url, params={}):
+
+def get_cache_dir() -> Path:
+    """
+    Get the default cache directory for this package. This is
+    `$XDG_CACHE_HOME/modflow-devtools` if `XDG_CACHE_HOME` is set,
+    otherwise `~/.cache/modflow-devtools`.
+    """
+    root = os.environ.get("XDG_CACHE_HOME", None) or "~/.cache"
+    return Path(root).expanduser() / "modflow-devtools"
+
+
+_listeners: List[Callable[[dict], None]] = []
+_listeners_lock = Lock()
+
+
+def add_listener(listener: Callable[[dict], None]):
+    """
+    Register a callable to receive this module's events. Each event is a dict
+    with the event's type (`event`), a timestamp (`time`) and the fields below.
+    Durations are in seconds, and sizes in bytes. Listeners are called on the
+    thread the event happened on, so they should be quick and thread-safe.
+
+    - `request`: an HTTP request was sent (once per redirect). Fields: `url`,
+      `method`, `status` (None if it failed, with the `error`), `reused`
+      (whether a pooled connection was reused), `dns`, `connect` and `tls`
+      (connection setup times, None if not applicable), and `ttfb` (time to
+      the first byte of the response).
+    - `download`: a file was downloaded. Fields: `url`, `bytes` (transferred
+      in this call), `size`, `offset` (where a resumed download started),
+      `duration`, `rate` and `retries`. If the archive was extracted as it
+      downloaded, `extracted` is True: the duration includes extraction, and
+      no `extract` event follows.
+    - `retry`: a failed request is retried. Fields: `url`, `attempt`, `error`.
+    - `wait`: a request was delayed by the rate limiter. Fields: `resource`,
+      `duration`.
+    - `cache`: a cache was consulted. Fields: `url`, `cache` (`response` or
+      `download`), and `result` (`hit`, `miss` or `revalidated`).
+    - `extract`: an archive was extracted. Fields: `path`, `duration`.
+    """
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[dict], None]):
+    """Unregister a callable registered with `add_listener`."""
+    with _listeners_lock:
+        _listeners.remove(listener)
+
+
+def _emit(event: str, **fields):
+    """Send an event to the registered listeners, if any."""
+    if not _listeners:
+        return
+    record = {"event": event, "time": time.time(), **fields}
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        listener(record)
+
+
+_REQUEST_PHASES = ("dns", "connect", "tls", "ttfb")
+
+
+class EventCollector:
+    """
+    Collects this module's events (see `add_listener`) while used as a
+    context manager, for export as JSON lines or a summary table.
+
+    Examples
+    --------
+    >>> with EventCollector() as events:
+    ...     download_and_unzip(url, path)
+    >>> print(events.summary())
+    >>> events.dump("events.jsonl")
+    """
+
+    def __init__(self):
+        self.events: List[dict] = []
+        self._lock = Lock()
+
+    def __call__(self, event: dict):
+        with self._lock:
+            self.events.append(event)
+
+    def __enter__(self):
+        add_listener(self)
+        return self
+
+    def __exit__(self, *exc):
+        remove_listener(self)
+
+    def dump(self, file):
+        """Write the events as JSON lines to the given path or file object."""
+        if isinstance(file, (str, PathLike)):
+            with open(file, "w") as f:
+                return self.dump(f)
+        for event in self.events:
+            file.write(json.dumps(event, default=str) + "\n")
+
+    def summary(self) -> str:
+        """
+        Summarize the events in a table: for each type of event, the count,
+        total and mean duration, bytes transferred and throughput, followed
+        by mean connection setup times and cache results.
+        """
+        kinds = {}
+        for event in self.events:
+            kinds.setdefault(event["event"], []).append(event)
+
+        def duration(event) -> Optional[float]:
+            if event.get("duration", None) is not None:
+                return event["duration"]
+            if event["event"] == "request" and event.get("ttfb", None) is not None:
+                return sum(event.get(k, None) or 0 for k in _REQUEST_PHASES)
+            return None
+
+        header = ["event", "count", "total (s)", "mean (s)", "bytes", "MB/s"]
+        rows = [header]
+        for kind, events in kinds.items():
+            durations = [d for d in map(duration, events) if d is not None]
+            total = sum(durations)
+            nbytes = sum(e.get("bytes", 0) for e in events)
+            rows.append(
+                [
+                    kind,
+                    str(len(events)),
+                    f"{total:.3f}" if durations else "-",
+                    f"{total / len(durations):.3f}" if durations else "-",
+                    f"{nbytes:,d}" if nbytes else "-",
+                    f"{nbytes / total / 1e6:.2f}" if nbytes and total else "-",
+                ]
+            )
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        lines = [
+            "  ".join(
+                c.ljust(w) if i == 0 else c.rjust(w)
+                for i, (c, w) in enumerate(zip(row, widths))
+            )
+            for row in rows
+        ]
+
+        requests = kinds.get("request", [])
+        phases = []
+        for phase in _REQUEST_PHASES:
+            times = [e[phase] for e in requests if e.get(phase, None) is not None]
+            if times:
+                phases.append(f"{phase} {sum(times) / len(times):.3f}")
+        if phases:
+            lines.append(f"request phases (mean s): {', '.join(phases)}")
+        results = {}
+        for event in kinds.get("cache", []):
+            results[event["result"]] = results.get(event["result"], 0) + 1
+        if results:
+            lines.append(
+                "cache: " + ", ".join(f"{n} {result}" for result, n in results.items())
+            )
+        return "\n".join(lines)
+
+
+class ResponseCache:
+    """
+    An on-disk cache for GitHub API responses, keyed by request URL
+    (including query parameters). Entries store the response body as
+    well as the server's `ETag` and `Last-Modified` validators, which
+    are sent with subsequent requests for the same URL. If nothing has
+    changed, GitHub answers with `304 Not Modified`, which does not
+    count against the API rate limit, and the cached body is returned.
+
+    Parameters
+    ----------
+    path : PathLike
+        The cache directory (default is `get_cache_dir() / "http"`)
+    ttl : float
+        Seconds for which an entry is considered fresh. Fresh entries are
+        returned without contacting the server at all. The default is 0,
+        i.e. always revalidate with a conditional request.
+    max_size : int
+        The maximum total size of the cache, in bytes. When exceeded,
+        the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: Optional[PathLike] = None,
+        ttl: float = 0,
+        max_size: int = 100 * 1024**2,
+    ):
+        if ttl < 0:
+            raise ValueError("ttl must be non-negative")
+        if max_size < 0:
+            raise ValueError("max_size must be non-negative")
+
+        self.path = Path(path).expanduser() if path else get_cache_dir() / "http"
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = Lock()
+        # the cache's total size, as of the last prune plus later writes.
+        # None until the cache directory is first scanned
+        self._size = None
+
+    def _entry_path(self, url: str) -> Path:
+        return self.path / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    @staticmethod
+    def _use(entry_path: Path):
+        # entry mtimes record last use, for LRU eviction. set them
+        # explicitly, as filesystem clocks can be coarser than this
+        t = time.time_ns()
+        try:
+            os.utime(entry_path, ns=(t, t))
+        except OSError:
+            pass
+
+    def get(self, url: str) -> Optional[dict]:
+        """
+        Get the cache entry for the given URL, or None if there is none.
+        Entries are dictionaries with keys `url`, `etag`, `last_modified`,
+        `link` (the pagination header), `stored` (epoch seconds) and `body`
+        (the response text).
+        """
+        entry_path = self._entry_path(url)
+        try:
+            with open(entry_path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url:
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Whether the given entry is younger than the cache's TTL."""
+        return self.ttl > 0 and time.time() - entry["stored"] < self.ttl
+
+    def put(self, url: str, body: str, headers=None) -> dict:
+        """
+        Store the response body for the given URL, with validators
+        taken from the response headers, if present.
+        """
+        headers = headers or {}
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag", None),
+            "last_modified": headers.get("Last-Modified", None),
+            "link": headers.get("Link", None),
+            "stored": time.time(),
+            "body": body,
+        }
+        self.path.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(url)
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{uuid4().hex}")
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        size = tmp_path.stat().st_size
+        try:
+            size -= entry_path.stat().st_size
+        except OSError:
+            pass
+        os.replace(tmp_path, entry_path)
+        self._use(entry_path)
+        # only scan the cache directory when this write may exceed the limit
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            prune = self._size is None or self._size > self.max_size
+        if prune:
+            self.prune()
+        return entry
+
+    def touch(self, url: str, revalidated: bool = False):
+        """
+        Mark the entry for the given URL as recently used. If `revalidated`,
+        the server has confirmed the entry is current, so its TTL restarts.
+        """
+        entry = self.get(url)
+        if entry is None:
+            return
+        if revalidated:
+            self.put(url, entry["body"], _entry_headers(entry))
+        else:
+            self._use(self._entry_path(url))
+
+    def prune(self, max_size: Optional[int] = None):
+        """
+        Evict least recently used entries until the cache is no larger than
+        `max_size` bytes (by default, the cache's configured maximum size).
+        """
+        max_size = self.max_size if max_size is None else max_size
+        with self._lock:
+            entries = []
+            for p in self.path.glob("*.json"):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, p))
+            total = sum(e[1] for e in entries)
+            for _, size, p in sorted(entries, key=lambda e: e[0]):
+                if total <= max_size:
+                    break
+                p.unlink(missing_ok=True)
+                total -= size
+            self._size = total
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        self.prune(max_size=0)
+
+
+def _entry_headers(entry: dict) -> dict:
+    """Reconstruct the response headers stored in a cache entry."""
+    return {
+        "ETag": entry["etag"],
+        "Last-Modified": entry["last_modified"],
+        "Link": entry.get("link", None),
+    }
+
+
+class _PooledResponse:
+    """
+    A response from a `GitHubClient`, mimicking those returned by
+    `urllib.request.urlopen`. When closed, the connection is returned
+    to the client's pool if the body was fully read, otherwise it is
+    closed.
+    """
+
+    def __init__(self, client, key, conn, resp, url):
+        self._client = client
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self.url = url
+        self.status = self.code = resp.status
+        self.reason = resp.reason
+        self.headers = resp.headers
+
+    def geturl(self) -> str:
+        return self.url
+
+    def getcode(self) -> int:
+        return self.status
+
+    def info(self):
+        return self.headers
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._resp.read(amt)
+
+    def readinto(self, b) -> int:
+        return self._resp.readinto(b)
+
+    def close(self):
+        if self._conn is None:
+            return
+        if self._resp.isclosed() and not self._resp.will_close:
+            self._client._release(self._key, self._conn)
+        else:
+            self._resp.close()
+            self._conn.close()
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RateLimiter:
+    """
+    A thread-safe scheduler for GitHub API requests. The rate limit budget
+    (`x-ratelimit-remaining` and `x-ratelimit-reset` headers) is read from
+    every response and tracked for each rate limit resource. While plenty
+    of requests remain, requests are sent immediately. Once the budget runs
+    low, requests are paced so the remainder lasts until the limit resets.
+    Each resource is paced separately, e.g. pacing `core` requests does not
+    delay `graphql` or `search` requests. If it is exhausted, or the server
+    asks to wait (`Retry-After`), callers wait until they may proceed
+    instead of failing. Retries of failed requests are spaced by
+    exponential backoff with jitter.
+
+    A limiter may be shared by several clients, e.g. one per thread.
+
+    Parameters
+    ----------
+    threshold : int
+        The number of remaining requests below which requests are paced
+    backoff : float
+        The base delay for retries, in seconds. The delay before the n-th
+        retry is drawn uniformly between 0 and `backoff * 2 ** (n - 1)`.
+    max_backoff : float
+        The maximum delay for retries, in seconds
+    max_wait : float
+        The longest time to wait for a rate limit to reset, in seconds.
+        If a longer wait is needed, a ValueError is raised instead.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 10,
+        backoff: float = 1,
+        max_backoff: float = 60,
+        max_wait: float = 3600,
+    ):
+        if threshold < 0:
+            raise ValueError("threshold must be non-negative")
+        if backoff < 0 or max_backoff < 0:
+            raise ValueError("backoff must be non-negative")
+        if max_wait < 0:
+            raise ValueError("max_wait must be non-negative")
+
+        self.threshold = threshold
+        self.backoff_base = backoff
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self._budgets = {}
+        self._blocked_until = 0.0
+        # the earliest time of the next request, for each paced resource
+        self._next = {}
+        self._lock = Lock()
+
+    def remaining(self, resource: str = "core") -> Optional[int]:
+        """The remaining budget for the resource, or None if unknown."""
+        with self._lock:
+            budget = self._budgets.get(resource, None)
+            if budget is None or budget[1] <= time.time():
+                return None
+            return budget[0]
+
+    def schedule(self, resource: str = "core") -> float:
+        """
+        Claim a request from the resource's budget, returning the number of
+        seconds to wait before sending it. Raises a ValueError if the wait
+        would be longer than `max_wait`.
+        """
+        with self._lock:
+            now = time.time()
+            start = max(now, self._blocked_until, self._next.get(resource, 0.0))
+            budget = self._budgets.get(resource, None)
+            if budget is not None and budget[1] <= now:
+                # the window has reset, the new budget is unknown
+                del self._budgets[resource]
+                budget = None
+            if budget is not None:
+                remaining, reset = budget
+                if remaining <= 0:
+                    # allow a second for clock skew
+                    start = max(start, reset + 1)
+                elif remaining <= self.threshold:
+                    # spread the remaining requests over the window
+                    self._next[resource] = start + (reset - start) / remaining
+                self._budgets[resource] = (remaining - 1, reset)
+            wait = start - now
+            if wait > self.max_wait:
+                raise ValueError(
+                    f"GitHub API rate limit exceeded (resets in {wait:.0f}s), "
+                    "use GITHUB_TOKEN env to bypass rate limit"
+                )
+            return wait
+
+    def acquire(self, resource: str = "core"):
+        """Wait until a request may be sent (see `schedule()`)."""
+        wait = self.schedule(resource)
+        if wait >= 10:
+            warn(f"GitHub API rate limit reached, waiting {wait:.0f}s")
+        if wait > 0:
+            _emit("wait", resource=resource, duration=wait)
+            time.sleep(wait)
+
+    def update(self, headers, status: Optional[int] = None) -> bool:
+        """
+        Record the rate limit state reported in a response's headers.
+        Returns whether the response is a rate limit error (status 429,
+        or 403 with an exhausted budget or a `Retry-After` header), in
+        which case the request may be sent again once scheduled.
+        """
+        resource = headers.get("x-ratelimit-resource", None) or "core"
+        remaining = headers.get("x-ratelimit-remaining", None)
+        reset = headers.get("x-ratelimit-reset", None)
+        retry_after = headers.get("Retry-After", None)
+        remaining = int(remaining) if remaining is not None else None
+        with self._lock:
+            if remaining is not None and reset is not None:
+                reset = float(reset)
+                budget = self._budgets.get(resource, None)
+                if budget is not None and budget[1] == reset:
+                    # responses to concurrent requests may arrive out of order
+                    remaining = min(remaining, budget[0])
+                self._budgets[resource] = (remaining, reset)
+            if retry_after is not None:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    delay = 60
+                self._blocked_until = max(self._blocked_until, time.time() + delay)
+        return status == 429 or (
+            status == 403 and (remaining == 0 or retry_after is not None)
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """The delay before the given retry (1 for the first), in seconds."""
+        ceiling = min(self.max_backoff, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+MIRROR_ENV = "MODFLOW_DEVTOOLS_MIRROR"
+
+
+def _mirrored(url: str) -> bool:
+    """Whether requests for the URL are answered by a mirror, if configured."""
+    host = urllib.parse.urlsplit(url).hostname or ""
+    return host in (
+        urllib.parse.urlsplit(GITHUB_API_URL).hostname,
+        "github.com",
+    ) or host.endswith(".githubusercontent.com")
+
+
+def _message(headers: dict) -> http.client.HTTPMessage:
+    message = http.client.HTTPMessage()
+    for k, v in headers.items():
+        message[k] = v
+    return message
+
+
+class _MirrorResponse:
+    """
+    A response from a mirror directory, mimicking those returned by
+    `urllib.request.urlopen`. The body is either bytes or a (path,
+    start, end) tuple selecting a byte range of a file.
+    """
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = self.code = status
+        self.reason = http.client.responses.get(status, "")
+        self.headers = _message(headers)
+        if isinstance(body, tuple):
+            file_path, start, end = body
+            self._file = open(file_path, "rb")
+            self._file.seek(start)
+            self._remaining = end - start
+        else:
+            self._file = BytesIO(body)
+            self._remaining = len(body)
+
+    def geturl(self) -> str:
+        return self.url
+
+    def getcode(self) -> int:
+        return self.status
+
+    def info(self):
+        return self.headers
+
+    def _read(self, amt: Optional[int] = None) -> bytes:
+        n = self._remaining if amt is None or amt < 0 else min(amt, self._remaining)
+        data = self._file.read(n)
+        self._remaining -= len(data)
+        return data
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._read(amt)
+
+    def readinto(self, b) -> int:
+        data = self._read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Mirror:
+    """
+    An offline mirror of GitHub release and artifact queries and downloads,
+    for machines without access to GitHub. When a client is configured with
+    a mirror, requests for the GitHub API, `github.com` and
+    `*.githubusercontent.com` URLs are answered from the mirror instead:
+    a URL `https://<host>/<path>` maps onto `<root>/<host>/<path>`. API
+    responses are stored in JSON files named after the path, e.g.
+
+        api.github.com/repos/<owner>/<name>/releases.json
+        api.github.com/repos/<owner>/<name>/releases/latest.json
+        api.github.com/repos/<owner>/<name>/releases/tags/<tag>.json
+        api.github.com/repos/<owner>/<name>/actions/artifacts.json
+        api.github.com/repos/<owner>/<name>/actions/artifacts/<id>/zip
+        github.com/<owner>/<name>/releases/download/<tag>/<asset>
+
+    Listings (JSON arrays, or objects with a `total_count` and an array,
+    like the artifact listing) are filtered by the query parameters the API
+    supports (e.g. an artifact `name`), then paginated according to the
+    `page` and `per_page` query parameters, like the API. Other files are served as
+    they are, with support for conditional and range requests.
+    `mirror_repo()` populates a mirror directory.
+
+    The mirror can also be served to other machines over HTTP, with
+    `make_server()`. A mirror whose root is the server's URL sends requests
+    to `<root>/<host>/<path>`.
+
+    Parameters
+    ----------
+    root : str or PathLike
+        The mirror directory, or the URL of a server serving one
+    """
+
+    # listing query parameters, and the item fields they must match
+    _FILTERS = {
+        "name": "name",
+        "branch": "head_branch",
+        "event": "event",
+        "head_sha": "head_sha",
+    }
+
+    def __init__(self, root: Union[str, PathLike]):
+        root = str(root)
+        if root.startswith(("http://", "https://")):
+            self.url = root.rstrip("/")
+            self.path = None
+        else:
+            self.url = None
+            self.path = Path(root).expanduser().absolute()
+
+    def __repr__(self) -> str:
+        return f"Mirror({self.url or str(self.path)!r})"
+
+    def locate(self, url: str) -> Path:
+        """Get the path the given URL maps onto in the mirror directory."""
+        if self.path is None:
+            raise ValueError("mirror is not a directory")
+        parts = urllib.parse.urlsplit(url)
+        names = [n for n in urllib.parse.unquote(parts.path).split("/") if n]
+        if ".." in names:
+            raise ValueError(f"invalid URL path: {url}")
+        return self.path.joinpath(parts.hostname, *names)
+
+    def _request(self, request) -> urllib.request.Request:
+        """Redirect the request to the mirror server, without credentials."""
+        parts = urllib.parse.urlsplit(request.full_url)
+        url = f"{self.url}/{parts.hostname}{parts.path}"
+        if parts.query:
+            url += f"?{parts.query}"
+        headers = {
+            k: v for k, v in request.header_items() if k.title() != "Authorization"
+        }
+        return urllib.request.Request(
+            url, request.data, headers, method=request.get_method()
+        )
+
+    def _respond(self, url: str, method: str = "GET", headers=None):
+        """
+        Answer a request from the mirror directory, returning the status,
+        the response headers and the body (see `_MirrorResponse`).
+        """
+        headers = {k.title(): v for k, v in (headers or {}).items()}
+        try:
+            file_path = self.locate(url)
+        except ValueError:
+            return 400, {"Content-Length": "0"}, b""
+        if file_path.is_file():
+            return self._respond_file(file_path, method, headers)
+        json_path = file_path.with_name(f"{file_path.name}.json")
+        if json_path.is_file():
+            return self._respond_json(url, json_path, method)
+        return 404, {"Content-Length": "0"}, b""
+
+    @staticmethod
+    def _respond_file(file_path: Path, method: str, headers: dict):
+        stat = file_path.stat()
+        size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        resp_headers = {
+            "Content-Type": "application/octet-stream",
+            "Accept-Ranges": "bytes",
+            "ETag": etag,
+        }
+        if headers.get("If-None-Match", None) == etag:
+            return 304, resp_headers, b""
+
+        status, start, end = 200, 0, size
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", headers.get("Range", ""))
+        if match and any(match.groups()) and headers.get("If-Range", etag) == etag:
+            first, last = match.groups()
+            if first:
+                start = int(first)
+                end = min(int(last) + 1, size) if last else size
+            else:
+                start = max(size - int(last), 0)
+            if start >= size:
+                return 416, {"Content-Range": f"bytes */{size}"}, b""
+            status = 206
+            resp_headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        resp_headers["Content-Length"] = str(end - start)
+        return (
+            status,
+            resp_headers,
+            b"" if method == "HEAD" else (file_path, start, end),
+        )
+
+    @classmethod
+    def _respond_json(cls, url: str, json_path: Path, method: str):
+        data = json.loads(json_path.read_text())
+        key = None
+        if isinstance(data, dict) and "total_count" in data:
+            key = next((k for k, v in data.items() if isinstance(v, list)), None)
+        items = data if isinstance(data, list) else data[key] if key else None
+
+        resp_headers = {"Content-Type": "application/json"}
+        if items is not None:
+            parts = urllib.parse.urlsplit(url)
+            query = dict(urllib.parse.parse_qsl(parts.query))
+            try:
+                per_page = int(query.get("per_page", 30))
+                page = int(query.get("page", 1))
+            except ValueError:
+                return 422, {"Content-Length": "0"}, b""
+            if per_page < 1 or page < 1:
+                return 422, {"Content-Length": "0"}, b""
+            filters = {
+                field: query[param]
+                for param, field in cls._FILTERS.items()
+                if param in query
+            }
+            if filters:
+                items = [
+                    item
+                    for item in items
+                    if isinstance(item, dict)
+                    and all(str(item.get(f, "")) == v for f, v in filters.items())
+                ]
+                if key is not None:
+                    data = {**data, "total_count": len(items)}
+            selected = items[(page - 1) * per_page : page * per_page]
+            data = selected if key is None else {**data, key: selected}
+            last = max(-(-len(items) // per_page), 1)
+            if last > 1:
+
+                def link(page, rel):
+                    page_query = urllib.parse.urlencode({**query, "page": page})
+                    page_url = urllib.parse.urlunsplit(parts._replace(query=page_query))
+                    return f'<{page_url}>; rel="{rel}"'
+
+                links = [link(page + 1, "next")] if page < last else []
+                resp_headers["Link"] = ", ".join([*links, link(last, "last")])
+
+        body = json.dumps(data).encode()
+        resp_headers["Content-Length"] = str(len(body))
+        return 200, resp_headers, b"" if method == "HEAD" else body
+
+    def _open(self, request, response_type=_MirrorResponse):
+        """Answer the request from the mirror directory."""
+        url = request.full_url
+        status, headers, body = self._respond(
+            url, request.get_method(), dict(request.header_items())
+        )
+        if status >= 300:
+            raise urllib.error.HTTPError(
+                url,
+                status,
+                http.client.responses.get(status, ""),
+                _message(headers),
+                BytesIO(b""),
+            )
+        return response_type(url, status, headers, body)
+
+    def make_server(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Create an HTTP server for the mirror directory, so other machines
+        can use it via `Mirror("http://<host>:<port>")`. The server is not
+        started: call its `serve_forever()` method (e.g. on a thread), and
+        `shutdown()` to stop it. The default port 0 picks a free port, see
+        the server's `server_address`.
+        """
+        if self.path is None:
+            raise ValueError("only a mirror directory can be served")
+        mirror = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                host, _, path = self.path.lstrip("/").partition("/")
+                status, headers, body = mirror._respond(
+                    f"https://{host}/{path}", self.command, dict(self.headers)
+                )
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                if not isinstance(body, tuple):
+                    self.wfile.write(body)
+                    return
+                file_path, start, end = body
+                with open(file_path, "rb") as f:
+                    f.seek(start)
+                    remaining = end - start
+                    while remaining > 0:
+                        chunk = f.read(min(DEFAULT_CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        self.wfile.write(chunk)
+                        remaining -= len(chunk)
+
+            do_HEAD = do_GET
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+
+def _connect(conn: http.client.HTTPConnection) -> dict:
+    """
+    Open the connection's socket, like `HTTPConnection.connect()`, timing the
+    DNS lookup, the TCP connection and (for HTTPS) the TLS handshake.
+    """
+    tic = time.perf_counter()
+    addresses = socket.getaddrinfo(conn.host, conn.port, 0, socket.SOCK_STREAM)
+    dns = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    error = OSError(f"cannot resolve {conn.host}")
+    for family, type_, proto, _, address in addresses:
+        sock = socket.socket(family, type_, proto)
+        try:
+            sock.settimeout(conn.timeout)
+            sock.connect(address)
+            break
+        except OSError as err:
+            sock.close()
+            error = err
+    else:
+        raise error
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    connect = time.perf_counter() - tic
+
+    tls = None
+    if isinstance(conn, http.client.HTTPSConnection):
+        tic = time.perf_counter()
+        try:
+            sock = conn._context.wrap_socket(sock, server_hostname=conn.host)
+        except OSError:
+            sock.close()
+            raise
+        tls = time.perf_counter() - tic
+    conn.sock = sock
+    return {"dns": dns, "connect": connect, "tls": tls}
+
+
+class GitHubClient:
+    """
+    A reusable HTTP client for the GitHub API and release/artifact
+    downloads. Persistent (keep-alive) connections are kept in a small
+    pool per host, so repeated requests do not pay for a new TCP and
+    TLS handshake each time. The client also carries the settings
+    shared by all requests: authentication token, timeout, number of
+    retries, (optionally) a response cache, and a rate limiter which
+    paces requests to the GitHub API and waits out rate limit errors.
+
+    All functions in this module accept a `client` argument. If none is
+    provided, the default client is used (see `get_default_client()`).
+
+    Requests are sent via `urllib` instead of the pool if a proxy is
+    configured for the URL's host.
+
+    Parameters
+    ----------
+    token : str
+        GitHub API token (default is None, which uses the `GITHUB_TOKEN`
+        environment variable, if set)
+    timeout : float
+        Timeout for blocking socket operations, in seconds
+    retries : int
+        The default maximum number of retries for each request
+    cache : ResponseCache
+        Optional default cache for API responses
+    pool_size : int
+        The maximum number of idle connections to keep per host
+    rate_limiter : RateLimiter
+        The scheduler for API requests (default is a new `RateLimiter`)
+    mirror : Mirror, str or PathLike
+        An offline mirror to answer requests for GitHub URLs from: a `Mirror`,
+        or a mirror directory or server URL (default is None, which uses the
+        `MODFLOW_DEVTOOLS_MIRROR` environment variable, if set)
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        timeout: float = 10,
+        retries: int = 3,
+        cache: Optional[ResponseCache] = None,
+        pool_size: int = 4,
+        rate_limiter: Optional[RateLimiter] = None,
+        mirror: Union[Mirror, str, PathLike, None] = None,
+    ):
+        if not isinstance(retries, int) or retries < 1:
+            raise ValueError("retries must be a positive int")
+        if not isinstance(pool_size, int) or pool_size < 1:
+            raise ValueError("pool_size must be a positive int")
+
+        self.token = token
+        self.timeout = timeout
+        self.retries = retries
+        self.cache = cache
+        self.pool_size = pool_size
+        self.rate_limiter = rate_limiter or RateLimiter()
+        mirror = mirror or os.environ.get(MIRROR_ENV, None)
+        self.mirror = (
+            mirror if mirror is None or isinstance(mirror, Mirror) else Mirror(mirror)
+        )
+        self._pool = {}
+        self._lock = Lock()
+
+    def _acquire(self, key) -> Tuple[http.client.HTTPConnection, bool]:
+        """Get an idle connection to the given host, or a new one."""
+        with self._lock:
+            idle = self._pool.get(key, [])
+            if idle:
+                return idle.pop(), True
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        return conn, False
+
+    def _release(self, key, conn):
+        """Return a connection to the pool, or close it if the pool is full."""
+        with self._lock:
+            idle = self._pool.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            pool, self._pool = self._pool, {}
+        for idle in pool.values():
+            for conn in idle:
+                conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def urlopen(self, request, timeout: Optional[float] = None):
+        """
+        Send a `urllib.request.Request` over a pooled connection, following
+        redirects. Like `urllib.request.urlopen`, HTTP error statuses (and
+        `304 Not Modified`) raise `urllib.error.HTTPError`. The response
+        should be closed (e.g. used as a context manager) when done with,
+        so its connection can be reused.
+
+        Requests to the GitHub API are scheduled by the client's rate
+        limiter, and sent again (up to `retries` times) if rejected by a
+        rate limit. If the client has a mirror, requests for GitHub URLs
+        are answered by the mirror instead.
+        """
+        url = request.full_url
+        if self.mirror is not None and _mirrored(url):
+            if self.mirror.path is not None:
+                return self.mirror._open(request)
+            return self._send(self.mirror._request(request), timeout)
+        if not url.startswith(GITHUB_API_URL):
+            return self._send(request, timeout)
+
+        resource = "graphql" if url.endswith("/graphql") else "core"
+        tries = 0
+        while True:
+            tries += 1
+            self.rate_limiter.acquire(resource)
+            try:
+                response = self._send(request, timeout)
+            except urllib.error.HTTPError as err:
+                limited = self.rate_limiter.update(err.headers, err.code)
+                if limited and tries < self.retries:
+                    warn(f"URL request try {tries} was rate-limited ({err})")
+                    _emit("retry", url=request.full_url, attempt=tries, error=str(err))
+                    continue
+                raise
+            self.rate_limiter.update(response.headers, response.status)
+            return response
+
+    def _send(self, request, timeout: Optional[float] = None):
+        timeout = self.timeout if timeout is None else timeout
+        url = request.full_url
+        method = request.get_method()
+        body = request.data
+        headers = {k.title(): v for k, v in request.header_items()}
+        headers.setdefault("User-Agent", USER_AGENT)
+        token = self.token or os.environ.get("GITHUB_TOKEN", None)
+        if token and "github.com" in urllib.parse.urlsplit(url).netloc:
+            headers["Authorization"] = f"Bearer {token}"
+
+        for _ in range(10):
+            parts = urllib.parse.urlsplit(url)
+            if parts.scheme not in ("http", "https"):
+                raise ValueError(f"unsupported URL scheme: {url}")
+            if urllib.request.getproxies().get(parts.scheme) and not (
+                urllib.request.proxy_bypass(parts.hostname)
+            ):
+                proxied = urllib.request.Request(url, body, headers, method=method)
+                return urllib.request.urlopen(proxied, timeout=timeout)
+
+            default_port = 443 if parts.scheme == "https" else 80
+            key = (parts.scheme, parts.hostname, parts.port or default_port)
+            path = parts.path or "/"
+            if parts.query:
+                path += f"?{parts.query}"
+
+            conn, reused = self._acquire(key)
+            timings = {"dns": None, "connect": None, "tls": None}
+            try:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                else:
+                    timings = _connect(conn)
+                tic = time.perf_counter()
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                ttfb = time.perf_counter() - tic
+            except (http.client.HTTPException, OSError) as err:
+                conn.close()
+                _emit(
+                    "request",
+                    url=url,
+                    method=method,
+                    status=None,
+                    reused=reused,
+                    error=str(err),
+                    **timings,
+                )
+                if reused and isinstance(
+                    err, (http.client.HTTPException, ConnectionError)
+                ):
+                    # the server closed the idle connection, try a fresh one
+                    continue
+                raise urllib.error.URLError(err) from err
+
+            _emit(
+                "request",
+                url=url,
+                method=method,
+                status=resp.status,
+                reused=reused,
+                ttfb=ttfb,
+                **timings,
+            )
+            response = _PooledResponse(self, key, conn, resp, url)
+            if resp.status in (301, 302, 303, 307, 308) and "Location" in resp.headers:
+                resp.read()
+                response.close()
+                location = urllib.parse.urljoin(url, resp.headers["Location"])
+                if urllib.parse.urlsplit(location).netloc != parts.netloc:
+                    # don't send credentials to other hosts (e.g. storage
+                    # redirects for release assets, which are pre-signed)
+                    headers.pop("Authorization", None)
+                if resp.status == 303 or (
+                    resp.status in (301, 302) and method == "POST"
+                ):
+                    method, body = "GET", None
+                url = location
+                continue
+            if resp.status >= 300:
+                content = resp.read()
+                response.close()
+                raise urllib.error.HTTPError(
+                    url, resp.status, resp.reason, resp.headers, BytesIO(content)
+                )
+            return response
+
+        raise urllib.error.URLError(f"too many redirects for {request.full_url}")
+
+
+_default_client: Optional[GitHubClient] = None
+_default_client_lock = Lock()
+
+
+def get_default_client() -> GitHubClient:
+    """
+    Get the module's default `GitHubClient`, which is used by all functions
+    in this module unless a client is passed explicitly.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = GitHubClient()
+        return _default_client
+
+
+def set_default_client(client: Optional[GitHubClient]):
+    """
+    Set the module's default `GitHubClient`. If None, a new client with
+    default settings is created when next needed.
+    """
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+
+def get_request(url, params={}, cache: Optional[ResponseCache] = None):
     """
     Get urllib.request.Request, with parameters and headers.
 
     This bears a GitHub API authentication token if github.com is
     in the URL and the GITHUB_TOKEN environment variable is set.
 
+    If a response cache is provided and has an entry for the URL, the
+    entry's validators are attached so the request is conditional.
+
     Originally written by Mike Toews (mwtoews@gmail.com) for FloPy.
     """
     if isinstance(params, dict):
@@ -34,14 +1177,123 @@ def get_request(url, params={}):
         if github_token:
             headers["Authorization"] = f"Bearer {github_token}"
 
+    if cache is not None:
+        entry = cache.get(url)
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
     return urllib.request.Request(url, headers=headers)
 
 
+def get_json(
+    request,
+    cache: Optional[ResponseCache] = None,
+    timeout: Optional[float] = None,
+    client: Optional[GitHubClient] = None,
+):
+    """
+    Send the request and parse the response body as JSON. If a response cache
+    is provided, fresh entries are returned without contacting the server, a
+    `304 Not Modified` response is answered from the cache, and successful
+    responses are stored. HTTP errors are raised as `urllib.error.HTTPError`.
+    The request is sent with the given client (default is the module's default
+    client), with the client's timeout unless another is provided.
+    """
+    return _get_json(request, cache=cache, timeout=timeout, client=client)[0]
+
+
+def _get_json(request, cache=None, timeout=None, client=None):
+    """Like `get_json`, but also return the response headers."""
+    client = client or get_default_client()
+    url = request.full_url
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        cache.touch(url)
+        _emit("cache", url=url, cache="response", result="hit")
+        return json.loads(entry["body"]), _entry_headers(entry)
+
+    try:
+        with client.urlopen(request, timeout=timeout) as resp:
+            body = resp.read().decode()
+            remaining = resp.headers.get("x-ratelimit-remaining", None)
+            if remaining is not None and int(remaining) <= 10:
+                warn(
+                    f"Only {remaining} GitHub API requests remaining "
+                    "before rate-limiting"
+                )
+            if cache is not None:
+                cache.put(url, body, resp.headers)
+                _emit("cache", url=url, cache="response", result="miss")
+            return json.loads(body), resp.headers
+    except urllib.error.HTTPError as err:
+        if err.code == 304 and entry is not None:
+            cache.touch(url, revalidated=True)
+            _emit("cache", url=url, cache="response", result="revalidated")
+            return json.loads(entry["body"]), _entry_headers(entry)
+        raise
+
+
+def _last_page(headers) -> Optional[int]:
+    """Get the last page number from a paginated response's `Link` header."""
+    link = headers.get("Link", None) or ""
+    match = re.search(r'<([^>]+)>;\s*rel="last"', link)
+    if match is None:
+        return None
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(match.group(1)).query)
+    try:
+        return int(query["page"][0])
+    except (KeyError, ValueError):
+        return None
+
+
+def _get_page(req_url, params, page, retries=3, cache=None, msg=None, client=None):
+    """
+    Get a page of a paginated API listing, returning the parsed JSON and the
+    response headers. 404 and 503 responses are retried, as GitHub sometimes
+    returns these for valid URLs. If a message is provided, it is printed.
+    """
+    client = client or get_default_client()
+    tries = 0
+    request = get_request(req_url, params={**params, "page": page}, cache=cache)
+    while True:
+        tries += 1
+        try:
+            if msg:
+                print(msg)
+            return _get_json(request, cache=cache, client=client)
+        except urllib.error.HTTPError as err:
+            if err.code == 401 and os.environ.get("GITHUB_TOKEN"):
+                raise ValueError("GITHUB_TOKEN env is invalid") from err
+            elif err.code == 403 and "rate limit exceeded" in err.reason:
+                raise ValueError(
+                    f"use GITHUB_TOKEN env to bypass rate limit ({err})"
+                ) from err
+            elif err.code in (404, 503) and tries < retries:
+                # GitHub sometimes returns this error for valid URLs, so retry
+                warn(f"URL request try {tries} failed ({err})")
+                _emit("retry", url=request.full_url, attempt=tries, error=str(err))
+                time.sleep(client.rate_limiter.backoff(tries))
+                continue
+            raise RuntimeError(f"cannot retrieve data from {req_url}") from err
+
+
 def get_releases(
-    repo, per_page=30, max_pages=10, retries=3, verbose=False
+    repo,
+    per_page=30,
+    max_pages=10,
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    max_workers=4,
+    client: Optional[GitHubClient] = None,
 ) -> List[dict]:
     """
-    Get available releases for the given repository.
+    Get available releases for the given repository. After the first page,
+    the number of remaining pages is read from the response's `Link` header
+    and they are fetched concurrently, then reassembled in order.
 
     Parameters
     ----------
@@ -52,63 +1304,65 @@ def get_releases(
     max_pages : int
         The maximum number of pages to retrieve
     retries : int
-        The maximum number of retries for each request
+        The maximum number of retries for each request (default is the client's)
     verbose : bool
         Whether to suppress verbose output
+    cache : ResponseCache
+        Optional cache for API responses (default is the client's)
+    max_workers : int
+        The maximum number of pages to fetch concurrently
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
     """
 
     if "/" not in repo:
         raise ValueError("repo format must be owner/name")
 
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    cache = client.cache if cache is None else cache
     if not isinstance(retries, int) or retries < 1:
         raise ValueError("retries must be a positive int")
 
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("max_workers must be a positive int")
+
     params = {}
     if per_page is not None:
         if per_page < 1 or per_page > 100:
             raise ValueError("per_page must be between 1 and 100")
         params["per_page"] = per_page
 
-    req_url = f"https://api.github.com/repos/{repo}/releases"
-    page = 1
+    req_url = f"{GITHUB_API_URL}/repos/{repo}/releases"
 
-    def get_response_json():
-        tries = 0
-        params["page"] = page
-        request = get_request(req_url, params=params)
-        while True:
-            tries += 1
-            try:
-                if verbose:
-                    print(
-                        f"Fetching releases for "
-                        f"repo {repo} "
-                        f"(page {page}, "
-                        f"{per_page} per page)"
-                    )
-                with urllib.request.urlopen(request, timeout=10) as resp:
-                    return json.loads(resp.read().decode())
-            except urllib.error.HTTPError as err:
-                if err.code == 401 and os.environ.get("GITHUB_TOKEN"):
-                    raise ValueError("GITHUB_TOKEN is invalid") from err
-                elif err.code == 403 and "rate limit exceeded" in err.reason:
-                    raise ValueError(
-                        f"use GITHUB_TOKEN env to bypass rate limit ({err})"
-                    ) from err
-                elif err.code in (404, 503) and tries < retries:
-                    # GitHub sometimes returns this error for valid URLs, so retry
-                    warn(f"URL request try {tries} failed ({err})")
-                    continue
-                raise RuntimeError(f"cannot retrieve data from {req_url}") from err
+    def get_response_json(page):
+        msg = f"Fetching releases for repo {repo} (page {page}, {per_page} per page)"
+        return _get_page(
+            req_url,
+            params,
+            page,
+            retries,
+            cache,
+            msg=msg if verbose else None,
+            client=client,
+        )
 
-    releases = []
+    page_size = per_page or 30
     max_pages = max_pages if max_pages else sys.maxsize
-    while page <= max_pages:
-        rels = get_response_json()
-        page += 1
-        releases.extend(rels)
-        if not any(rels) or len(rels) < per_page:
-            break
+    releases, headers = get_response_json(1)
+    last = _last_page(headers)
+    if last is not None:
+        # the link header says how many pages remain, fetch them concurrently
+        pages = range(2, min(last, max_pages) + 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for rels, _ in pool.map(get_response_json, pages):
+                releases.extend(rels)
+    else:
+        page, rels = 1, releases
+        while any(rels) and len(rels) >= page_size and page < max_pages:
+            page += 1
+            rels, _ = get_response_json(page)
+            releases.extend(rels)
 
     if verbose:
         print(f"Found {len(releases)} releases for {repo}")
@@ -116,20 +1370,3564 @@ def get_releases(
     return releases
 
 
-def get_release(repo, tag="latest", retries=3, verbose=False) -> dict:
+def iter_releases(
+    repo,
+    per_page=30,
+    max_pages=None,
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    predicate: Optional[Callable[[dict], bool]] = None,
+    client: Optional[GitHubClient] = None,
+) -> Iterator[dict]:
     """
-    Get info about a particular repository release.
+    Lazily iterate over the given repository's releases, newest first.
+    Pages are only fetched as the consumer asks for more releases, so a
+    search which stops early (e.g. with `next()`) only makes as many
+    requests as needed to find a match.
 
     Parameters
     ----------
-    repo : str
+    repo: str
         The repository (format must be owner/name)
-    tag : str
-        The release tag to retrieve assets for
+    per_page : int
+        The number of releases to fetch per page (must be between 1-100, inclusive)
+    max_pages : int
+        The maximum number of pages to retrieve (default is None, no limit)
     retries : int
-        The maximum number of retries for each request
+        The maximum number of retries for each request (default is the client's)
     verbose : bool
-        Whether to suppress verbose output
+        Whether to show verbose output
+    cache : ResponseCache
+        Optional cache for API responses (default is the client's)
+    predicate : callable
+        Optional filter. If provided, only releases for which it returns
+        True are yielded.
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+
+    Yields
+    ------
+        Dictionaries containing release information as returned by the GitHub API.
+    """
+
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    cache = client.cache if cache is None else cache
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
+    params = {}
+    if per_page is not None:
+        if per_page < 1 or per_page > 100:
+            raise ValueError("per_page must be between 1 and 100")
+        params["per_page"] = per_page
+
+    return _iter_releases(
+        repo, params, max_pages, retries, verbose, cache, predicate, client
+    )
+
+
+def _iter_releases(repo, params, max_pages, retries, verbose, cache, predicate, client):
+    # a separate generator function, so the arguments are validated eagerly
+    req_url = f"{GITHUB_API_URL}/repos/{repo}/releases"
+    page_size = params.get("per_page", 30)
+    max_pages = max_pages if max_pages else sys.maxsize
+    page = 0
+    while page < max_pages:
+        page += 1
+        msg = f"Fetching releases for repo {repo} (page {page}, {page_size} per page)"
+        rels, _ = _get_page(
+            req_url,
+            params,
+            page,
+            retries,
+            cache,
+            msg=msg if verbose else None,
+            client=client,
+        )
+        for release in rels:
+            if predicate is None or predicate(release):
+                yield release
+        if len(rels) < page_size:
+            break
+
+
+def get_release(
+    repo,
+    tag="latest",
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    client: Optional[GitHubClient] = None,
+) -> dict:
+    """
+    Get info about a particular repository release.
+
+    Parameters
+    ----------
+    repo : str
+        The repository (format must be owner/name)
+    tag : str
+        The release tag to retrieve assets for
+    retries : int
+        The maximum number of retries for each request (default is the client's)
+    verbose : bool
+        Whether to suppress verbose output
+    cache : ResponseCache
+        Optional cache for API responses (default is the client's)
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+    """
+
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
+
+    if not isinstance(tag, str) or not any(tag):
+        raise ValueError("tag must be a non-empty string")
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    cache = client.cache if cache is None else cache
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
+    req_url = f"{GITHUB_API_URL}/repos/{repo}"
+    req_url = (
+        f"{req_url}/releases/latest"
+        if tag == "latest"
+        else f"{req_url}/releases/tags/{tag}"
+    )
+    request = get_request(req_url, cache=cache)
+    releases = None
+    num_tries = 0
+
+    while True:
+        num_tries += 1
+        try:
+            release = get_json(request, cache=cache, client=client)
+            break
+        except urllib.error.HTTPError as err:
+            if err.code == 401 and os.environ.get("GITHUB_TOKEN"):
+                raise ValueError("GITHUB_TOKEN env is invalid") from err
+            elif err.code == 403 and "rate limit exceeded" in err.reason:
+                raise ValueError(
+                    f"use GITHUB_TOKEN env to bypass rate limit ({err})"
+                ) from err
+            elif err.code == 404:
+                if releases is None:
+                    releases = get_releases(
+                        repo, verbose=verbose, cache=cache, client=client
+                    )
+                tags = [r["tag_name"] for r in releases]
+                if tag not in tags:
+                    raise ValueError(
+                        f"Release {tag} not found (choose from {', '.join(tags)})"
+                    )
+            elif err.code == 503 and num_tries < retries:
+                # GitHub sometimes returns this error for valid URLs, so retry
+                warn(f"URL request {num_tries} failed ({err})")
+                _emit("retry", url=request.full_url, attempt=num_tries, error=str(err))
+                time.sleep(client.rate_limiter.backoff(num_tries))
+                continue
+            raise RuntimeError(f"cannot retrieve data from {req_url}") from err
+
+    tag_name = release["tag_name"]
+    if verbose:
+        print(f"fetched release {tag_name!r} info from {repo}")
+
+    return release
+
+
+def get_latest_version(
+    repo,
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    client: Optional[GitHubClient] = None,
+) -> str:
+    """
+    Get the repository's latest release version tag.
+
+    Parameters
+    ----------
+    repo : str
+        The repository (format must be owner/name)
+    retries : int
+        The maximum number of retries for each request (default is the client's)
+    verbose : bool
+        Whether to show verbose output
+    cache : ResponseCache
+        Optional cache for API responses (default is the client's)
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+
+    Returns
+    -------
+        The latest release tag name (a string).
+    """
+
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    cache = client.cache if cache is None else cache
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
+    release = get_release(
+        repo, retries=retries, verbose=verbose, cache=cache, client=client
+    )
+    return release["tag_name"]
+
+
+def get_release_assets(
+    repo,
+    tag="latest",
+    simple=False,
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    client: Optional[GitHubClient] = None,
+) -> Union[dict, List[dict]]:
+    """
+    Get assets corresponding to the given release.
+
+    Parameters
+    ----------
+    repo : str
+        The repository (format must be owner/name)
+    tag : str
+        The release tag to retrieve assets for
+    simple : bool
+        If True, return a dict mapping asset names to download URLs, otherwise (by
+        default) a list of dicts containing asset info as returned by the GitHub API
+    retries : int
+        The maximum number of retries for each request (default is the client's)
+    verbose : bool
+        Whether to show verbose output
+    cache : ResponseCache
+        Optional cache for API responses (default is the client's)
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+
+    Returns
+    -------
+        A list of dicts if simple is False, one per release asset.
+        If simple is True, a dict mapping asset names to download URLs.
+    """
+
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
+
+    if not isinstance(tag, str) or not any(tag):
+        raise ValueError("tag must be a non-empty string")
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    cache = client.cache if cache is None else cache
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
+    release = get_release(
+        repo, tag=tag, retries=retries, verbose=verbose, cache=cache, client=client
+    )
+    return (
+        {a["name"]: a["browser_download_url"] for a in release["assets"]}
+        if simple
+        else release["assets"]
+    )
+
+
+_RELEASE_FIELDS = """
+fragment release on Release {
+  databaseId
+  name
+  tagName
+  url
+  isDraft
+  isPrerelease
+  createdAt
+  publishedAt
+  description
+  author { login }
+  releaseAssets(first: 100) {
+    pageInfo { hasNextPage }
+    nodes {
+      name
+      contentType
+      size
+      downloadCount
+      downloadUrl
+      createdAt
+      updatedAt
+    }
+  }
+}
+"""
+
+
+def _graphql_release(repo: str, release: dict) -> dict:
+    """Convert a GraphQL release to the shape the REST API returns."""
+    api_url = f"{GITHUB_API_URL}/repos/{repo}/releases/{release['databaseId']}"
+    return {
+        "id": release["databaseId"],
+        "url": api_url,
+        "assets_url": f"{api_url}/assets",
+        "html_url": release["url"],
+        "tag_name": release["tagName"],
+        "name": release["name"],
+        "draft": release["isDraft"],
+        "prerelease": release["isPrerelease"],
+        "created_at": release["createdAt"],
+        "published_at": release["publishedAt"],
+        "body": release["description"],
+        "author": release["author"],
+        "assets": [
+            {
+                "name": asset["name"],
+                "content_type": asset["contentType"],
+                "size": asset["size"],
+                "download_count": asset["downloadCount"],
+                "browser_download_url": asset["downloadUrl"],
+                "created_at": asset["createdAt"],
+                "updated_at": asset["updatedAt"],
+            }
+            for asset in release["releaseAssets"]["nodes"]
+        ],
+    }
+
+
+def get_release_batch(
+    repos: Union[List[str], Dict[str, str]],
+    tag="latest",
+    retries=None,
+    verbose=False,
+    client: Optional[GitHubClient] = None,
+) -> Dict[str, dict]:
+    """
+    Get releases of several repositories with a single request to the
+    GitHub GraphQL API. Releases are returned in the same form as by
+    `get_release`, except that assets lack their (REST) IDs. Releases
+    with more than 100 assets are completed via the REST API.
+
+    The GraphQL API requires authentication: a token must be configured
+    on the client or in the `GITHUB_TOKEN` environment variable. If the
+    client has a mirror, which cannot answer GraphQL queries, releases
+    are instead looked up one at a time with `get_release`.
+
+    Parameters
+    ----------
+    repos : list or dict
+        The repositories (format must be owner/name), or a dict mapping
+        repositories to the release tags to retrieve
+    tag : str
+        The release tag to retrieve for repositories given in a list
+        (default is the latest release)
+    retries : int
+        The maximum number of retries for the request (default is the client's)
+    verbose : bool
+        Whether to show verbose output
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+
+    Returns
+    -------
+        A dict mapping each repository to its release.
+    """
+
+    if not isinstance(repos, dict):
+        repos = {repo: tag for repo in repos}
+    if not any(repos):
+        raise ValueError("repos must not be empty")
+    for repo, repo_tag in repos.items():
+        if "/" not in repo:
+            raise ValueError("repo format must be owner/name")
+        if not isinstance(repo_tag, str) or not any(repo_tag):
+            raise ValueError("tag must be a non-empty string")
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+    if client.mirror is not None:
+        return {
+            repo: get_release(
+                repo, repo_tag, retries=retries, verbose=verbose, client=client
+            )
+            for repo, repo_tag in repos.items()
+        }
+    if not (client.token or os.environ.get("GITHUB_TOKEN", None)):
+        raise ValueError("the GraphQL API requires a token, set GITHUB_TOKEN env")
+
+    # alias a repository field per repo, passing names and tags as
+    # variables so they need no escaping
+    params, fields, variables = [], [], {}
+    for i, (repo, repo_tag) in enumerate(repos.items()):
+        owner, name = repo.split("/", 1)
+        params += [f"$o{i}: String!", f"$n{i}: String!"]
+        variables.update({f"o{i}": owner, f"n{i}": name})
+        if repo_tag == "latest":
+            release = "latestRelease { ...release }"
+        else:
+            params.append(f"$t{i}: String!")
+            variables[f"t{i}"] = repo_tag
+            release = f"release(tagName: $t{i}) {{ ...release }}"
+        fields.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ {release} }}")
+    query = f"query({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}"
+    query += _RELEASE_FIELDS
+
+    req_url = f"{GITHUB_API_URL}/graphql"
+    data = json.dumps({"query": query, "variables": variables}).encode()
+    request = urllib.request.Request(
+        req_url, data=data, headers={"Content-Type": "application/json"}
+    )
+    if verbose:
+        print(f"Fetching releases for {len(repos)} repos with GraphQL")
+
+    tries = 0
+    while True:
+        tries += 1
+        try:
+            result = get_json(request, client=client)
+            break
+        except urllib.error.HTTPError as err:
+            if err.code == 401:
+                raise ValueError("GITHUB_TOKEN env is invalid") from err
+            elif err.code == 403 and "rate limit exceeded" in err.reason:
+                raise ValueError(
+                    f"use GITHUB_TOKEN env to bypass rate limit ({err})"
+                ) from err
+            elif err.code in (502, 503) and tries < retries:
+                # GitHub sometimes returns these errors for valid queries, so retry
+                warn(f"URL request try {tries} failed ({err})")
+                _emit("retry", url=request.full_url, attempt=tries, error=str(err))
+                time.sleep(client.rate_limiter.backoff(tries))
+                continue
+            raise RuntimeError(f"cannot retrieve data from {req_url}") from err
+
+    data = result.get("data", None) or {}
+    if not data and result.get("errors", None):
+        messages = "; ".join(e.get("message", "") for e in result["errors"])
+        raise RuntimeError(f"GraphQL query failed: {messages}")
+
+    releases = {}
+    for i, (repo, repo_tag) in enumerate(repos.items()):
+        repository = data.get(f"r{i}", None)
+        if repository is None:
+            raise ValueError(f"Repository {repo} not found")
+        release = repository.get("latestRelease" if repo_tag == "latest" else "release")
+        if release is None:
+            raise ValueError(f"Release {repo_tag} of {repo} not found")
+        if release["releaseAssets"]["pageInfo"]["hasNextPage"]:
+            releases[repo] = get_release(
+                repo, tag=release["tagName"], retries=retries, client=client
+            )
+        else:
+            releases[repo] = _graphql_release(repo, release)
+
+    if verbose:
+        print(f"fetched {len(releases)} releases with GraphQL")
+
+    return releases
+
+
+def list_artifacts(
+    repo,
+    name=None,
+    per_page=30,
+    max_pages=10,
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    max_workers=4,
+    run_id: Optional[int] = None,
+    client: Optional[GitHubClient] = None,
+) -> List[dict]:
+    """
+    List artifacts for the given repository, optionally filtering by name (exact match).
+    If more artifacts are available than will fit within the given page size, by default
+    requests are made until all artifacts are retrieved. The number of requests made can
+    be limited with the max_pages parameter. Pages after the first are fetched
+    concurrently, since the first reports the total number of artifacts.
+
+    Parameters
+    ----------
+    repo : str
+        The repository (format must be owner/name)
+    name : str
+        The artifact name (must be an exact match)
+    per_page : int
+        The number of artifacts to return per page (must be between 1-100, inclusive)
+    max_pages : int
+        The maximum number of pages to retrieve (i.e. the number of requests to make)
+    retries : int
+        The maximum number of retries for each request (default is the client's)
+    verbose : bool
+        Whether to show verbose output
+    cache : ResponseCache
+        Optional cache for API responses (default is the client's)
+    max_workers : int
+        The maximum number of pages to fetch concurrently
+    run_id : int
+        Optional workflow run ID, to list only artifacts uploaded by the run
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+
+    Returns
+    -------
+        A list of dictionaries, each containing information
+        about an artifact as returned by the GitHub API.
+    """
+
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    cache = client.cache if cache is None else cache
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("max_workers must be a positive int")
+
+    msg = f"artifact(s) for {repo}" + (f" matching name {name}" if name else "")
+    req_url = f"{GITHUB_API_URL}/repos/{repo}/actions/artifacts"
+    if run_id is not None:
+        msg += f" from run {run_id}"
+        req_url = f"{GITHUB_API_URL}/repos/{repo}/actions/runs/{run_id}/artifacts"
+    params = {}
+
+    if name is not None:
+        if not isinstance(name, str) or len(name) == 0:
+            raise ValueError("name must be a non-empty string")
+        params["name"] = name
+
+    if per_page is not None:
+        if per_page < 1 or per_page > 100:
+            raise ValueError("per_page must be between 1 and 100")
+        params["per_page"] = int(per_page)
+
+    def get_response_json(page):
+        page_msg = f"Fetching {msg} (page {page}, {per_page} per page)"
+        return _get_page(
+            req_url,
+            params,
+            page,
+            retries,
+            cache,
+            msg=page_msg if verbose else None,
+            client=client,
+        )[0]
+
+    max_pages = max_pages if max_pages else sys.maxsize
+    result = get_response_json(1)
+    total = result["total_count"]
+    if verbose:
+        print(f"Repo {repo} has {total} artifact(s)")
+    artifacts = result["artifacts"]
+
+    # the total count says how many pages remain, fetch them concurrently
+    page_size = per_page or 30
+    last = min(-(-total // page_size), max_pages)
+    if any(artifacts) and last > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for result in pool.map(get_response_json, range(2, last + 1)):
+                artifacts.extend(result["artifacts"])
+
+    if verbose:
+        print(f"Found {len(artifacts)} {msg}")
+
+    return artifacts
+
+
+def iter_artifacts(
+    repo,
+    name=None,
+    per_page=30,
+    max_pages=None,
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    predicate: Optional[Callable[[dict], bool]] = None,
+    client: Optional[GitHubClient] = None,
+) -> Iterator[dict]:
+    """
+    Lazily iterate over the given repository's artifacts, optionally filtering
+    by name (exact match) and/or an arbitrary predicate. Pages are only
+    fetched as the consumer asks for more artifacts, so finding the first
+    match, e.g. with `next()`, often takes a single request.
+
+    Parameters
+    ----------
+    repo : str
+        The repository (format must be owner/name)
+    name : str
+        The artifact name (must be an exact match)
+    per_page : int
+        The number of artifacts to fetch per page (must be between 1-100, inclusive)
+    max_pages : int
+        The maximum number of pages to retrieve (default is None, no limit)
+    retries : int
+        The maximum number of retries for each request (default is the client's)
+    verbose : bool
+        Whether to show verbose output
+    cache : ResponseCache
+        Optional cache for API responses (default is the client's)
+    predicate : callable
+        Optional filter. If provided, only artifacts for which it returns
+        True are yielded, e.g. to select artifacts from a branch:
+        `lambda a: a["workflow_run"]["head_branch"] == "develop"`
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+
+    Yields
+    ------
+        Dictionaries containing artifact information as returned by the GitHub API.
+    """
+
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    cache = client.cache if cache is None else cache
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
+    params = {}
+    if name is not None:
+        if not isinstance(name, str) or len(name) == 0:
+            raise ValueError("name must be a non-empty string")
+        params["name"] = name
+
+    if per_page is not None:
+        if per_page < 1 or per_page > 100:
+            raise ValueError("per_page must be between 1 and 100")
+        params["per_page"] = int(per_page)
+
+    return _iter_artifacts(
+        repo, name, params, max_pages, retries, verbose, cache, predicate, client
+    )
+
+
+def _iter_artifacts(
+    repo, name, params, max_pages, retries, verbose, cache, predicate, client
+):
+    # a separate generator function, so the arguments are validated eagerly
+    msg = f"artifact(s) for {repo}" + (f" matching name {name}" if name else "")
+    req_url = f"{GITHUB_API_URL}/repos/{repo}/actions/artifacts"
+    page_size = params.get("per_page", 30)
+    max_pages = max_pages if max_pages else sys.maxsize
+    page = seen = 0
+    while page < max_pages:
+        page += 1
+        page_msg = f"Fetching {msg} (page {page}, {page_size} per page)"
+        result, _ = _get_page(
+            req_url,
+            params,
+            page,
+            retries,
+            cache,
+            msg=page_msg if verbose else None,
+            client=client,
+        )
+        artifacts = result["artifacts"]
+        seen += len(artifacts)
+        for artifact in artifacts:
+            if predicate is None or predicate(artifact):
+                yield artifact
+        if not any(artifacts) or seen >= result["total_count"]:
+            break
+
+
+def _utc_timestamp(when: Union[str, datetime, date]) -> str:
+    """Format a date or time like GitHub's timestamps, for comparison."""
+    if isinstance(when, datetime):
+        if when.tzinfo is not None:
+            when = when.astimezone(timezone.utc)
+        return when.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if isinstance(when, date):
+        when = when.isoformat()
+    # a bare date includes the whole day
+    return f"{when}T23:59:59Z" if len(when) == 10 else when
+
+
+class ReleaseIndex:
+    """
+    A local SQLite index of a repository's releases and their assets.
+    `sync()` fetches releases newest first, stopping at the first one
+    already indexed, so keeping the index current usually costs a single
+    request. Queries are answered from the index without contacting GitHub.
+
+    Releases are returned as dictionaries, as by `get_release`. Changes to
+    releases already indexed (e.g. assets uploaded after publishing) are
+    only picked up by a full sync.
+
+    Parameters
+    ----------
+    repo : str
+        The repository (format must be owner/name)
+    path : PathLike
+        The database file, which may hold several repositories' releases
+        (default is `get_cache_dir() / "releases.db"`)
+    client : GitHubClient
+        The client to sync with (default is `get_default_client()`)
+    """
+
+    def __init__(
+        self,
+        repo: str,
+        path: Optional[PathLike] = None,
+        client: Optional[GitHubClient] = None,
+    ):
+        if "/" not in repo:
+            raise ValueError("repo format must be owner/name")
+
+        self.repo = repo
+        self.path = Path(path).expanduser() if path else get_cache_dir() / "releases.db"
+        self.client = client
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path))
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS releases (
+                repo TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                tag_name TEXT NOT NULL,
+                draft INTEGER NOT NULL,
+                prerelease INTEGER NOT NULL,
+                published_at TEXT,
+                data TEXT NOT NULL,
+                PRIMARY KEY (repo, id)
+            );
+            CREATE INDEX IF NOT EXISTS releases_published
+                ON releases (repo, published_at);
+            CREATE INDEX IF NOT EXISTS releases_tag ON releases (repo, tag_name);
+            CREATE TABLE IF NOT EXISTS assets (
+                repo TEXT NOT NULL,
+                release_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                PRIMARY KEY (repo, release_id, name)
+            );
+            """
+        )
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        (n,) = self._db.execute(
+            "SELECT COUNT(*) FROM releases WHERE repo = ?", (self.repo,)
+        ).fetchone()
+        return n
+
+    def sync(self, full=False, per_page=30, verbose=False, cache=None) -> List[dict]:
+        """
+        Fetch releases not yet in the index, newest first, stopping at the
+        first release already indexed. If `full`, all releases are fetched
+        and updated. Returns the releases added (or updated).
+
+        Parameters
+        ----------
+        full : bool
+            Whether to fetch all releases, not only new ones
+        per_page : int
+            The number of releases to fetch per page (must be between 1-100, inclusive)
+        verbose : bool
+            Whether to show verbose output
+        cache : ResponseCache
+            Optional cache for API responses (default is the client's)
+        """
+        fetched = []
+        for release in iter_releases(
+            self.repo,
+            per_page=per_page,
+            verbose=verbose,
+            cache=cache,
+            client=self.client,
+        ):
+            if not full and self._has(release["id"]):
+                break
+            fetched.append(release)
+
+        with self._db:
+            for release in fetched:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO releases VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self.repo,
+                        release["id"],
+                        release["tag_name"],
+                        bool(release.get("draft", False)),
+                        bool(release.get("prerelease", False)),
+                        release.get("published_at", None),
+                        json.dumps(release),
+                    ),
+                )
+                self._db.execute(
+                    "DELETE FROM assets WHERE repo = ? AND release_id = ?",
+                    (self.repo, release["id"]),
+                )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO assets VALUES (?, ?, ?)",
+                    [(self.repo, release["id"], a["name"]) for a in release["assets"]],
+                )
+
+        if verbose:
+            print(f"Indexed {len(fetched)} new release(s) of {self.repo}")
+
+        return fetched
+
+    def _has(self, id: int) -> bool:
+        return (
+            self._db.execute(
+                "SELECT 1 FROM releases WHERE repo = ? AND id = ?", (self.repo, id)
+            ).fetchone()
+            is not None
+        )
+
+    def _query(self, where: str = "", params=(), limit: Optional[int] = None):
+        sql = f"SELECT data FROM releases WHERE repo = ? {where} "
+        sql += "ORDER BY published_at DESC, id DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        rows = self._db.execute(sql, (self.repo, *params))
+        return [json.loads(data) for (data,) in rows]
+
+    def releases(self) -> List[dict]:
+        """All indexed releases, newest first."""
+        return self._query()
+
+    def get(self, tag: str) -> Optional[dict]:
+        """The release with the given tag, or None if there is none."""
+        found = self._query("AND tag_name = ?", (tag,), limit=1)
+        return found[0] if found else None
+
+    def latest(self, prerelease=False) -> Optional[dict]:
+        """
+        The most recently published release, or None if there are none.
+        Drafts are excluded, as are prereleases unless `prerelease` is True.
+        """
+        where = "AND NOT draft" + ("" if prerelease else " AND NOT prerelease")
+        found = self._query(where, limit=1)
+        return found[0] if found else None
+
+    def find(self, pattern: str) -> List[dict]:
+        """Releases whose tags match the glob pattern, newest first."""
+        return self._query("AND tag_name GLOB ?", (pattern,))
+
+    def at(self, when: Union[str, datetime, date], prerelease=False) -> Optional[dict]:
+        """
+        The latest release published at or before the given time, e.g. to
+        find the release that was current on a given date. A date (or date
+        string) includes the whole day. Naive datetimes are taken as UTC.
+        """
+        where = "AND NOT draft AND published_at <= ?"
+        where += "" if prerelease else " AND NOT prerelease"
+        found = self._query(where, (_utc_timestamp(when),), limit=1)
+        return found[0] if found else None
+
+    def assets(
+        self, tag: Optional[str] = None, ostag: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Assets of the release with the given tag (by default the latest
+        release). If an OS tag is given, in MODFLOW, Python or GitHub
+        format (see `modflow_devtools.ostags`), only assets whose names
+        contain it (e.g. `linux.zip` or `mf6.5.0_linux.zip`) are returned.
+        """
+        release = self.latest() if tag is None else self.get(tag)
+        if release is None:
+            return []
+        if ostag is None:
+            return release["assets"]
+        if ostag not in SUPPORTED_OSTAGS:
+            try:
+                ostag = python_to_modflow_ostag(ostag)
+            except ValueError:
+                ostag = github_to_modflow_ostag(ostag)
+        names = {
+            name
+            for (name,) in self._db.execute(
+                "SELECT name FROM assets WHERE repo = ? AND release_id = ?",
+                (self.repo, release["id"]),
+            )
+            if ostag in re.split(r"[_.\-]", name)
+        }
+        return [a for a in release["assets"] if a["name"] in names]
+
+
+DEFAULT_CHUNK_SIZE = 1024**2
+
+
+def _preallocate(f, size: int):
+    """Reserve `size` bytes on disk for the file, if supported."""
+    if size <= 0:
+        return
+    try:
+        os.posix_fallocate(f.fileno(), 0, size)
+    except (AttributeError, OSError):
+        f.truncate(size)
+
+
+class _Hasher:
+    """
+    An incremental hash of a download's contents, computed as chunks are
+    written, which is reset if the download starts over. `count` is the
+    number of bytes hashed so far.
+    """
+
+    def __init__(self, algorithm: str = "sha256"):
+        self.algorithm = algorithm.lower()
+        self.reset()
+
+    def reset(self):
+        self._hash = hashlib.new(self.algorithm)
+        self.count = 0
+
+    def update(self, data):
+        self._hash.update(data)
+        self.count += len(data)
+
+    def update_from(self, file_path: Path, size: Optional[int] = None, start: int = 0):
+        """Hash the given size of the file's contents from the given offset."""
+        with open(file_path, "rb") as f:
+            f.seek(start)
+            left = size
+            while left is None or left > 0:
+                n = (
+                    DEFAULT_CHUNK_SIZE
+                    if left is None
+                    else min(DEFAULT_CHUNK_SIZE, left)
+                )
+                data = f.read(n)
+                if not data:
+                    break
+                self.update(data)
+                if left is not None:
+                    left -= len(data)
+
+    @property
+    def digest(self) -> str:
+        """The digest, formatted `<algorithm>:<hex>`, as GitHub reports them."""
+        return f"{self.algorithm}:{self._hash.hexdigest()}"
+
+
+def _parse_digest(digest: str) -> Tuple[str, str]:
+    """Split a digest formatted `<algorithm>:<hex>` into its parts."""
+    algorithm, _, value = digest.partition(":")
+    algorithm = algorithm.lower()
+    if not value or algorithm not in hashlib.algorithms_available:
+        raise ValueError(f"digest must be formatted <algorithm>:<hex>, got {digest}")
+    return algorithm, value.lower()
+
+
+def _check_digest(url: str, hasher: _Hasher, digest: Optional[str]):
+    """Raise if the downloaded content doesn't match the expected digest."""
+    if digest is not None and hasher.digest != digest.lower():
+        raise RuntimeError(
+            f"digest mismatch for {url} (expected {digest}, got {hasher.digest})"
+        )
+
+
+def _write_digest_file(file_path: Path, digest: str) -> Path:
+    """
+    Record the file's digest in a sidecar file next to it, named after the
+    algorithm (e.g. `linux.zip.sha256`), in the format of `sha256sum`.
+    """
+    algorithm, value = _parse_digest(digest)
+    sidecar = file_path.with_name(f"{file_path.name}.{algorithm}")
+    sidecar.write_text(f"{value}  {file_path.name}\n")
+    return sidecar
+
+
+def _stream(
+    resp,
+    out_file,
+    total: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+    start: int = 0,
+    hasher: Optional[_Hasher] = None,
+) -> int:
+    """
+    Copy the response body to the output file in fixed-size chunks, reusing
+    a single buffer so memory use is independent of the payload size. The
+    optional progress callback receives the number of bytes written so far
+    (counting from `start`, for resumed downloads), the expected total (or
+    None if unknown) and the throughput in bytes/s. If a hasher is given,
+    it is updated with each chunk. Returns the number of bytes written,
+    including `start`.
+    """
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    written = start
+    tic = timeit.default_timer()
+    while True:
+        n = resp.readinto(view)
+        if not n:
+            break
+        out_file.write(view[:n])
+        if hasher is not None:
+            hasher.update(view[:n])
+        written += n
+        if progress:
+            elapsed = timeit.default_timer() - tic
+            rate = (written - start) / elapsed if elapsed > 0 else 0.0
+            progress(written, total, rate)
+    return written
+
+
+# how often (in bytes) to record the progress of partial downloads
+_RECORD_INTERVAL = 8 * 1024**2
+
+
+def _read_part_state(state_path: Path, url: str) -> Optional[dict]:
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("url") == url else None
+
+
+def _write_part_state(state_path: Path, state: dict):
+    tmp_path = state_path.with_name(f"{state_path.name}.{uuid4().hex}")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def _content_range(headers) -> Tuple[Optional[int], Optional[int]]:
+    """Parse the start offset and total size from a `Content-Range` header."""
+    value = headers.get("Content-Range", "")
+    try:
+        unit, _, spec = value.partition(" ")
+        span, _, total = spec.partition("/")
+        start = int(span.partition("-")[0])
+        return start, (None if total == "*" else int(total))
+    except ValueError:
+        return None, None
+
+
+def _download(
+    request,
+    file_path: Path,
+    retries=3,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+    verbose=False,
+    client: Optional[GitHubClient] = None,
+    hasher: Optional[_Hasher] = None,
+) -> int:
+    """
+    Download the request's response body to the given file, streaming it
+    in chunks of the given size. The file is preallocated if the server
+    reports the content length. Returns the number of bytes written.
+
+    Data is written to a `.part` file next to the target, with progress
+    recorded in a `.part.json` file. If the transfer is interrupted, a
+    retry (or a later call for the same URL) resumes with a `Range`
+    request if the server advertised `Accept-Ranges: bytes`, otherwise
+    the download starts over. The `.part` file is renamed to the target
+    when complete.
+
+    If a hasher is given, it is updated as data is written, so it holds
+    the digest of the complete file on return. Only a download resumed
+    from an earlier call needs to hash the existing partial data first.
+    """
+
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("chunk_size must be a positive int")
+
+    client = client or get_default_client()
+    url = request.full_url
+    part_path = file_path.with_name(f"{file_path.name}.part")
+    state_path = file_path.with_name(f"{file_path.name}.part.json")
+    state = _read_part_state(state_path, url) if part_path.is_file() else None
+
+    tic = timeit.default_timer()
+    tries = 0
+    while True:
+        tries += 1
+        offset = 0
+        if state and state["accept_ranges"] and state["offset"] > 0:
+            offset = state["offset"]
+            request.add_header("Range", f"bytes={offset}-")
+            validator = state["etag"] or state["last_modified"]
+            if validator:
+                request.add_header("If-Range", validator)
+        else:
+            request.remove_header("Range")
+            request.remove_header("If-Range")
+
+        written = offset
+        try:
+            with client.urlopen(request) as url_file:
+                resumed = url_file.status == 206
+                if resumed:
+                    start, total = _content_range(url_file.headers)
+                    if start != offset:
+                        raise ValueError(
+                            f"requested range from byte {offset} of {url}, "
+                            f"got {url_file.headers.get('Content-Range')}"
+                        )
+                    if verbose:
+                        print(f"   resuming at byte {offset:,d}")
+                    if hasher is not None and hasher.count != offset:
+                        hasher.reset()
+                        hasher.update_from(part_path, offset)
+                else:
+                    # no (or ignored) range request: start over
+                    offset = written = 0
+                    if hasher is not None:
+                        hasher.reset()
+                    file_size = url_file.headers.get("Content-length", None)
+                    total = int(file_size) if file_size else None
+                    state = {
+                        "url": url,
+                        "total": total,
+                        "offset": 0,
+                        "etag": url_file.headers.get("ETag", None),
+                        "last_modified": url_file.headers.get("Last-Modified", None),
+                        "accept_ranges": url_file.headers.get("Accept-Ranges", "")
+                        == "bytes",
+                    }
+
+                # if verbose, print content length (if available)
+                if verbose and total:
+                    file_size = str(total)
+                    len_file_size = len(file_size)
+                    bfmt = "{:" + f"{len_file_size}" + ",d}"
+                    sbfmt = "{:>" + f"{len(bfmt.format(total))}" + "s} bytes"
+                    print(f"   file size: {sbfmt.format(bfmt.format(total))}")
+
+                with open(part_path, "r+b" if resumed else "wb") as out_file:
+                    if resumed:
+                        out_file.seek(offset)
+                    elif total:
+                        _preallocate(out_file, total)
+                    _write_part_state(state_path, state)
+
+                    recorded = offset
+
+                    def record(n, total, rate):
+                        nonlocal written, recorded
+                        written = n
+                        if n - recorded >= _RECORD_INTERVAL:
+                            out_file.flush()
+                            state["offset"] = recorded = n
+                            _write_part_state(state_path, state)
+                        if progress:
+                            progress(n, total, rate)
+
+                    written = _stream(
+                        url_file,
+                        out_file,
+                        total,
+                        chunk_size,
+                        record,
+                        start=offset,
+                        hasher=hasher,
+                    )
+                    if total is not None and written < total:
+                        # the connection closed early
+                        raise http.client.IncompleteRead(b"", total - written)
+
+            os.replace(part_path, file_path)
+            state_path.unlink(missing_ok=True)
+            duration = timeit.default_timer() - tic
+            _emit(
+                "download",
+                url=url,
+                bytes=written - offset,
+                size=written,
+                offset=offset,
+                duration=duration,
+                rate=(written - offset) / duration if duration > 0 else None,
+                retries=tries - 1,
+            )
+            return written
+        except urllib.error.HTTPError as err:
+            if err.code == 416:
+                # the recorded range is no longer satisfiable, start over
+                state = None
+            if tries < retries:
+                warn(f"URL request try {tries} failed ({err})")
+                _emit("retry", url=request.full_url, attempt=tries, error=str(err))
+                time.sleep(client.rate_limiter.backoff(tries))
+                continue
+            raise RuntimeError(f"cannot retrieve data from {url}") from err
+        except (OSError, http.client.HTTPException) as err:
+            # the connection dropped mid-transfer. record how far we got
+            if state is not None and part_path.is_file() and written > offset:
+                state["offset"] = written
+                _write_part_state(state_path, state)
+            if tries < retries:
+                warn(f"URL request try {tries} failed ({err})")
+                _emit("retry", url=request.full_url, attempt=tries, error=str(err))
+                time.sleep(client.rate_limiter.backoff(tries))
+                continue
+            raise RuntimeError(f"cannot retrieve data from {url}") from err
+
+
+# segments smaller than this are not worth a separate connection
+_MIN_SEGMENT_SIZE = 1024**2
+
+
+def _fetch_range(
+    url: str,
+    headers: dict,
+    part_path: Path,
+    start: int,
+    end: int,
+    etag: Optional[str] = None,
+    retries=3,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+    client: Optional[GitHubClient] = None,
+) -> Tuple[int, int]:
+    """
+    Fetch the inclusive byte range `start`-`end` of the URL into the same
+    offsets of the (preallocated) file. Interrupted transfers are retried
+    from where they stopped. The optional progress callback receives the
+    number of new bytes after each chunk. Returns the number of bytes
+    written, which is verified to equal the range's length, and the number
+    of retries.
+    """
+    client = client or get_default_client()
+    length = end - start + 1
+    written = 0
+    tries = 0
+    while True:
+        tries += 1
+        request = urllib.request.Request(url, headers=headers)
+        request.add_header("Range", f"bytes={start + written}-{end}")
+        if etag:
+            request.add_header("If-Range", etag)
+        try:
+            with client.urlopen(request) as url_file:
+                first, _ = _content_range(url_file.headers)
+                if url_file.status != 206 or first != start + written:
+                    raise ValueError(f"server ignored range request for {url}")
+                with open(part_path, "r+b") as out_file:
+                    out_file.seek(start + written)
+                    reported = written
+
+                    def report(n, total, rate):
+                        nonlocal written, reported
+                        written = n
+                        if progress:
+                            # the data must be readable by the callback
+                            out_file.flush()
+                            progress(n - reported)
+                        reported = n
+
+                    _stream(
+                        url_file, out_file, length, chunk_size, report, start=written
+                    )
+                if written < length:
+                    raise http.client.IncompleteRead(b"", length - written)
+                return written, tries - 1
+        except (OSError, http.client.HTTPException) as err:
+            if tries < retries:
+                warn(f"URL request try {tries} failed ({err})")
+                _emit("retry", url=request.full_url, attempt=tries, error=str(err))
+                time.sleep(client.rate_limiter.backoff(tries))
+                continue
+            raise RuntimeError(f"cannot retrieve data from {url}") from err
+
+
+def _probe(request, client: GitHubClient) -> Optional[dict]:
+    """
+    Request the first byte of the request's response body, returning a
+    dictionary with the final `url` (after redirects), the file's `size`
+    (or None if unknown), its `etag` and `last_modified` validators, and
+    whether the server supports range requests (`accept_ranges`). Returns
+    None if the request fails.
+    """
+    probe = urllib.request.Request(request.full_url, headers=request.headers)
+    probe.add_header("Range", "bytes=0-0")
+    try:
+        with client.urlopen(probe) as resp:
+            accept_ranges = resp.status == 206
+            if accept_ranges:
+                _, size = _content_range(resp.headers)
+            else:
+                length = resp.headers.get("Content-Length", None)
+                size = int(length) if length else None
+            return {
+                "url": resp.geturl(),
+                "size": size,
+                "etag": resp.headers.get("ETag", None),
+                "last_modified": resp.headers.get("Last-Modified", None),
+                "accept_ranges": accept_ranges,
+            }
+    except (OSError, http.client.HTTPException):
+        return None
+
+
+def _download_segmented(
+    request,
+    file_path: Path,
+    segments: int,
+    retries=3,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+    verbose=False,
+    client: Optional[GitHubClient] = None,
+    hasher: Optional[_Hasher] = None,
+) -> int:
+    """
+    Download the request's response body to the given file by splitting it
+    into byte ranges fetched concurrently, each written to its offset in a
+    preallocated `.part` file. Falls back to a single stream (see
+    `_download`) if the server does not support range requests or the file
+    is too small to split. Returns the number of bytes written. A given
+    hasher is updated with the file's contiguous prefix as it arrives.
+    """
+
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("chunk_size must be a positive int")
+
+    client = client or get_default_client()
+
+    # probe for range support and the file size. this also resolves
+    # redirects, so segments go straight to the final (e.g. S3) URL
+    info = _probe(request, client)
+    supported = info is not None and info["accept_ranges"]
+    if supported:
+        total, url, etag = info["size"], info["url"], info["etag"]
+
+    segments = min(segments, (total or 0) // _MIN_SEGMENT_SIZE) if supported else 1
+    if segments < 2:
+        if verbose:
+            print("   server does not support ranges, downloading in one stream")
+        return _download(
+            request,
+            file_path,
+            retries=retries,
+            chunk_size=chunk_size,
+            progress=progress,
+            verbose=verbose,
+            client=client,
+            hasher=hasher,
+        )
+
+    if verbose:
+        print(f"   file size: {total:,d} bytes, downloading in {segments} segments")
+
+    # only send credentials to the host they were meant for
+    same_host = urllib.parse.urlsplit(url).netloc == request.host
+    headers = dict(request.header_items()) if same_host else {}
+
+    part_path = file_path.with_name(f"{file_path.name}.part")
+    with open(part_path, "wb") as f:
+        _preallocate(f, total)
+    # the part file no longer matches an interrupted single stream's state
+    file_path.with_name(f"{file_path.name}.part.json").unlink(missing_ok=True)
+
+    size = -(-total // segments)
+    ranges = [(s, min(s + size, total) - 1) for s in range(0, total, size)]
+    lock = Lock()
+    hash_lock = Lock()
+    downloaded = 0
+    done = [0] * len(ranges)
+    tic = timeit.default_timer()
+    if hasher is not None:
+        hasher.reset()
+
+    def hash_prefix(wait=False):
+        # hash what follows the hashed prefix, up to the first gap. the
+        # data was just written, so it is read back from the page cache.
+        # if another thread is hashing, leave it the new data
+        if not hash_lock.acquire(blocking=wait):
+            return
+        try:
+            while True:
+                with lock:
+                    end = 0
+                    for (start, last), n in zip(ranges, done):
+                        end = start + n
+                        if end <= last:
+                            break
+                if end <= hasher.count:
+                    return
+                hasher.update_from(part_path, end - hasher.count, start=hasher.count)
+        finally:
+            hash_lock.release()
+
+    def report(i, n):
+        nonlocal downloaded
+        with lock:
+            downloaded += n
+            done[i] += n
+            if progress:
+                elapsed = timeit.default_timer() - tic
+                progress(downloaded, total, downloaded / elapsed if elapsed else 0.0)
+        if hasher is not None:
+            hash_prefix()
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [
+            pool.submit(
+                _fetch_range,
+                url,
+                headers,
+                part_path,
+                start,
+                end,
+                etag=etag,
+                retries=retries,
+                chunk_size=chunk_size,
+                progress=partial(report, i),
+                client=client,
+            )
+            for i, (start, end) in enumerate(ranges)
+        ]
+        results = [f.result() for f in futures]
+    written = sum(n for n, _ in results)
+    retries_used = sum(r for _, r in results)
+
+    # verify every byte arrived before publishing the file
+    if written != total or part_path.stat().st_size != total:
+        raise RuntimeError(
+            f"segmented download of {request.full_url} is incomplete "
+            f"({written} of {total} bytes)"
+        )
+    if hasher is not None:
+        hash_prefix(wait=True)
+    os.replace(part_path, file_path)
+    duration = timeit.default_timer() - tic
+    _emit(
+        "download",
+        url=request.full_url,
+        bytes=written,
+        size=total,
+        offset=0,
+        duration=duration,
+        rate=written / duration if duration > 0 else None,
+        retries=retries_used,
+        segments=len(ranges),
+    )
+    return written
+
+
+class _StreamPipe:
+    """
+    A read-only file object over a response body, read ahead by a
+    background thread so the network transfer overlaps with whatever
+    the consumer does with the data (e.g. writing extracted files).
+    Raw bytes are optionally teed to a file, and hashed, as they arrive.
+    """
+
+    def __init__(
+        self,
+        resp,
+        tee=None,
+        total: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+        depth: int = 8,
+        hasher: Optional[_Hasher] = None,
+    ):
+        self._resp = resp
+        self._tee = tee
+        self._total = total
+        self._chunk_size = chunk_size
+        self._progress = progress
+        self._hasher = hasher
+        self._queue = queue.Queue(maxsize=depth)
+        self._chunk = b""
+        self._pos = 0
+        self._eof = False
+        self._error = None
+        self._closed = False
+        self.written = 0
+        self._thread = Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        # give up if the consumer has gone away
+        while not self._closed:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _fill(self):
+        try:
+            tic = timeit.default_timer()
+            while not self._closed:
+                data = self._resp.read(self._chunk_size)
+                if not data:
+                    break
+                if self._tee is not None:
+                    self._tee.write(data)
+                if self._hasher is not None:
+                    self._hasher.update(data)
+                self.written += len(data)
+                if self._progress:
+                    elapsed = timeit.default_timer() - tic
+                    rate = self.written / elapsed if elapsed > 0 else 0.0
+                    self._progress(self.written, self._total, rate)
+                self._put(data)
+            if self._total is not None and self.written < self._total:
+                # the connection closed early
+                raise http.client.IncompleteRead(b"", self._total - self.written)
+        except BaseException as err:
+            self._error = err
+        finally:
+            self._put(None)
+
+    def read(self, n: int = -1) -> bytes:
+        parts = []
+        size = 0
+        while n < 0 or size < n:
+            if self._pos >= len(self._chunk):
+                if self._eof:
+                    break
+                chunk = self._queue.get()
+                if chunk is None:
+                    self._eof = True
+                    if self._error is not None:
+                        raise self._error
+                    break
+                self._chunk, self._pos = chunk, 0
+            end = (
+                len(self._chunk)
+                if n < 0
+                else min(len(self._chunk), self._pos + n - size)
+            )
+            parts.append(self._chunk[self._pos : end])
+            size += end - self._pos
+            self._pos = end
+        return b"".join(parts)
+
+    def close(self):
+        self._closed = True
+        self._thread.join()
+
+
+_TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+def _is_tar(name: str) -> bool:
+    """Whether the file name has a tarball suffix."""
+    return name.lower().endswith(_TAR_SUFFIXES)
+
+
+def _download_extract_tar(
+    request,
+    file_path: Path,
+    path: Path,
+    tee=True,
+    retries=3,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+    verbose=False,
+    client: Optional[GitHubClient] = None,
+    hasher: Optional[_Hasher] = None,
+) -> int:
+    """
+    Download a tarball and extract its members into the given directory as
+    they arrive, feeding the response body to `tarfile`'s streaming mode
+    rather than writing the archive to disk and reading it back. If `tee`,
+    the raw bytes are also saved to the given file. Interrupted transfers
+    are retried from the start. A given hasher is updated as data arrives.
+    Returns the number of bytes downloaded.
+    """
+
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("chunk_size must be a positive int")
+
+    client = client or get_default_client()
+    url = request.full_url
+    part_path = file_path.with_name(f"{file_path.name}.part")
+    tic = timeit.default_timer()
+    tries = 0
+    while True:
+        tries += 1
+        try:
+            with client.urlopen(request) as resp:
+                file_size = resp.headers.get("Content-Length", None)
+                total = int(file_size) if file_size else None
+                if verbose:
+                    print(f"   extracting {file_path.name} while downloading")
+                with open(part_path, "wb") if tee else nullcontext() as out_file:
+                    if hasher is not None:
+                        hasher.reset()
+                    pipe = _StreamPipe(
+                        resp, out_file, total, chunk_size, progress, hasher=hasher
+                    )
+                    try:
+                        with tarfile.open(fileobj=pipe, mode="r|*") as ar:
+                            ar.extractall(path=str(path))
+                        # consume the end-of-archive padding, so the
+                        # teed archive is complete
+                        while pipe.read(chunk_size):
+                            pass
+                    finally:
+                        pipe.close()
+            if tee:
+                os.replace(part_path, file_path)
+            # the transfer and extraction overlap, so they are timed together
+            duration = timeit.default_timer() - tic
+            _emit(
+                "download",
+                url=url,
+                bytes=pipe.written,
+                size=pipe.written,
+                offset=0,
+                duration=duration,
+                rate=pipe.written / duration if duration > 0 else None,
+                retries=tries - 1,
+                extracted=True,
+            )
+            return pipe.written
+        except (OSError, http.client.HTTPException) as err:
+            if tries < retries:
+                warn(f"URL request try {tries} failed ({err})")
+                _emit("retry", url=request.full_url, attempt=tries, error=str(err))
+                time.sleep(client.rate_limiter.backoff(tries))
+                continue
+            raise RuntimeError(f"cannot retrieve data from {url}") from err
+        finally:
+            if tee:
+                part_path.unlink(missing_ok=True)
+
+
+class _RangeFile:
+    """
+    A read-only, seekable file object over a remote file, fetching data
+    with HTTP range requests. Reads are served from a read-ahead buffer
+    which grows while reads are sequential, so reading a large member of
+    an archive costs few requests, while random access to small records
+    (e.g. a zip file's central directory) stays cheap.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        size: int,
+        headers: Optional[dict] = None,
+        retries=3,
+        block_size: int = 64 * 1024,
+        max_block_size: int = 16 * 1024**2,
+        client: Optional[GitHubClient] = None,
+    ):
+        self.url = url
+        self.size = size
+        self.fetched = 0
+        self.retries = 0
+        self._headers = headers or {}
+        self._retries = retries
+        self._min_block = self._block = block_size
+        self._max_block = max_block_size
+        self._client = client or get_default_client()
+        self._pos = 0
+        self._buf = b""
+        self._buf_start = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._pos = offset
+        return offset
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        request = urllib.request.Request(
+            self.url, headers={**self._headers, "Range": f"bytes={start}-{end - 1}"}
+        )
+        tries = 0
+        while True:
+            tries += 1
+            try:
+                with self._client.urlopen(request) as resp:
+                    if resp.status != 206:
+                        raise RuntimeError(
+                            f"server ignored range request for {self.url}"
+                        )
+                    data = resp.read()
+                if len(data) < end - start:
+                    raise http.client.IncompleteRead(data, end - start - len(data))
+                self.fetched += len(data)
+                return data
+            except (OSError, http.client.HTTPException) as err:
+                if tries < self._retries:
+                    warn(f"URL request try {tries} failed ({err})")
+                    _emit("retry", url=request.full_url, attempt=tries, error=str(err))
+                    self.retries += 1
+                    time.sleep(self._client.rate_limiter.backoff(tries))
+                    continue
+                raise RuntimeError(f"cannot retrieve data from {self.url}") from err
+
+    def read(self, n: int = -1) -> bytes:
+        n = self.size - self._pos if n is None or n < 0 else n
+        n = max(min(n, self.size - self._pos), 0)
+        parts = []
+        while n > 0:
+            buf_end = self._buf_start + len(self._buf)
+            if not self._buf_start <= self._pos < buf_end:
+                # grow the read-ahead while reads are sequential
+                sequential = self._pos == buf_end and len(self._buf) > 0
+                self._block = (
+                    min(self._block * 2, self._max_block)
+                    if sequential
+                    else self._min_block
+                )
+                start = self._pos
+                end = min(start + max(n, self._block), self.size)
+                if not sequential:
+                    # near the end of the file, read back instead, as the
+                    # zip file's trailing records are read back to front
+                    start = min(start, max(end - self._block, 0))
+                self._buf, self._buf_start = self._fetch(start, end), start
+            offset = self._pos - self._buf_start
+            data = self._buf[offset : offset + n]
+            parts.append(data)
+            self._pos += len(data)
+            n -= len(data)
+        return b"".join(parts)
+
+    def close(self):
+        self._buf = b""
+
+
+def _match_members(names: List[str], patterns: List[str]) -> List[str]:
+    """
+    Select archive member names matching any of the glob patterns, matched
+    against the full member name or just the file name.
+    """
+    return [
+        name
+        for name in names
+        if any(
+            fnmatch(name, p) or fnmatch(name.rstrip("/").rpartition("/")[2], p)
+            for p in patterns
+        )
+    ]
+
+
+def _extract_members(
+    request,
+    file_path: Path,
+    path: Path,
+    members: List[str],
+    delete_zip=True,
+    retries=3,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+    verbose=False,
+    client: Optional[GitHubClient] = None,
+    hasher: Optional[_Hasher] = None,
+    digest: Optional[str] = None,
+) -> List[str]:
+    """
+    Extract the zip file members matching the given glob patterns. If the
+    server supports range requests, only the zip file's central directory
+    and the selected members are fetched. Otherwise, or if the zip file is
+    to be kept or hashed, the whole file is downloaded to the given path
+    first, and checked against the expected digest, if any. Returns the
+    extracted member names.
+    """
+
+    client = client or get_default_client()
+    info = _probe(request, client) if delete_zip and hasher is None else None
+    if info is not None and info["accept_ranges"] and info["size"]:
+        # only send credentials to the host they were meant for
+        same_host = urllib.parse.urlsplit(info["url"]).netloc == request.host
+        tic = timeit.default_timer()
+        remote = _RangeFile(
+            info["url"],
+            info["size"],
+            headers=dict(request.header_items()) if same_host else {},
+            retries=retries,
+            client=client,
+        )
+        with MFZipFile(remote) as z:
+            names = _match_members(z.namelist(), members)
+            if verbose:
+                print(f"   extracting {len(names)} member(s) with range requests")
+            z.extractall(str(path), members=names)
+        # the transfer and extraction overlap, so they are timed together
+        duration = timeit.default_timer() - tic
+        _emit(
+            "download",
+            url=request.full_url,
+            bytes=remote.fetched,
+            size=remote.size,
+            offset=0,
+            duration=duration,
+            rate=remote.fetched / duration if duration > 0 else None,
+            retries=remote.retries,
+            extracted=True,
+        )
+        if verbose:
+            print(f"   fetched {remote.fetched:,d} of {remote.size:,d} bytes")
+        return names
+
+    if verbose:
+        print("   server does not support ranges, downloading whole file")
+    _download(
+        request,
+        file_path,
+        retries=retries,
+        chunk_size=chunk_size,
+        progress=progress,
+        verbose=verbose,
+        client=client,
+        hasher=hasher,
+    )
+    if hasher is not None:
+        _check_digest(request.full_url, hasher, digest)
+    tic = timeit.default_timer()
+    with MFZipFile(file_path) as z:
+        names = _match_members(z.namelist(), members)
+        z.extractall(str(path), members=names)
+    if delete_zip:
+        file_path.unlink()
+    _emit("extract", path=str(file_path), duration=timeit.default_timer() - tic)
+    return names
+
+
+def _extract(file_path: Path, path: Path, delete_zip=True, verbose=False) -> bool:
+    """
+    Extract the archive (if it is one) into the given directory,
+    optionally deleting the archive afterwards. Returns whether
+    the file was recognized as an archive and extracted.
+    """
+
+    tic = timeit.default_timer()
+
+    # Unzip the file, and delete zip file if successful.
+    if "zip" in file_path.suffix or "exe" in file_path.suffix:
+        z = MFZipFile(file_path)
+        try:
+            if verbose:
+                print(f"Uncompressing: {file_path}")
+
+            # extract the files
+            z.extractall(str(path))
+        except:  # noqa: E722
+            p = "Could not unzip the file. Stopping."
+            raise Exception(p)
+        z.close()
+
+        # delete the zipfile
+        if delete_zip:
+            if verbose:
+                print(f"Deleting zipfile {file_path}")
+            file_path.unlink()
+    elif _is_tar(file_path.name):
+        ar = tarfile.open(file_path)
+        ar.extractall(path=str(path))
+        ar.close()
+
+        # delete the zipfile
+        if delete_zip:
+            if verbose:
+                print(f"Deleting zipfile {file_path}")
+            file_path.unlink()
+    else:
+        return False
+    _emit("extract", path=str(file_path), duration=timeit.default_timer() - tic)
+    return True
+
+
+def _link(src: Path, dst: Path):
+    """Hardlink the file to the destination, or copy it if linking fails."""
+    if dst.is_symlink() or dst.is_file():
+        dst.unlink()
+    if src.is_symlink():
+        os.symlink(os.readlink(src), dst)
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _move_tree(src: Path, dst: Path):
+    """Move the directory's contents into the destination, merging directories."""
+    for root, dirs, files in os.walk(src):
+        rel = Path(root).relative_to(src)
+        for d in dirs:
+            if (Path(root) / d).is_symlink():
+                os.replace(Path(root) / d, dst / rel / d)
+            else:
+                (dst / rel / d).mkdir(parents=True, exist_ok=True)
+        for f in files:
+            os.replace(Path(root) / f, dst / rel / f)
+
+
+class DownloadCache:
+    """
+    An on-disk cache of downloaded files and their extracted contents,
+    keyed by URL. Each entry records the file's SHA-256 digest and the
+    server's `ETag` and `Last-Modified` validators and size. On a hit,
+    the extracted tree is hardlinked into the target directory (or copied,
+    where hardlinks are not possible, e.g. across filesystems), so nothing
+    is downloaded or extracted again.
+
+    Since hardlinked files share their contents with the cache, files
+    extracted from the cache should not be modified in place.
+
+    Parameters
+    ----------
+    path : PathLike
+        The cache directory (default is `get_cache_dir() / "downloads"`)
+    ttl : float
+        Seconds for which an entry is used without contacting the server.
+        Older entries are revalidated against the server's validators and
+        file size. The default is None, i.e. entries never expire.
+    max_size : int
+        The maximum total size of the cache, in bytes. When exceeded,
+        the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: Optional[PathLike] = None,
+        ttl: Optional[float] = None,
+        max_size: int = 1024**3,
+    ):
+        if ttl is not None and ttl < 0:
+            raise ValueError("ttl must be non-negative")
+        if max_size < 0:
+            raise ValueError("max_size must be non-negative")
+
+        self.path = Path(path).expanduser() if path else get_cache_dir() / "downloads"
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = Lock()
+
+    def _entry_dir(self, url: str) -> Path:
+        return self.path / hashlib.sha256(url.encode()).hexdigest()
+
+    def get(self, url: str, digest: Optional[str] = None) -> Optional[dict]:
+        """
+        Get the cache entry for the given URL, or None if there is none.
+        If a digest (format `sha256:<hex>`) is given, entries with other
+        contents are ignored. Entries are dictionaries with keys `url`,
+        `name` (the file name), `digest`, `size`, `etag`, `last_modified`,
+        `extracted` (whether the file is an archive), `stored` (epoch
+        seconds) and `disk_size` (the bytes the entry takes in the cache,
+        with its extracted contents).
+        """
+        try:
+            with open(self._entry_dir(url) / "entry.json") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url:
+            return None
+        if digest is not None and entry["digest"] != digest.lower():
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Whether the given entry is younger than the cache's TTL."""
+        return self.ttl is None or time.time() - entry["stored"] < self.ttl
+
+    @staticmethod
+    def matches(entry: dict, info: Optional[dict]) -> bool:
+        """
+        Whether the entry matches the file described by `info`, a dictionary
+        with the server's `etag`, `last_modified` and `size` for the file.
+        """
+        if not info:
+            return False
+        if entry["size"] != info.get("size", None):
+            return False
+        for key in ("etag", "last_modified"):
+            if entry[key] and info.get(key, None):
+                return entry[key] == info[key]
+        return False
+
+    def put(
+        self,
+        url: str,
+        file_path: PathLike,
+        info: Optional[dict] = None,
+        tree: Optional[PathLike] = None,
+        digest: Optional[str] = None,
+    ) -> dict:
+        """
+        Add the downloaded file to the cache, extracting it if it is an
+        archive. The file is hardlinked (or copied) into the cache, so it
+        may be deleted afterwards. `info` may provide the server's `etag`
+        and `last_modified` validators for the file. If the archive has
+        already been extracted, the `tree` it was extracted to (which
+        should be on the cache's filesystem) is moved into the cache. If
+        the file's `digest` was computed while it downloaded, it is
+        recorded as is, otherwise the file is hashed with SHA-256.
+        """
+        file_path = Path(file_path)
+        info = info or {}
+        entry_dir = self._entry_dir(url)
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_dir = entry_dir.with_name(f"{entry_dir.name}.{uuid4().hex}")
+        tmp_dir.mkdir()
+        try:
+            _link(file_path, tmp_dir / file_path.name)
+            if digest is None:
+                hasher = _Hasher("sha256")
+                hasher.update_from(file_path)
+                digest = hasher.digest
+            if tree is None:
+                (tmp_dir / "tree").mkdir()
+                extracted = _extract(
+                    tmp_dir / file_path.name, tmp_dir / "tree", delete_zip=False
+                )
+            else:
+                shutil.move(str(tree), str(tmp_dir / "tree"))
+                extracted = True
+            entry = {
+                "url": url,
+                "name": file_path.name,
+                "digest": digest.lower(),
+                "size": file_path.stat().st_size,
+                "etag": info.get("etag", None),
+                "last_modified": info.get("last_modified", None),
+                "extracted": extracted,
+                "stored": time.time(),
+                "disk_size": self._disk_size(tmp_dir),
+            }
+            with open(tmp_dir / "entry.json", "w") as f:
+                json.dump(entry, f)
+            with self._lock:
+                if entry_dir.exists():
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(tmp_dir, entry_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self._use(entry_dir)
+        self.prune()
+        return entry
+
+    @staticmethod
+    def _disk_size(entry_dir: Path) -> int:
+        return sum(
+            f.stat().st_size
+            for f in entry_dir.rglob("*")
+            if f.is_file() and not f.is_symlink()
+        )
+
+    @staticmethod
+    def _use(entry_dir: Path):
+        # entry file mtimes record last use, for LRU eviction
+        t = time.time_ns()
+        try:
+            os.utime(entry_dir / "entry.json", ns=(t, t))
+        except OSError:
+            pass
+
+    def touch(self, url: str, revalidated: bool = False):
+        """
+        Mark the entry for the given URL as recently used. If `revalidated`,
+        the server has confirmed the entry is current, so its TTL restarts.
+        """
+        entry = self.get(url)
+        if entry is None:
+            return
+        entry_dir = self._entry_dir(url)
+        if revalidated:
+            entry["stored"] = time.time()
+            tmp_path = entry_dir / f"entry.json.{uuid4().hex}"
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, entry_dir / "entry.json")
+        self._use(entry_dir)
+
+    def link(
+        self,
+        entry: dict,
+        path: PathLike,
+        delete_zip=True,
+        verbose=False,
+    ) -> Path:
+        """
+        Hardlink (or copy) the entry's extracted contents into the given
+        directory. The downloaded file itself is included if it is not an
+        archive, or if `delete_zip` is False.
+        """
+        path = Path(path)
+        entry_dir = self._entry_dir(entry["url"])
+        tree = entry_dir / "tree"
+        if verbose:
+            print(f"Linking {entry['name']} contents from cache {entry_dir}")
+        for root, dirs, files in os.walk(tree):
+            rel = Path(root).relative_to(tree)
+            for d in dirs:
+                if (Path(root) / d).is_symlink():
+                    _link(Path(root) / d, path / rel / d)
+                else:
+                    (path / rel / d).mkdir(parents=True, exist_ok=True)
+            for f in files:
+                _link(Path(root) / f, path / rel / f)
+        if not delete_zip or not entry["extracted"]:
+            _link(entry_dir / entry["name"], path / entry["name"])
+        self._use(entry_dir)
+        return path
+
+    def prune(self, max_size: Optional[int] = None):
+        """
+        Evict least recently used entries until the cache is no larger than
+        `max_size` bytes (by default, the cache's configured maximum size).
+        Entry sizes are recorded when they are stored, so this only reads
+        each entry's metadata, not its files.
+        """
+        max_size = self.max_size if max_size is None else max_size
+        with self._lock:
+            entries = []
+            for p in self.path.glob("*/entry.json"):
+                try:
+                    used = p.stat().st_mtime_ns
+                    with open(p) as f:
+                        size = json.load(f).get("disk_size", None)
+                except (OSError, ValueError):
+                    continue
+                if size is None:
+                    # stored before sizes were recorded
+                    size = self._disk_size(p.parent)
+                entries.append((used, size, p.parent))
+            total = sum(e[1] for e in entries)
+            for _, size, entry_dir in sorted(entries, key=lambda e: e[0]):
+                if total <= max_size:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        self.prune(max_size=0)
+
+
+def download_artifact(
+    repo,
+    id,
+    path: Optional[PathLike] = None,
+    delete_zip=True,
+    retries=None,
+    verbose=False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+    digest: Optional[str] = None,
+    hash_algorithm: Optional[str] = None,
+    client: Optional[GitHubClient] = None,
+):
+    """
+    Download and unzip a GitHub Actions artifact, selected by its ID.
+
+    Parameters
+    ----------
+    repo : str
+        The repository (format must be owner/name)
+    id : str
+        The artifact ID
+    path : PathLike
+        Path where the zip file will be saved (default is current path)
+    delete_zip : bool
+        Whether the zip file should be deleted after it is unzipped (default is True)
+    retries : int
+        The maximum number of retries for each request (default is the client's)
+    verbose : bool
+        Whether to show verbose output
+    chunk_size : int
+        The number of bytes to read and write at a time while downloading
+    progress : callable
+        Optional callback, called after each chunk with the number of bytes
+        downloaded so far, the total size (or None if unknown), and the
+        throughput in bytes per second
+    digest : str
+        The zip file's expected digest, formatted `<algorithm>:<hex>` (e.g.
+        the `digest` reported for the artifact by `list_artifacts`). A
+        mismatch raises a RuntimeError.
+    hash_algorithm : str
+        The algorithm to hash the zip file with while it downloads, if no
+        digest is given (default is None, which skips hashing), e.g.
+        "sha256". If the zip file is kept, its digest is saved next to it
+        in a sidecar file named after the algorithm.
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+    """
+
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
+    req_url = f"{GITHUB_API_URL}/repos/{repo}/actions/artifacts/{id}/zip"
+    request = urllib.request.Request(req_url)
+    if "github.com" in req_url:
+        github_token = os.environ.get("GITHUB_TOKEN", None)
+        if github_token:
+            request.add_header("Authorization", f"Bearer {github_token}")
+
+    if digest is not None:
+        hash_algorithm = _parse_digest(digest)[0]
+    hasher = _Hasher(hash_algorithm) if hash_algorithm else None
+
+    zip_path = Path(path).expanduser().absolute() / f"{str(uuid4())}.zip"
+    _download(
+        request,
+        zip_path,
+        retries=retries,
+        chunk_size=chunk_size,
+        progress=progress,
+        verbose=verbose,
+        client=client,
+        hasher=hasher,
+    )
+    if hasher is not None:
+        try:
+            _check_digest(req_url, hasher, digest)
+        except RuntimeError:
+            zip_path.unlink()
+            raise
+
+    if verbose:
+        print(f"Uncompressing: {zip_path}")
+
+    tic = timeit.default_timer()
+    z = MFZipFile(zip_path)
+    z.extractall(str(path))
+    z.close()
+
+    if delete_zip:
+        if verbose:
+            print(f"Deleting zipfile {zip_path}")
+        zip_path.unlink()
+    elif hasher is not None:
+        _write_digest_file(zip_path, hasher.digest)
+    _emit("extract", path=str(zip_path), duration=timeit.default_timer() - tic)
+
+
+@dataclass
+class ArtifactDownload:
+    """
+    The result of downloading and extracting a workflow run artifact.
+
+    Attributes
+    ----------
+    id : int
+        The artifact ID
+    name : str
+        The artifact name
+    path : Path
+        The directory the artifact was extracted to
+    size : int
+        The artifact's (zip file) size, in bytes
+    duration : float
+        Seconds spent downloading and extracting the artifact
+    """
+
+    id: int
+    name: str
+    path: Path
+    size: int
+    duration: float
+
+    @property
+    def rate(self) -> float:
+        """The throughput, in bytes per second."""
+        return self.size / self.duration if self.duration > 0 else float("inf")
+
+
+def download_run_artifacts(
+    repo,
+    run_id: int,
+    path: Optional[PathLike] = None,
+    max_workers: int = 4,
+    patterns: Union[str, List[str], None] = None,
+    delete_zip=True,
+    retries=None,
+    verbose=False,
+    client: Optional[GitHubClient] = None,
+    **kwargs,
+) -> List[ArtifactDownload]:
+    """
+    Download and extract the artifacts uploaded by a workflow run. The run's
+    artifacts are listed, then downloaded on a thread pool, each into a
+    subdirectory named after the artifact. Artifacts are streamed to disk
+    in chunks, so memory use is bounded regardless of their size. Expired
+    artifacts are skipped with a warning.
+
+    Parameters
+    ----------
+    repo : str
+        The repository (format must be owner/name)
+    run_id : int
+        The workflow run ID
+    path : PathLike
+        The directory to download to (default is current path)
+    max_workers : int
+        The maximum number of concurrent downloads
+    patterns : str or list of str
+        Glob patterns matched against artifact names, e.g. "bin-*"
+        (default is None, which selects all artifacts)
+    delete_zip : bool
+        Whether to delete zip files after they are extracted (default is True)
+    retries : int
+        The maximum number of retries for each request (default is the client's)
+    verbose : bool
+        Whether to show verbose output
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+    kwargs
+        Other keyword arguments are passed to `download_artifact`
+
+    Returns
+    -------
+    list of ArtifactDownload
+        The artifacts downloaded, with their sizes and download durations
+    """
+
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
+
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("max_workers must be a positive int")
+
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    client = client or get_default_client()
+    path = Path(path if path else os.getcwd()).expanduser()
+    artifacts = list_artifacts(
+        repo,
+        max_pages=None,
+        retries=retries,
+        verbose=verbose,
+        run_id=run_id,
+        client=client,
+    )
+    if patterns is not None:
+        artifacts = [
+            a for a in artifacts if any(fnmatch(a["name"], p) for p in patterns)
+        ]
+        if not any(artifacts):
+            raise ValueError(f"No artifacts of run {run_id} match {patterns}")
+    for artifact in [a for a in artifacts if a.get("expired", False)]:
+        warn(f"Skipping expired artifact {artifact['name']} of run {run_id}")
+        artifacts.remove(artifact)
+
+    def download(artifact) -> ArtifactDownload:
+        artifact_path = path / artifact["name"]
+        artifact_path.mkdir(parents=True, exist_ok=True)
+        tic = timeit.default_timer()
+        download_artifact(
+            repo,
+            artifact["id"],
+            path=artifact_path,
+            delete_zip=delete_zip,
+            retries=retries,
+            verbose=verbose,
+            client=client,
+            **{"digest": artifact.get("digest", None), **kwargs},
+        )
+        return ArtifactDownload(
+            id=artifact["id"],
+            name=artifact["name"],
+            path=artifact_path,
+            size=artifact["size_in_bytes"],
+            duration=timeit.default_timer() - tic,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(download, artifacts))
+
+
+class _FileLock:
+    """
+    An exclusive inter-process lock for work on the given target path, held
+    with `fcntl.flock` on POSIX systems or `msvcrt.locking` on Windows. The
+    lock file is hidden next to the target, and removed by the holder when
+    it releases the lock. Once the work is done, the holder can record that
+    in the lock file, so processes which waited for the lock know they can
+    reuse the result. The key identifies the work, e.g. by its arguments:
+    only work with the same key is reused.
+    """
+
+    def __init__(self, target: PathLike, key: str, poll_interval: float = 0.1):
+        target = Path(target).absolute()
+        self.path = target.with_name(f".{target.name}.lock")
+        self.key = key
+        self.poll_interval = poll_interval
+        self.waited = False
+        self._requested = None
+        self._file = None
+
+    def _try_lock(self) -> bool:
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(self):
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+
+    def _stale(self) -> bool:
+        """Whether the lock file was removed since this process opened it."""
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def __enter__(self):
+        self._requested = time.time()
+        while True:
+            self._file = open(self.path, "a+b")
+            while not self._try_lock():
+                self.waited = True
+                time.sleep(self.poll_interval)
+            # the previous holder removed the file: unless it left the work
+            # done (see `done_while_waiting`), lock the current file instead
+            if not self._stale() or self.done_while_waiting():
+                return self
+            self._unlock()
+
+    def __exit__(self, *exc):
+        try:
+            if not self._stale():
+                os.remove(self.path)
+        except OSError:
+            # e.g. still open in a waiting process, on Windows
+            pass
+        finally:
+            self._unlock()
+
+    def _marker(self) -> Optional[dict]:
+        self._file.seek(0)
+        try:
+            marker = json.loads(self._file.read().decode())
+        except ValueError:
+            return None
+        if not isinstance(marker, dict) or marker.get("time", 0) < self._requested:
+            return None
+        return marker
+
+    def mark_done(self):
+        """Record that the work is complete."""
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(json.dumps({"key": self.key, "time": time.time()}).encode())
+        self._file.flush()
+
+    def done_while_waiting(self) -> bool:
+        """Whether another process completed the work while this one waited."""
+        if not self.waited:
+            return False
+        marker = self._marker()
+        return marker is not None and marker.get("key") == self.key
+
+
+def _publish(staging: Path, path: Path):
+    """
+    Move the staging directory's contents into the given directory and remove
+    it. Files, and directories not yet in the destination, are moved with an
+    atomic rename. Existing directories are merged, a file at a time. Left
+    over partial downloads (`.part` files and their state) are discarded.
+    """
+    for src in staging.iterdir():
+        if src.name.endswith((".part", ".part.json")):
+            continue
+        dst = path / src.name
+        if dst.is_dir() and not dst.is_symlink() and src.is_dir():
+            _move_tree(src, dst)
+        else:
+            os.replace(src, dst)
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def download_and_unzip(
+    url: str,
+    path: Optional[PathLike] = None,
+    delete_zip=True,
+    retries=None,
+    verbose=False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+    segments: int = 1,
+    download_cache: Optional[DownloadCache] = None,
+    stream_extract=False,
+    members: Optional[List[str]] = None,
+    digest: Optional[str] = None,
+    hash_algorithm: Optional[str] = None,
+    client: Optional[GitHubClient] = None,
+) -> Path:
+    """
+    Download and unzip a zip file from a URL.
+    The filename must be the last element in the URL.
+
+    Concurrent calls for the same file and path, e.g. from several pytest-xdist
+    workers, are serialized with an inter-process lock: one process downloads
+    while the others wait, then reuse its result. The file is downloaded and
+    extracted into a hidden staging directory, whose contents are then moved
+    into place with atomic renames, so partially extracted trees are never seen.
+
+    Parameters
+    ----------
+    url : str
+        The zipfile's download URL
+    path : PathLike
+        Path where the zip file will be saved (default is current path)
+    delete_zip : bool
+        Whether the zip file should be deleted after it is unzipped (default is True)
+    retries : int
+        The maximum number of retries for each request (default is the client's)
+    verbose : bool
+        Whether to show verbose output
+    chunk_size : int
+        The number of bytes to read and write at a time while downloading
+    progress : callable
+        Optional callback, called after each chunk with the number of bytes
+        downloaded so far, the total size (or None if unknown), and the
+        throughput in bytes per second
+    segments : int
+        The number of byte ranges to split the file into and download
+        concurrently (default 1, a single stream). Ignored if the server
+        does not support range requests.
+    download_cache : DownloadCache
+        Optional cache of downloaded files. If the URL is cached, the cached
+        contents are linked into the target path instead of downloading.
+    stream_extract : bool
+        Whether to extract tarballs (e.g. `.tar.gz`) while they download,
+        instead of saving and then reading the archive. The archive is
+        only saved if `delete_zip` is False or a `download_cache` is used.
+        Ignored for other files, or if `segments` is greater than 1.
+    members : list of str
+        Glob patterns selecting zip file members to extract, matched against
+        member names with or without their directories. If the server
+        supports range requests, only the zip file's central directory and
+        the selected members are fetched. The `segments`, `download_cache`
+        and `stream_extract` options do not apply.
+    digest : str
+        The file's expected digest, formatted `<algorithm>:<hex>` (e.g.
+        `sha256:...`, as reported for release assets by the GitHub API).
+        A mismatch raises a RuntimeError.
+    hash_algorithm : str
+        The algorithm to hash the file with while it downloads, if no digest
+        is given (default is None, which skips hashing unless a
+        `download_cache` is used), e.g. "sha256". If the file is kept, its
+        digest is saved next to it in a sidecar file named after the
+        algorithm.
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+
+    Returns
+    -------
+    Path
+        The path to the directory where the zip file was unzipped
+    """
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
+    if not isinstance(segments, int) or segments < 1:
+        raise ValueError("segments must be a positive int")
+
+    if digest is not None:
+        _parse_digest(digest)
+
+    path = Path(path if path else os.getcwd())
+    path.mkdir(exist_ok=True)
+    name = url.split("/")[-1]
+
+    # only reuse another process's result if it was asked for the same output
+    key = json.dumps(
+        {
+            "url": url,
+            "delete_zip": bool(delete_zip),
+            "members": list(members) if members is not None else None,
+            "digest": digest,
+            "hash_algorithm": hash_algorithm,
+        }
+    )
+    with _FileLock(path / name, key) as lock:
+        if lock.done_while_waiting():
+            if verbose:
+                print(f"Reusing {name} downloaded to {path} by another process")
+            return path
+
+        staging = path / f".{name}.staging"
+        staging.mkdir(exist_ok=True)
+        try:
+            _download_and_unzip(
+                url,
+                staging,
+                delete_zip=delete_zip,
+                retries=retries,
+                verbose=verbose,
+                chunk_size=chunk_size,
+                progress=progress,
+                segments=segments,
+                download_cache=download_cache,
+                stream_extract=stream_extract,
+                members=members,
+                digest=digest,
+                hash_algorithm=hash_algorithm,
+                client=client,
+            )
+        except BaseException:
+            # keep partial downloads, so a later call can resume them
+            if not any(staging.glob("*.part")):
+                shutil.rmtree(staging, ignore_errors=True)
+            raise
+        _publish(staging, path)
+        lock.mark_done()
+
+    if verbose:
+        print(f"Done downloading and extracting {name} to {path}")
+
+    return path
+
+
+def _download_and_unzip(
+    url: str,
+    path: Path,
+    delete_zip=True,
+    retries=None,
+    verbose=False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+    segments: int = 1,
+    download_cache: Optional[DownloadCache] = None,
+    stream_extract=False,
+    members: Optional[List[str]] = None,
+    digest: Optional[str] = None,
+    hash_algorithm: Optional[str] = None,
+    client: Optional[GitHubClient] = None,
+) -> Path:
+    """
+    Download the file into the given directory and extract it there.
+    See `download_and_unzip` for parameters.
+    """
+
+    client = client or get_default_client()
+    # only record digests which were asked for
+    sidecar = digest is not None or hash_algorithm is not None
+    if digest is not None:
+        hash_algorithm = _parse_digest(digest)[0]
+    elif hash_algorithm is None and download_cache is not None:
+        # the cache records the file's digest, best computed as it arrives
+        hash_algorithm = "sha256"
+    hasher = _Hasher(hash_algorithm) if hash_algorithm else None
+
+    if verbose:
+        print(f"Downloading {url}")
+
+    tic = timeit.default_timer()
+
+    # download zip file
+    file_path = path / url.split("/")[-1]
+    request = urllib.request.Request(url)
+    if "github.com" in url:
+        github_token = os.environ.get("GITHUB_TOKEN", None)
+        if github_token:
+            request.add_header("Authorization", f"Bearer {github_token}")
+
+    if members is not None:
+        if isinstance(members, str):
+            members = [members]
+        if not ("zip" in file_path.suffix or "exe" in file_path.suffix):
+            raise ValueError("members can only be selected from zip files")
+        _extract_members(
+            request,
+            file_path,
+            path,
+            members,
+            delete_zip=delete_zip,
+            retries=retries,
+            chunk_size=chunk_size,
+            progress=progress,
+            verbose=verbose,
+            client=client,
+            hasher=hasher if digest else None,
+            digest=digest,
+        )
+        if digest and not delete_zip:
+            _write_digest_file(file_path, digest)
+        return path
+
+    info = None
+    if download_cache is not None:
+        entry = download_cache.get(url, digest=digest)
+        result = "hit"
+        if entry is None or not download_cache.is_fresh(entry):
+            # look up the file's validators, to check a stale entry
+            # or to record them with the new one
+            info = _probe(request, client)
+            if entry is not None and download_cache.matches(entry, info):
+                download_cache.touch(url, revalidated=True)
+                result = "revalidated"
+            else:
+                entry = None
+                result = "miss"
+        _emit("cache", url=url, cache="download", result=result)
+        if entry is not None:
+            download_cache.link(entry, path, delete_zip=delete_zip, verbose=verbose)
+            if sidecar and file_path.is_file():
+                _write_digest_file(file_path, entry["digest"])
+            return path
+
+    if stream_extract and segments == 1 and _is_tar(file_path.name):
+        # extract into a staging directory, so nothing is published before
+        # the digest is checked. with a cache, stage on its filesystem and
+        # save the archive alongside, then move both into the cache
+        cached = download_cache is not None
+        staging = (download_cache.path if cached else path) / f".{uuid4().hex}"
+        staging.mkdir(parents=True)
+        try:
+            _download_extract_tar(
+                request,
+                staging / file_path.name,
+                staging / "tree",
+                tee=cached or not delete_zip,
+                retries=retries,
+                chunk_size=chunk_size,
+                progress=progress,
+                verbose=verbose,
+                client=client,
+                hasher=hasher,
+            )
+            if hasher is not None:
+                _check_digest(url, hasher, digest)
+            if cached:
+                entry = download_cache.put(
+                    url,
+                    staging / file_path.name,
+                    info,
+                    tree=staging / "tree",
+                    digest=hasher.digest if hasher else None,
+                )
+                download_cache.link(entry, path, delete_zip=delete_zip, verbose=verbose)
+            else:
+                _move_tree(staging / "tree", path)
+                if not delete_zip:
+                    os.replace(staging / file_path.name, file_path)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        if sidecar and file_path.is_file():
+            _write_digest_file(file_path, hasher.digest)
+        if verbose:
+            toc = timeit.default_timer()
+            print(
+                f"\ntotal download and extraction time: {round(toc - tic, 2)} seconds"
+            )
+        return path
+
+    if segments > 1:
+        _download_segmented(
+            request,
+            file_path,
+            segments,
+            retries=retries,
+            chunk_size=chunk_size,
+            progress=progress,
+            verbose=verbose,
+            client=client,
+            hasher=hasher,
+        )
+    else:
+        _download(
+            request,
+            file_path,
+            retries=retries,
+            chunk_size=chunk_size,
+            progress=progress,
+            verbose=verbose,
+            client=client,
+            hasher=hasher,
+        )
+
+    if hasher is not None:
+        try:
+            _check_digest(url, hasher, digest)
+        except RuntimeError:
+            file_path.unlink()
+            raise
+
+    # write the total download time
+    toc = timeit.default_timer()
+    tsec = round(toc - tic, 2)
+    if verbose:
+        print(f"\ntotal download time: {tsec} seconds")
+
+    if download_cache is not None:
+        # extract into the cache, then link the contents here
+        entry = download_cache.put(
+            url, file_path, info, digest=hasher.digest if hasher else None
+        )
+        file_path.unlink()
+        download_cache.link(entry, path, delete_zip=delete_zip, verbose=verbose)
+    else:
+        _extract(file_path, path, delete_zip=delete_zip, verbose=verbose)
+    if sidecar and file_path.is_file():
+        _write_digest_file(file_path, hasher.digest)
+
+    return path
+
+
+@dataclass
+class AssetDownload:
+    """
+    The result of downloading (and extracting) a release asset.
+
+    Attributes
+    ----------
+    name : str
+        The asset name
+    url : str
+        The asset's download URL
+    path : Path
+        The directory the asset was downloaded and extracted to
+    size : int
+        The bytes transferred, which is less than the asset's size if only
+        some `members` were fetched, and 0 if it was served from a
+        `download_cache`
+    duration : float
+        Seconds spent downloading and extracting the asset
+    """
+
+    name: str
+    url: str
+    path: Path
+    size: int
+    duration: float
+
+
+_ARCHIVE_SUFFIXES = _TAR_SUFFIXES + (".zip",)
+
+
+def _archive_stem(name: str) -> str:
+    for suffix in _ARCHIVE_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def download_release_assets(
+    repo,
+    tag="latest",
+    patterns: Union[str, List[str], None] = None,
+    path: Optional[PathLike] = None,
+    max_workers: int = 4,
+    subdirs=True,
+    delete_zip=True,
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    client: Optional[GitHubClient] = None,
+    **kwargs,
+) -> List[AssetDownload]:
+    """
+    Download and extract a release's assets concurrently. The release is
+    resolved once, then assets matching any of the given patterns are
+    downloaded on a thread pool, so the total time is bounded by the
+    slowest asset rather than the sum of all of them. Assets are checked
+    against the digests reported by the GitHub API, where available.
+
+    Parameters
+    ----------
+    repo : str
+        The repository (format must be owner/name)
+    tag : str
+        The release tag to download assets from
+    patterns : str or list of str
+        Glob patterns matched against asset names, e.g. "*linux*.zip"
+        (default is None, which selects all assets)
+    path : PathLike
+        The directory to download to (default is current path)
+    max_workers : int
+        The maximum number of concurrent downloads
+    subdirs : bool
+        Whether to extract each asset into a subdirectory named after it,
+        minus the archive suffix, e.g. "linux" for "linux.zip" (default is
+        True, so that assets with overlapping contents do not clobber one
+        another)
+    delete_zip : bool
+        Whether archives should be deleted after extraction (default is True)
+    retries : int
+        The maximum number of retries for each request (default is the client's)
+    verbose : bool
+        Whether to show verbose output
+    cache : ResponseCache
+        Optional cache for API responses (default is the client's)
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`)
+    kwargs
+        Further keyword arguments passed to `download_and_unzip`, e.g.
+        `chunk_size` or `segments`
+
+    Returns
+    -------
+        A list of `AssetDownload` results, in the release's asset order.
+    """
+
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("max_workers must be a positive int")
+
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    path = Path(path if path else os.getcwd()).expanduser()
+    release = get_release(
+        repo, tag=tag, retries=retries, verbose=verbose, cache=cache, client=client
+    )
+    assets = [
+        a
+        for a in release["assets"]
+        if patterns is None or any(fnmatch(a["name"], p) for p in patterns)
+    ]
+    if not any(assets):
+        raise ValueError(
+            f"No assets of release {release['tag_name']} match {patterns} "
+            f"(choose from {', '.join(a['name'] for a in release['assets'])})"
+        )
+
+    def download(asset) -> AssetDownload:
+        url = asset["browser_download_url"]
+        asset_path = path / _archive_stem(asset["name"]) if subdirs else path
+        asset_path.mkdir(parents=True, exist_ok=True)
+
+        # count the bytes transferred, from this thread's download events
+        thread = get_ident()
+        transferred = 0
+
+        def count(event):
+            nonlocal transferred
+            if (
+                event["event"] == "download"
+                and event["url"] == url
+                and get_ident() == thread
+            ):
+                transferred += event["bytes"]
+
+        tic = timeit.default_timer()
+        # verify against the digest GitHub reports, where available
+        asset_kwargs = {"digest": asset.get("digest", None), **kwargs}
+        add_listener(count)
+        try:
+            download_and_unzip(
+                url,
+                asset_path,
+                delete_zip=delete_zip,
+                retries=retries,
+                verbose=verbose,
+                client=client,
+                **asset_kwargs,
+            )
+        finally:
+            remove_listener(count)
+        return AssetDownload(
+            name=asset["name"],
+            url=url,
+            path=asset_path,
+            size=transferred,
+            duration=timeit.default_timer() - tic,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(download, assets))
+
+
+def _write_json(file_path: Path, data):
+    """Write JSON to the given file with an atomic rename."""
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_name(f".{file_path.name}.{uuid4().hex}")
+    tmp_path.write_text(json.dumps(data))
+    os.replace(tmp_path, file_path)
+
+
+def mirror_repo(
+    repo,
+    tags: Union[str, List[str], None] = "latest",
+    path: Optional[PathLike] = None,
+    patterns: Union[str, List[str], None] = None,
+    max_workers: Optional[int] = None,
+    retries=None,
+    verbose=False,
+    client: Optional[GitHubClient] = None,
+) -> Path:
+    """
+    Populate a mirror directory (see `Mirror`) with the given repository's
+    releases and their assets, for use on machines without access to GitHub.
+    Releases are looked up and assets downloaded concurrently. Assets already
+    in the mirror are skipped, and releases are added to those already in it,
+    so a mirror can be kept up to date by calling this function again.
+
+    Parameters
+    ----------
+    repo : str
+        The repository (format must be owner/name)
+    tags : str or list of str
+        The release tags to mirror (default is the latest release), or
+        None to mirror all releases
+    path : PathLike
+        The mirror directory (default is current path)
+    patterns : str or list of str
+        Glob patterns matched against asset names, e.g. "*linux*.zip"
+        (default is None, which mirrors all assets)
+    max_workers : int
+        The maximum number of concurrent requests (default is
+        `ThreadPoolExecutor`'s default)
+    retries : int
+        The maximum number of retries for each request (default is the client's)
+    verbose : bool
+        Whether to show verbose output
+    client : GitHubClient
+        The client to send requests with (default is `get_default_client()`),
+        which must not itself use a mirror
+
+    Returns
+    -------
+    Path
+        The mirror directory
+    """
+
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
+    if client.mirror is not None:
+        raise ValueError("cannot populate a mirror with a client using one")
+
+    if max_workers is not None and (
+        not isinstance(max_workers, int) or max_workers < 1
+    ):
+        raise ValueError("max_workers must be a positive int")
+
+    if isinstance(tags, str):
+        tags = [tags]
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    mirror = Mirror(Path(path if path else os.getcwd()))
+    api_url = f"{GITHUB_API_URL}/repos/{repo}/releases"
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        if tags is None:
+            releases = get_releases(
+                repo, max_pages=None, retries=retries, verbose=verbose, client=client
+            )
+            latest = next(
+                (r for r in releases if not (r["draft"] or r["prerelease"])), None
+            )
+        else:
+            releases = list(
+                pool.map(
+                    partial(get_release, repo, retries=retries, client=client), tags
+                )
+            )
+            latest = releases[tags.index("latest")] if "latest" in tags else None
+
+        for release in releases:
+            tag_name = release["tag_name"]
+            _write_json(mirror.locate(f"{api_url}/tags/{tag_name}.json"), release)
+            _write_json(mirror.locate(f"{api_url}/{release['id']}.json"), release)
+        if latest is not None:
+            _write_json(mirror.locate(f"{api_url}/latest.json"), latest)
+
+        # add the releases to those already mirrored, newest first
+        listing_path = mirror.locate(f"{api_url}.json")
+        listing = {
+            r["id"]: r
+            for r in (
+                json.loads(listing_path.read_text()) if listing_path.is_file() else []
+            )
+        }
+        listing.update({r["id"]: r for r in releases})
+        _write_json(
+            listing_path,
+            sorted(listing.values(), key=lambda r: r["created_at"], reverse=True),
+        )
+
+        def download(asset):
+            url = asset["browser_download_url"]
+            file_path = mirror.locate(url)
+            if file_path.is_file() and file_path.stat().st_size == asset["size"]:
+                return
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            digest = asset.get("digest", None)
+            hasher = _Hasher(_parse_digest(digest)[0]) if digest else None
+            _download(
+                urllib.request.Request(url),
+                file_path,
+                retries=retries,
+                verbose=verbose,
+                client=client,
+                hasher=hasher,
+            )
+            if hasher is not None:
+                try:
+                    _check_digest(url, hasher, digest)
+                except RuntimeError:
+                    file_path.unlink()
+                    raise
+
+        assets = [
+            a
+            for r in releases
+            for a in r["assets"]
+            if patterns is None or any(fnmatch(a["name"], p) for p in patterns)
+        ]
+        list(pool.map(download, assets))
+
+    if verbose:
+        print(f"Mirrored {len(releases)} releases of {repo} to {mirror.path}")
+
+    return mirror.path
+
+
+# asyncio API
+
+
+class _AsyncResponse:
+    """
+    A response read from a non-blocking connection. Supports bodies
+    delimited by `Content-Length`, chunked transfer encoding, or EOF.
+    """
+
+    def __init__(self, reader, writer, status, reason, headers, url, method, timeout):
+        self._reader = reader
+        self._writer = writer
+        self._timeout = timeout
+        self.status = self.code = status
+        self.reason = reason
+        self.headers = headers
+        self.url = url
+
+        self._chunked = "chunked" in headers.get("Transfer-Encoding", "").lower()
+        self._chunk_left = 0
+        length = headers.get("Content-Length", None)
+        self._remaining = int(length) if length is not None else None
+        self._eof = method == "HEAD" or status in (204, 304) or self._remaining == 0
+
+    async def _read(self, coro):
+        return await asyncio.wait_for(coro, self._timeout)
+
+    async def read(self, n: int = -1) -> bytes:
+        """
+        Read up to `n` bytes of the body, or all of it if `n` is negative.
+        Returns an empty bytestring at the end of the body.
+        """
+        if n < 0:
+            parts = []
+            while True:
+                part = await self.read(DEFAULT_CHUNK_SIZE)
+                if not part:
+                    return b"".join(parts)
+                parts.append(part)
+
+        if self._eof or n == 0:
+            return b""
+
+        if self._chunked:
+            if self._chunk_left == 0:
+                line = await self._read(self._reader.readline())
+                self._chunk_left = int(line.split(b";")[0].strip() or b"0", 16)
+                if self._chunk_left == 0:
+                    # skip trailers
+                    while (await self._read(self._reader.readline())) not in (
+                        b"\r\n",
+                        b"\n",
+                        b"",
+                    ):
+                        pass
+                    self._eof = True
+                    return b""
+            data = await self._read(self._reader.read(min(n, self._chunk_left)))
+            if not data:
+                raise http.client.IncompleteRead(b"", self._chunk_left)
+            self._chunk_left -= len(data)
+            if self._chunk_left == 0:
+                await self._read(self._reader.readline())
+            return data
+
+        if self._remaining is not None:
+            n = min(n, self._remaining)
+        data = await self._read(self._reader.read(n))
+        if self._remaining is not None:
+            if not data:
+                raise http.client.IncompleteRead(b"", self._remaining)
+            self._remaining -= len(data)
+            self._eof = self._remaining == 0
+        elif not data:
+            self._eof = True
+        return data
+
+    async def aclose(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+class _AsyncMirrorResponse(_MirrorResponse):
+    """A response from a mirror directory, for the asynchronous API."""
+
+    async def read(self, n: int = -1) -> bytes:
+        return self._read(n)
+
+    async def aclose(self):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+async def _aurlopen(request, timeout: Optional[float] = None, client=None):
+    """
+    Send a `urllib.request.Request` over a non-blocking connection, following
+    redirects. Like `urllib.request.urlopen`, HTTP error statuses (and `304
+    Not Modified`) raise `urllib.error.HTTPError`. Settings (token, default
+    timeout, rate limiter) are taken from the client, but connections are
+    not pooled. See `GitHubClient.urlopen()` for rate limiting.
+    """
+    client = client or get_default_client()
+    url = request.full_url
+    if client.mirror is not None and _mirrored(url):
+        if client.mirror.path is not None:
+            return client.mirror._open(request, _AsyncMirrorResponse)
+        return await _asend(client.mirror._request(request), timeout, client)
+    if not url.startswith(GITHUB_API_URL):
+        return await _asend(request, timeout, client)
+
+    resource = "graphql" if url.endswith("/graphql") else "core"
+    tries = 0
+    while True:
+        tries += 1
+        wait = client.rate_limiter.schedule(resource)
+        if wait > 0:
+            _emit("wait", resource=resource, duration=wait)
+        await asyncio.sleep(wait)
+        try:
+            response = await _asend(request, timeout, client)
+        except urllib.error.HTTPError as err:
+            limited = client.rate_limiter.update(err.headers, err.code)
+            if limited and tries < client.retries:
+                warn(f"URL request try {tries} was rate-limited ({err})")
+                _emit("retry", url=request.full_url, attempt=tries, error=str(err))
+                continue
+            raise
+        client.rate_limiter.update(response.headers, response.status)
+        return response
+
+
+async def _asend(request, timeout: Optional[float], client: GitHubClient):
+    timeout = client.timeout if timeout is None else timeout
+    url = request.full_url
+    method = request.get_method()
+    body = request.data
+    headers = {k.title(): v for k, v in request.header_items()}
+    headers.setdefault("User-Agent", USER_AGENT)
+    headers["Accept-Encoding"] = "identity"
+    headers["Connection"] = "close"
+    token = client.token or os.environ.get("GITHUB_TOKEN", None)
+    if token and "github.com" in urllib.parse.urlsplit(url).netloc:
+        headers["Authorization"] = f"Bearer {token}"
+
+    for _ in range(10):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {url}")
+        https = parts.scheme == "https"
+        port = parts.port or (443 if https else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {parts.netloc}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        # the DNS lookup, connection and TLS handshake are timed together
+        timings = {"dns": None, "connect": None, "tls": None}
+        try:
+            tic = time.perf_counter()
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    parts.hostname,
+                    port,
+                    ssl=ssl.create_default_context() if https else None,
+                ),
+                timeout,
+            )
+            timings["connect"] = time.perf_counter() - tic
+            tic = time.perf_counter()
+            writer.write(head + (body or b""))
+            await asyncio.wait_for(writer.drain(), timeout)
+            status_line = await asyncio.wait_for(reader.readline(), timeout)
+            ttfb = time.perf_counter() - tic
+            version, status, reason = (
+                status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""]
+            )[:3]
+            status = int(status)
+            header_lines = []
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                header_lines.append(line.decode("latin-1"))
+        except (OSError, asyncio.TimeoutError, ValueError) as err:
+            _emit(
+                "request",
+                url=url,
+                method=method,
+                status=None,
+                reused=False,
+                error=str(err),
+                **timings,
+            )
+            raise urllib.error.URLError(err) from err
+
+        resp_headers = email.parser.Parser(_class=http.client.HTTPMessage).parsestr(
+            "".join(header_lines)
+        )
+        _emit(
+            "request",
+            url=url,
+            method=method,
+            status=status,
+            reused=False,
+            ttfb=ttfb,
+            **timings,
+        )
+        resp = _AsyncResponse(
+            reader, writer, status, reason, resp_headers, url, method, timeout
+        )
+        if status in (301, 302, 303, 307, 308) and "Location" in resp_headers:
+            await resp.aclose()
+            location = urllib.parse.urljoin(url, resp_headers["Location"])
+            if urllib.parse.urlsplit(location).netloc != parts.netloc:
+                headers.pop("Authorization", None)
+            if status == 303 or (status in (301, 302) and method == "POST"):
+                method, body = "GET", None
+            url = location
+            continue
+        if status >= 300:
+            content = await resp.read()
+            await resp.aclose()
+            raise urllib.error.HTTPError(
+                url, status, reason, resp_headers, BytesIO(content)
+            )
+        return resp
+
+    raise urllib.error.URLError(f"too many redirects for {request.full_url}")
+
+
+async def aget_json(
+    request,
+    cache: Optional[ResponseCache] = None,
+    timeout: Optional[float] = None,
+    client: Optional[GitHubClient] = None,
+):
+    """Asynchronous counterpart of `get_json`."""
+    return (await _aget_json(request, cache=cache, timeout=timeout, client=client))[0]
+
+
+async def _aget_json(request, cache=None, timeout=None, client=None):
+    """Like `aget_json`, but also return the response headers."""
+    url = request.full_url
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        cache.touch(url)
+        _emit("cache", url=url, cache="response", result="hit")
+        return json.loads(entry["body"]), _entry_headers(entry)
+
+    try:
+        async with await _aurlopen(request, timeout=timeout, client=client) as resp:
+            body = (await resp.read()).decode()
+            remaining = resp.headers.get("x-ratelimit-remaining", None)
+            if remaining is not None and int(remaining) <= 10:
+                warn(
+                    f"Only {remaining} GitHub API requests remaining "
+                    "before rate-limiting"
+                )
+            if cache is not None:
+                cache.put(url, body, resp.headers)
+                _emit("cache", url=url, cache="response", result="miss")
+            return json.loads(body), resp.headers
+    except urllib.error.HTTPError as err:
+        if err.code == 304 and entry is not None:
+            cache.touch(url, revalidated=True)
+            _emit("cache", url=url, cache="response", result="revalidated")
+            return json.loads(entry["body"]), _entry_headers(entry)
+        raise
+
+
+async def _aget_page(
+    req_url, params, page, retries=3, cache=None, msg=None, client=None
+):
+    """Asynchronous counterpart of `_get_page`."""
+    client = client or get_default_client()
+    tries = 0
+    request = get_request(req_url, params={**params, "page": page}, cache=cache)
+    while True:
+        tries += 1
+        try:
+            if msg:
+                print(msg)
+            return await _aget_json(request, cache=cache, client=client)
+        except urllib.error.HTTPError as err:
+            if err.code == 401 and os.environ.get("GITHUB_TOKEN"):
+                raise ValueError("GITHUB_TOKEN env is invalid") from err
+            elif err.code == 403 and "rate limit exceeded" in err.reason:
+                raise ValueError(
+                    f"use GITHUB_TOKEN env to bypass rate limit ({err})"
+                ) from err
+            elif err.code in (404, 503) and tries < retries:
+                # GitHub sometimes returns this error for valid URLs, so retry
+                warn(f"URL request try {tries} failed ({err})")
+                _emit("retry", url=request.full_url, attempt=tries, error=str(err))
+                await asyncio.sleep(client.rate_limiter.backoff(tries))
+                continue
+            raise RuntimeError(f"cannot retrieve data from {req_url}") from err
+
+
+async def aget_releases(
+    repo,
+    per_page=30,
+    max_pages=10,
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    client: Optional[GitHubClient] = None,
+) -> List[dict]:
+    """
+    Asynchronous counterpart of `get_releases`. Pages after the first
+    are fetched concurrently. See `get_releases` for parameters.
+    """
+
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
+
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    cache = client.cache if cache is None else cache
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
+    params = {}
+    if per_page is not None:
+        if per_page < 1 or per_page > 100:
+            raise ValueError("per_page must be between 1 and 100")
+        params["per_page"] = per_page
+
+    req_url = f"{GITHUB_API_URL}/repos/{repo}/releases"
+
+    def get_page(page):
+        msg = f"Fetching releases for repo {repo} (page {page}, {per_page} per page)"
+        return _aget_page(
+            req_url,
+            params,
+            page,
+            retries,
+            cache,
+            msg=msg if verbose else None,
+            client=client,
+        )
+
+    page_size = per_page or 30
+    max_pages = max_pages if max_pages else sys.maxsize
+    releases, headers = await get_page(1)
+    last = _last_page(headers)
+    if last is not None:
+        pages = range(2, min(last, max_pages) + 1)
+        for rels, _ in await asyncio.gather(*(get_page(p) for p in pages)):
+            releases.extend(rels)
+    else:
+        page, rels = 1, releases
+        while any(rels) and len(rels) >= page_size and page < max_pages:
+            page += 1
+            rels, _ = await get_page(page)
+            releases.extend(rels)
+
+    if verbose:
+        print(f"Found {len(releases)} releases for {repo}")
+
+    return releases
+
+
+async def aget_release(
+    repo,
+    tag="latest",
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    client: Optional[GitHubClient] = None,
+) -> dict:
+    """
+    Asynchronous counterpart of `get_release`. See `get_release` for parameters.
     """
 
     if "/" not in repo:
@@ -138,31 +4936,26 @@ def get_release(repo, tag="latest", retries=3, verbose=False) -> dict:
     if not isinstance(tag, str) or not any(tag):
         raise ValueError("tag must be a non-empty string")
 
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    cache = client.cache if cache is None else cache
     if not isinstance(retries, int) or retries < 1:
         raise ValueError("retries must be a positive int")
 
-    req_url = f"https://api.github.com/repos/{repo}"
+    req_url = f"{GITHUB_API_URL}/repos/{repo}"
     req_url = (
         f"{req_url}/releases/latest"
         if tag == "latest"
         else f"{req_url}/releases/tags/{tag}"
     )
-    request = get_request(req_url)
-    releases = None
+    request = get_request(req_url, cache=cache)
     num_tries = 0
 
     while True:
         num_tries += 1
         try:
-            with urllib.request.urlopen(request, timeout=10) as resp:
-                result = resp.read()
-                remaining = int(resp.headers["x-ratelimit-remaining"])
-                if remaining <= 10:
-                    warn(
-                        f"Only {remaining} GitHub API requests remaining "
-                        "before rate-limiting"
-                    )
-                break
+            release = await aget_json(request, cache=cache, client=client)
+            break
         except urllib.error.HTTPError as err:
             if err.code == 401 and os.environ.get("GITHUB_TOKEN"):
                 raise ValueError("GITHUB_TOKEN env is invalid") from err
@@ -171,136 +4964,71 @@ def get_release(repo, tag="latest", retries=3, verbose=False) -> dict:
                     f"use GITHUB_TOKEN env to bypass rate limit ({err})"
                 ) from err
             elif err.code == 404:
-                if releases is None:
-                    releases = get_releases(repo, verbose=verbose)
-                if tag not in releases:
+                releases = await aget_releases(
+                    repo, verbose=verbose, cache=cache, client=client
+                )
+                tags = [r["tag_name"] for r in releases]
+                if tag not in tags:
                     raise ValueError(
-                        f"Release {tag} not found (choose from {', '.join(releases)})"
+                        f"Release {tag} not found (choose from {', '.join(tags)})"
                     )
             elif err.code == 503 and num_tries < retries:
                 # GitHub sometimes returns this error for valid URLs, so retry
                 warn(f"URL request {num_tries} failed ({err})")
+                _emit("retry", url=request.full_url, attempt=num_tries, error=str(err))
+                await asyncio.sleep(client.rate_limiter.backoff(num_tries))
                 continue
             raise RuntimeError(f"cannot retrieve data from {req_url}") from err
 
-    release = json.loads(result.decode())
-    tag_name = release["tag_name"]
     if verbose:
-        print(f"fetched release {tag_name!r} info from {repo}")
+        print(f"fetched release {release['tag_name']!r} info from {repo}")
 
     return release
 
 
-def get_latest_version(repo, retries=3, verbose=False) -> str:
-    """
-    Get the repository's latest release version tag.
-
-    Parameters
-    ----------
-    repo : str
-        The repository (format must be owner/name)
-    retries : int
-        The maximum number of retries for each request
-    verbose : bool
-        Whether to show verbose output
-
-    Returns
-    -------
-        The latest release tag name (a string).
-    """
-
-    if "/" not in repo:
-        raise ValueError("repo format must be owner/name")
-
-    if not isinstance(retries, int) or retries < 1:
-        raise ValueError("retries must be a positive int")
-
-    release = get_release(repo, retries=retries, verbose=verbose)
-    return release["tag_name"]
-
-
-def get_release_assets(
-    repo, tag="latest", simple=False, retries=3, verbose=False
-) -> Union[dict, List[dict]]:
+async def aget_latest_version(
+    repo,
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    client: Optional[GitHubClient] = None,
+) -> str:
     """
-    Get assets corresponding to the given release.
-
-    Parameters
-    ----------
-    repo : str
-        The repository (format must be owner/name)
-    tag : str
-        The release tag to retrieve assets for
-    simple : bool
-        If True, return a dict mapping asset names to download URLs, otherwise (by
-        default) a list of dicts containing asset info as returned by the GitHub API
-    retries : int
-        The maximum number of retries for each request
-    verbose : bool
-        Whether to show verbose output
-
-    Returns
-    -------
-        A list of dicts if simple is False, one per release asset.
-        If simple is True, a dict mapping asset names to download URLs.
+    Asynchronous counterpart of `get_latest_version`.
+    See `get_latest_version` for parameters.
     """
-
-    if "/" not in repo:
-        raise ValueError("repo format must be owner/name")
-
-    if not isinstance(tag, str) or not any(tag):
-        raise ValueError("tag must be a non-empty string")
-
-    if not isinstance(retries, int) or retries < 1:
-        raise ValueError("retries must be a positive int")
-
-    release = get_release(repo, tag=tag, retries=retries, verbose=verbose)
-    return (
-        {a["name"]: a["browser_download_url"] for a in release["assets"]}
-        if simple
-        else release["assets"]
+    release = await aget_release(
+        repo, retries=retries, verbose=verbose, cache=cache, client=client
     )
+    return release["tag_name"]
 
 
-def list_artifacts(
-    repo, name=None, per_page=30, max_pages=10, retries=3, verbose=False
+async def alist_artifacts(
+    repo,
+    name=None,
+    per_page=30,
+    max_pages=10,
+    retries=None,
+    verbose=False,
+    cache: Optional[ResponseCache] = None,
+    client: Optional[GitHubClient] = None,
 ) -> List[dict]:
     """
-    List artifacts for the given repository, optionally filtering by name (exact match).
-    If more artifacts are available than will fit within the given page size, by default
-    requests are made until all artifacts are retrieved. The number of requests made can
-    be limited with the max_pages parameter.
-
-    Parameters
-    ----------
-    repo : str
-        The repository (format must be owner/name)
-    name : str
-        The artifact name (must be an exact match)
-    per_page : int
-        The number of artifacts to return per page (must be between 1-100, inclusive)
-    max_pages : int
-        The maximum number of pages to retrieve (i.e. the number of requests to make)
-    retries : int
-        The maximum number of retries for each request
-    verbose : bool
-        Whether to show verbose output
-
-    Returns
-    -------
-        A list of dictionaries, each containing information
-        about an artifact as returned by the GitHub API.
+    Asynchronous counterpart of `list_artifacts`. Pages after the first
+    are fetched concurrently. See `list_artifacts` for parameters.
     """
 
     if "/" not in repo:
         raise ValueError("repo format must be owner/name")
 
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    cache = client.cache if cache is None else cache
     if not isinstance(retries, int) or retries < 1:
         raise ValueError("retries must be a positive int")
 
     msg = f"artifact(s) for {repo}" + (f" matching name {name}" if name else "")
-    req_url = f"https://api.github.com/repos/{repo}/actions/artifacts"
-    page = 1
+    req_url = f"{GITHUB_API_URL}/repos/{repo}/actions/artifacts"
     params = {}
 
     if name is not None:
@@ -313,42 +5041,30 @@ def list_artifacts(
             raise ValueError("per_page must be between 1 and 100")
         params["per_page"] = int(per_page)
 
-    def get_response_json():
-        tries = 0
-        params["page"] = page
-        request = get_request(req_url, params=params)
-        while True:
-            tries += 1
-            try:
-                if verbose:
-                    print(f"Fetching {msg} (page {page}, {per_page} per page)")
-                with urllib.request.urlopen(request, timeout=10) as resp:
-                    return json.loads(resp.read().decode())
-            except urllib.error.HTTPError as err:
-                if err.code == 401 and os.environ.get("GITHUB_TOKEN"):
-                    raise ValueError("GITHUB_TOKEN env is invalid") from err
-                elif err.code == 403 and "rate limit exceeded" in err.reason:
-                    raise ValueError(
-                        f"use GITHUB_TOKEN env to bypass rate limit ({err})"
-                    ) from err
-                elif err.code in (404, 503) and tries < retries:
-                    # GitHub sometimes returns this error for valid URLs, so retry
-                    warn(f"URL request try {tries} failed ({err})")
-                    continue
-                raise RuntimeError(f"cannot retrieve data from {req_url}") from err
+    async def get_page(page):
+        page_msg = f"Fetching {msg} (page {page}, {per_page} per page)"
+        result, _ = await _aget_page(
+            req_url,
+            params,
+            page,
+            retries,
+            cache,
+            msg=page_msg if verbose else None,
+            client=client,
+        )
+        return result
 
-    artifacts = []
-    diff = 1
     max_pages = max_pages if max_pages else sys.maxsize
-    while diff > 0 and page <= max_pages:
-        result = get_response_json()
-        total = result["total_count"]
-        if page == 1:
-            print(f"Repo {repo} has {total} artifact(s)")
+    result = await get_page(1)
+    total = result["total_count"]
+    if verbose:
+        print(f"Repo {repo} has {total} artifact(s)")
+    artifacts = result["artifacts"]
 
-        page += 1
-        artifacts.extend(result["artifacts"])
-        diff = total - len(artifacts)
+    last = min(-(-total // (per_page or 30)), max_pages)
+    if any(artifacts) and last > 1:
+        for result in await asyncio.gather(*(get_page(p) for p in range(2, last + 1))):
+            artifacts.extend(result["artifacts"])
 
     if verbose:
         print(f"Found {len(artifacts)} {msg}")
@@ -356,107 +5072,144 @@ def list_artifacts(
     return artifacts
 
 
-def download_artifact(
-    repo,
-    id,
-    path: Optional[PathLike] = None,
-    delete_zip=True,
+async def _adownload(
+    request,
+    file_path: Path,
     retries=3,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
     verbose=False,
-):
+    client: Optional[GitHubClient] = None,
+) -> int:
     """
-    Download and unzip a GitHub Actions artifact, selected by its ID.
-
-    Parameters
-    ----------
-    repo : str
-        The repository (format must be owner/name)
-    id : str
-        The artifact ID
-    path : PathLike
-        Path where the zip file will be saved (default is current path)
-    delete_zip : bool
-        Whether the zip file should be deleted after it is unzipped (default is True)
-    retries : int
-        The maximum number of retries for each request
-    verbose : bool
-        Whether to show verbose output
+    Asynchronous counterpart of `_download`, without resumption. Disk writes
+    are offloaded to the default executor so they don't block the event loop.
+    Stalled transfers time out (after the client's timeout) and are retried.
     """
 
-    if "/" not in repo:
-        raise ValueError("repo format must be owner/name")
-
-    if not isinstance(retries, int) or retries < 1:
-        raise ValueError("retries must be a positive int")
-
-    req_url = f"https://api.github.com/repos/{repo}/actions/artifacts/{id}/zip"
-    request = urllib.request.Request(req_url)
-    if "github.com" in req_url:
-        github_token = os.environ.get("GITHUB_TOKEN", None)
-        if github_token:
-            request.add_header("Authorization", f"Bearer {github_token}")
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("chunk_size must be a positive int")
 
-    zip_path = Path(path).expanduser().absolute() / f"{str(uuid4())}.zip"
+    client = client or get_default_client()
+    loop = asyncio.get_running_loop()
+    url = request.full_url
+    part_path = file_path.with_name(f"{file_path.name}.part")
     tries = 0
     while True:
         tries += 1
         try:
-            with urllib.request.urlopen(request) as url_file, open(
-                zip_path, "wb"
-            ) as out_file:
-                content = url_file.read()
-                out_file.write(content)
-                break
-        except urllib.error.HTTPError as err:
+            async with await _aurlopen(request, client=client) as resp:
+                file_size = resp.headers.get("Content-Length", None)
+                total = int(file_size) if file_size else None
+                if verbose and total:
+                    print(f"   file size: {total:,d} bytes")
+                with open(part_path, "wb") as out_file:
+                    if total:
+                        await loop.run_in_executor(None, _preallocate, out_file, total)
+                    written = 0
+                    tic = timeit.default_timer()
+                    while True:
+                        data = await resp.read(chunk_size)
+                        if not data:
+                            break
+                        await loop.run_in_executor(None, out_file.write, data)
+                        written += len(data)
+                        if progress:
+                            elapsed = timeit.default_timer() - tic
+                            progress(
+                                written, total, written / elapsed if elapsed else 0.0
+                            )
+            os.replace(part_path, file_path)
+            duration = timeit.default_timer() - tic
+            _emit(
+                "download",
+                url=url,
+                bytes=written,
+                size=written,
+                offset=0,
+                duration=duration,
+                rate=written / duration if duration > 0 else None,
+                retries=tries - 1,
+            )
+            return written
+        # before Python 3.11, asyncio.TimeoutError isn't an OSError
+        except (OSError, asyncio.TimeoutError, http.client.HTTPException) as err:
             if tries < retries:
-                warn(f"URL request try {tries} failed ({err})")
+                warn(f"URL request try {tries} failed ({err or 'timed out'})")
+                _emit(
+                    "retry",
+                    url=request.full_url,
+                    attempt=tries,
+                    error=str(err) or "timed out",
+                )
+                await asyncio.sleep(client.rate_limiter.backoff(tries))
                 continue
-            else:
-                raise RuntimeError(f"cannot retrieve data from {req_url}") from err
+            if part_path.exists():
+                part_path.unlink()
+            raise RuntimeError(f"cannot retrieve data from {url}") from err
 
-    if verbose:
-        print(f"Uncompressing: {zip_path}")
 
-    z = MFZipFile(zip_path)
-    z.extractall(str(path))
-    z.close()
+async def adownload_artifact(
+    repo,
+    id,
+    path: Optional[PathLike] = None,
+    delete_zip=True,
+    retries=None,
+    verbose=False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+    client: Optional[GitHubClient] = None,
+):
+    """
+    Asynchronous counterpart of `download_artifact`. Extraction runs in
+    the default executor. See `download_artifact` for parameters.
+    """
 
-    if delete_zip:
-        if verbose:
-            print(f"Deleting zipfile {zip_path}")
-        zip_path.unlink()
+    if "/" not in repo:
+        raise ValueError("repo format must be owner/name")
 
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
 
-def download_and_unzip(
+    req_url = f"{GITHUB_API_URL}/repos/{repo}/actions/artifacts/{id}/zip"
+    path = Path(path if path else os.getcwd()).expanduser().absolute()
+    zip_path = path / f"{str(uuid4())}.zip"
+    await _adownload(
+        get_request(req_url),
+        zip_path,
+        retries=retries,
+        chunk_size=chunk_size,
+        progress=progress,
+        verbose=verbose,
+        client=client,
+    )
+    await asyncio.get_running_loop().run_in_executor(
+        None, partial(_extract, zip_path, path, delete_zip=delete_zip, verbose=verbose)
+    )
+
+
+async def adownload_and_unzip(
     url: str,
     path: Optional[PathLike] = None,
     delete_zip=True,
-    retries=3,
+    retries=None,
     verbose=False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, Optional[int], float], None]] = None,
+    client: Optional[GitHubClient] = None,
 ) -> Path:
     """
-    Download and unzip a zip file from a URL.
-    The filename must be the last element in the URL.
-
-    Parameters
-    ----------
-    url : str
-        The zipfile's download URL
-    path : PathLike
-        Path where the zip file will be saved (default is current path)
-    delete_zip : bool
-        Whether the zip file should be deleted after it is unzipped (default is True)
-    retries : int
-        The maximum number of retries for each request
-    verbose : bool
-        Whether to show verbose output
-
-    Returns
-    -------
-    Path
-        The path to the directory where the zip file was unzipped
+    Asynchronous counterpart of `download_and_unzip`. Extraction runs in
+    the default executor. See `download_and_unzip` for parameters.
     """
 
+    client = client or get_default_client()
+    retries = client.retries if retries is None else retries
+    if not isinstance(retries, int) or retries < 1:
+        raise ValueError("retries must be a positive int")
+
     path = Path(path if path else os.getcwd())
     path.mkdir(exist_ok=True)
 
@@ -464,77 +5217,23 @@ def download_and_unzip(
         print(f"Downloading {url}")
 
     tic = timeit.default_timer()
-
-    # download zip file
     file_path = path / url.split("/")[-1]
-    request = urllib.request.Request(url)
-    if "github.com" in url:
-        github_token = os.environ.get("GITHUB_TOKEN", None)
-        if github_token:
-            request.add_header("Authorization", f"Bearer {github_token}")
-
-    tries = 0
-    while True:
-        tries += 1
-        try:
-            with urllib.request.urlopen(request) as url_file, open(
-                file_path, "wb"
-            ) as out_file:
-                content = url_file.read()
-                out_file.write(content)
-
-                # if verbose, print content length (if available)
-                tag = "Content-length"
-                if verbose and tag in url_file.headers:
-                    file_size = url_file.headers[tag]
-                    len_file_size = len(file_size)
-                    file_size = int(file_size)
-
-                    bfmt = "{:" + f"{len_file_size}" + ",d}"
-                    sbfmt = "{:>" + f"{len(bfmt.format(int(file_size)))}" + "s} bytes"
-                    print(f"   file size: {sbfmt.format(bfmt.format(int(file_size)))}")
-
-                break
-        except urllib.error.HTTPError as err:
-            if tries < retries:
-                warn(f"URL request try {tries} failed ({err})")
-                continue
-
-    # write the total download time
-    toc = timeit.default_timer()
-    tsec = round(toc - tic, 2)
+    await _adownload(
+        get_request(url),
+        file_path,
+        retries=retries,
+        chunk_size=chunk_size,
+        progress=progress,
+        verbose=verbose,
+        client=client,
+    )
     if verbose:
-        print(f"\ntotal download time: {tsec} seconds")
-
-    # Unzip the file, and delete zip file if successful.
-    if "zip" in file_path.suffix or "exe" in file_path.suffix:
-        z = MFZipFile(file_path)
-        try:
-            if verbose:
-                print(f"Uncompressing: {file_path}")
-
-            # extract the files
-            z.extractall(str(path))
-        except:  # noqa: E722
-            p = "Could not unzip the file. Stopping."
-            raise Exception(p)
-        z.close()
-
-        # delete the zipfile
-        if delete_zip:
-            if verbose:
-                print(f"Deleting zipfile {file_path}")
-            file_path.unlink()
-    elif "tar" in file_path.suffix:
-        ar = tarfile.open(file_path)
-        ar.extractall(path=str(path))
-        ar.close()
+        toc = timeit.default_timer()
+        print(f"\ntotal download time: {round(toc - tic, 2)} seconds")
 
-        # delete the zipfile
-        if delete_zip:
-            if verbose:
-                print(f"Deleting zipfile {file_path}")
-            file_path.unlink()
+    await asyncio.get_running_loop().run_in_executor(
+        None, partial(_extract, file_path, path, delete_zip=delete_zip, verbose=verbose)
+    )
 
     if verbose:
         print(f"Done downloading and extracting {file_path.name} to {path}")